@@ -4,7 +4,7 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 
 from app.db.session import Base
-from app.models import User, Item, OTLink, AuditLog  # noqa: F401
+from app.models import User, Item, ItemTombstone, ItemSearchToken, ItemTagCount, OTLink, AuditLog, Blob, BlobObject, RevokedToken  # noqa: F401
 
 
 config = context.config
@@ -0,0 +1,32 @@
+"""Composite index for keyset pagination of items.
+
+Revision ID: 0002_items_keyset_index
+Revises: 0001_initial
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002_items_keyset_index"
+down_revision: Union[str, None] = "0001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_items_owner_id_created_at_id",
+        "items",
+        ["owner_id", sa.text("created_at DESC"), "id"],
+    )
+    # The composite index has owner_id as its leading column.
+    op.drop_index("ix_items_owner_id", table_name="items")
+
+
+def downgrade() -> None:
+    op.create_index("ix_items_owner_id", "items", ["owner_id"])
+    op.drop_index("ix_items_owner_id_created_at_id", table_name="items")
@@ -0,0 +1,37 @@
+"""Item tombstones and updated_at index for delta sync.
+
+Revision ID: 0003_item_sync
+Revises: 0002_items_keyset_index
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0003_item_sync"
+down_revision: Union[str, None] = "0002_items_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_items_owner_id_updated_at", "items", ["owner_id", "updated_at"])
+
+    op.create_table(
+        "item_tombstones",
+        sa.Column("item_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("owner_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_item_tombstones_owner_id_deleted_at", "item_tombstones", ["owner_id", "deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_tombstones_owner_id_deleted_at", table_name="item_tombstones")
+    op.drop_table("item_tombstones")
+
+    op.drop_index("ix_items_owner_id_updated_at", table_name="items")
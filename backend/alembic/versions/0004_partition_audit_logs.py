@@ -0,0 +1,97 @@
+"""Partition audit_logs by month on ts.
+
+Revision ID: 0004_partition_audit_logs
+Revises: 0003_item_sync
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0004_partition_audit_logs"
+down_revision: Union[str, None] = "0003_item_sync"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Creates monthly partitions from the oldest existing row through three
+# months ahead; app.services.audit_partitions keeps creating them afterwards.
+CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    month date := date_trunc('month', coalesce((SELECT min(ts) FROM audit_logs_legacy), now()) AT TIME ZONE 'UTC');
+    last_month date := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months';
+BEGIN
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+            'audit_logs_' || to_char(month, 'YYYY_MM'),
+            month::timestamp AT TIME ZONE 'UTC',
+            (month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+        month := month + interval '1 month';
+    END LOOP;
+END $$;
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+    op.execute("ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey")
+    op.execute("ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_user_id_fkey TO audit_logs_legacy_user_id_fkey")
+    op.execute("ALTER TABLE audit_logs_legacy ALTER COLUMN id DROP DEFAULT")
+    op.drop_index("ix_audit_logs_user_id", table_name="audit_logs_legacy")
+
+    # The partition key must be part of the primary key.
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id integer NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id uuid REFERENCES users (id) ON DELETE SET NULL,
+            action varchar NOT NULL,
+            ip_address varchar,
+            user_agent varchar,
+            details jsonb,
+            ts timestamptz NOT NULL,
+            PRIMARY KEY (id, ts)
+        ) PARTITION BY RANGE (ts)
+        """
+    )
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("CREATE INDEX ix_audit_logs_user_id_ts ON audit_logs (user_id, ts DESC)")
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+    # Safety net for rows outside the pre-created range.
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    op.execute(
+        "INSERT INTO audit_logs (id, user_id, action, ip_address, user_agent, details, ts) "
+        "SELECT id, user_id, action, ip_address, user_agent, details, ts FROM audit_logs_legacy"
+    )
+    op.execute("DROP TABLE audit_logs_legacy")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id integer NOT NULL DEFAULT nextval('audit_logs_id_seq') PRIMARY KEY,
+            user_id uuid REFERENCES users (id) ON DELETE SET NULL,
+            action varchar NOT NULL,
+            ip_address varchar,
+            user_agent varchar,
+            details jsonb,
+            ts timestamptz NOT NULL
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute(
+        "INSERT INTO audit_logs (id, user_id, action, ip_address, user_agent, details, ts) "
+        "SELECT id, user_id, action, ip_address, user_agent, details, ts FROM audit_logs_partitioned"
+    )
+    op.execute("DROP TABLE audit_logs_partitioned")
+    op.create_index("ix_audit_logs_user_id", "audit_logs", ["user_id"])
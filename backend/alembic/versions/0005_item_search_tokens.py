@@ -0,0 +1,34 @@
+"""Blind-index search tokens for items.
+
+Revision ID: 0005_item_search_tokens
+Revises: 0004_partition_audit_logs
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0005_item_search_tokens"
+down_revision: Union[str, None] = "0004_partition_audit_logs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "item_search_tokens",
+        sa.Column("owner_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("token", sa.Text(), nullable=False),
+        sa.Column("item_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("items.id", ondelete="CASCADE"), nullable=False),
+        sa.PrimaryKeyConstraint("owner_id", "token", "item_id"),
+    )
+    op.create_index("ix_item_search_tokens_item_id", "item_search_tokens", ["item_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_search_tokens_item_id", table_name="item_search_tokens")
+    op.drop_table("item_search_tokens")
@@ -0,0 +1,39 @@
+"""GIN index on item tags and per-user tag count summary.
+
+Revision ID: 0006_item_tags_index
+Revises: 0005_item_search_tokens
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0006_item_tags_index"
+down_revision: Union[str, None] = "0005_item_search_tokens"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_items_tags", "items", ["tags"], postgresql_using="gin")
+    op.create_table(
+        "item_tag_counts",
+        sa.Column("owner_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("tag", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("owner_id", "tag"),
+    )
+    op.execute(
+        "INSERT INTO item_tag_counts (owner_id, tag, count) "
+        "SELECT owner_id, tag, count(DISTINCT id) FROM items, unnest(tags) AS tag "
+        "GROUP BY owner_id, tag"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("item_tag_counts")
+    op.drop_index("ix_items_tags", table_name="items")
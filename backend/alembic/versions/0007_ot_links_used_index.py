@@ -0,0 +1,25 @@
+"""Partial index on consumed one-time links for the sweeper.
+
+Revision ID: 0007_ot_links_used_index
+Revises: 0006_item_tags_index
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007_ot_links_used_index"
+down_revision: Union[str, None] = "0006_item_tags_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_ot_links_used", "ot_links", ["expiry"], postgresql_where=sa.text("used IS true"))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ot_links_used", table_name="ot_links")
@@ -0,0 +1,42 @@
+"""Blob store references for large item and one-time link ciphertexts.
+
+Revision ID: 0008_blob_store
+Revises: 0007_ot_links_used_index
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0008_blob_store"
+down_revision: Union[str, None] = "0007_ot_links_used_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blobs",
+        sa.Column("owner_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("owner_id", "digest"),
+    )
+    op.add_column("items", sa.Column("blob_ref", sa.String(length=64), nullable=True))
+    op.alter_column("items", "encrypted_blob", existing_type=postgresql.BYTEA(), nullable=True)
+    op.add_column("ot_links", sa.Column("payload_ref", sa.String(length=64), nullable=True))
+    op.alter_column("ot_links", "encrypted_payload", existing_type=postgresql.BYTEA(), nullable=True)
+
+
+def downgrade() -> None:
+    # Rows whose ciphertext lives in the blob store must be inlined before downgrading.
+    op.alter_column("ot_links", "encrypted_payload", existing_type=postgresql.BYTEA(), nullable=False)
+    op.drop_column("ot_links", "payload_ref")
+    op.alter_column("items", "encrypted_blob", existing_type=postgresql.BYTEA(), nullable=False)
+    op.drop_column("items", "blob_ref")
+    op.drop_table("blobs")
@@ -0,0 +1,25 @@
+"""Per-user vault revision counter for listing ETags.
+
+Revision ID: 0009_user_vault_revision
+Revises: 0008_blob_store
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0009_user_vault_revision"
+down_revision: Union[str, None] = "0008_blob_store"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("vault_revision", sa.BigInteger(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "vault_revision")
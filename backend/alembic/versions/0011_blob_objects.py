@@ -0,0 +1,33 @@
+"""Registry of stored blob objects, locked to serialize claims and garbage collection.
+
+Revision ID: 0011_blob_objects
+Revises: 0010_revoked_tokens
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0011_blob_objects"
+down_revision: Union[str, None] = "0010_revoked_tokens"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blob_objects",
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("digest"),
+    )
+    op.execute(
+        "INSERT INTO blob_objects (digest, claimed_at) SELECT digest, max(created_at) FROM blobs GROUP BY digest"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("blob_objects")
@@ -0,0 +1,24 @@
+"""Index item tombstones by deletion time for the retention sweeper.
+
+Revision ID: 0012_item_tombstones_deleted_at
+Revises: 0011_blob_objects
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0012_item_tombstones_deleted_at"
+down_revision: Union[str, None] = "0011_blob_objects"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_item_tombstones_deleted_at", "item_tombstones", ["deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_tombstones_deleted_at", table_name="item_tombstones")
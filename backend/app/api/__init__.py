@@ -1,15 +1,17 @@
 from fastapi import APIRouter
 
-from . import auth, items, ot_links, audit, user, search
+from . import auth, items, blobs, ot_links, audit, user, search, internal
 
 router = APIRouter()
 
 router.include_router(auth.router, prefix="/auth", tags=["auth"])
 router.include_router(user.router, prefix="/user", tags=["user"])
 router.include_router(items.router, prefix="/items", tags=["items"])
+router.include_router(blobs.router, prefix="/blobs", tags=["blobs"])
 router.include_router(search.router, prefix="/search", tags=["search"])
 router.include_router(ot_links.router, prefix="/ot-links", tags=["ot-links"])
 router.include_router(audit.router, prefix="/audit", tags=["audit"])
+router.include_router(internal.router, prefix="/internal", tags=["internal"], include_in_schema=False)
 
 
 
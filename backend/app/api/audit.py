@@ -1,26 +1,63 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
 
-from app.core.security import get_current_user
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routing import SessionReleasingRoute
+from app.core.config import get_settings
+from app.core.pagination import decode_cursor, encode_cursor, set_next_cursor
+from app.core.security import get_current_reader, get_read_db
 from app.models import AuditLog, User
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
+
+settings = get_settings()
 
 
 @router.get("/logs")
-def get_audit_logs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_audit_logs(
+    response: Response,
+    limit: int = Query(settings.audit_page_size_default, ge=1, le=settings.audit_page_size_max),
+    cursor: Optional[str] = None,
+    action: Optional[list[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
 ) -> list[dict]:
+    """Newest-first audit entries, filtered by action and [since, until).
+
+    The time range also lets PostgreSQL prune audit_logs partitions. The
+    cursor for the next page is returned in the X-Next-Cursor header.
+    """
     # In a full implementation, restrict this to admins. For now, return current user's logs.
-    logs = (
-        db.query(AuditLog)
-        .filter(AuditLog.user_id == current_user.id)
-        .order_by(AuditLog.ts.desc())
-        .limit(200)
-        .all()
+    conditions = [AuditLog.user_id == current_user.id]
+    if action:
+        conditions.append(AuditLog.action.in_(action))
+    if since is not None:
+        conditions.append(AuditLog.ts >= since)
+    if until is not None:
+        conditions.append(AuditLog.ts < until)
+    if cursor:
+        ts, log_id = decode_cursor(cursor)
+        try:
+            log_id = int(log_id)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        conditions.append(or_(AuditLog.ts < ts, and_(AuditLog.ts == ts, AuditLog.id < log_id)))
+
+    result = await db.execute(
+        select(AuditLog)
+        .where(*conditions)
+        .order_by(AuditLog.ts.desc(), AuditLog.id.desc())
+        .limit(limit + 1)
     )
+    logs = result.scalars().all()
+    if len(logs) > limit:
+        logs = logs[:limit]
+        set_next_cursor(response, encode_cursor(logs[-1].ts, logs[-1].id))
     return [
         {
             "id": log.id,
@@ -32,4 +69,3 @@ def get_audit_logs(
         }
         for log in logs
     ]
-
@@ -1,63 +1,94 @@
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.routing import SessionReleasingRoute
+from app.core.ratelimit import RateLimiter, client_ip, get_rate_limiter
 from app.core.security import (
     create_access_token,
-    get_password_hash,
-    verify_password,
+    get_current_user,
+    get_token_claims,
     get_user_by_email,
+    password_hasher,
 )
+from app.db.replicas import bind_session_user
 from app.db.session import get_db
 from app.models import User
 from app.schemas.auth import RegisterRequest, Token
+from app.services.token_revocation import token_denylist
 
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register(payload: RegisterRequest, db: Session = Depends(get_db)) -> Token:
-    existing = get_user_by_email(db, payload.email)
+async def register(
+    payload: RegisterRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+) -> Token:
+    await limiter.check("register", ip=client_ip(request), account=payload.email)
+    existing = await get_user_by_email(db, payload.email)
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
     user = User(
         email=payload.email,
-        password_hash=get_password_hash(payload.password),
+        password_hash=await password_hasher.hash(payload.password),
         master_salt=payload.master_salt,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.flush()
+    bind_session_user(db, str(user.id))
+    await db.commit()
+    await db.refresh(user)
 
     access_token = create_access_token(str(user.id))
     return Token(access_token=access_token)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    limiter: RateLimiter = Depends(get_rate_limiter),
 ) -> Token:
-    user = get_user_by_email(db, form_data.username)
-    if user is None or not verify_password(form_data.password, user.password_hash):
+    # Before any lookup or hashing, so bursts cannot saturate the hasher pool.
+    await limiter.check("login", ip=client_ip(request), account=form_data.username)
+    user = await get_user_by_email(db, form_data.username)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+
+    valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
 
+    if new_hash is not None:
+        user.password_hash = new_hash
     user.last_login = datetime.now(timezone.utc)
     db.add(user)
-    db.commit()
+    bind_session_user(db, str(user.id))
+    await db.commit()
 
     access_token = create_access_token(str(user.id))
     return Token(access_token=access_token)
 
 
 @router.post("/logout")
-def logout() -> dict:
-    # Stateless JWT logout is handled client-side by discarding the token.
+async def logout(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Revoke the presented access token for the rest of its lifetime."""
+    jti = claims.get("jti")
+    # Tokens issued before token ids existed simply run out at their expiry.
+    if jti is not None:
+        expires_at = datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+        await token_denylist.revoke(db, jti, current_user.id, expires_at)
+        await db.commit()
     return {"detail": "logged_out"}
-
-
-
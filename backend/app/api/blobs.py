@@ -0,0 +1,102 @@
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routing import SessionReleasingRoute
+from app.core.blobstore import BlobStore
+from app.core.config import get_settings
+from app.core.security import get_current_user
+from app.db.session import get_db
+from app.models import User
+from app.schemas.blob import BlobRead
+from app.services.blobs import DIGEST_PATTERN, get_blob_store, owned_blob_size, store_upload
+
+
+router = APIRouter(route_class=SessionReleasingRoute)
+
+settings = get_settings()
+
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int]:
+    # Single ranges only: "bytes=start-end", "bytes=start-" or "bytes=-suffix".
+    match = BYTE_RANGE.match(header.strip())
+    if match is None or match.groups() == ("", ""):
+        raise HTTPException(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, detail="Invalid range")
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+@router.put("/{digest}", response_model=BlobRead)
+async def upload_blob(
+    request: Request,
+    response: Response,
+    digest: str = Path(..., pattern=DIGEST_PATTERN),
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
+    current_user: User = Depends(get_current_user),
+) -> BlobRead:
+    """Upload a ciphertext under its SHA-256 digest, streamed without buffering.
+
+    Re-uploading a digest the caller already holds returns 200 without
+    reading the body; a new blob returns 201.
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > settings.blob_upload_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Blob exceeds {settings.blob_upload_max_bytes} bytes",
+        )
+    size, created = await store_upload(
+        db, store, current_user.id, digest, request.stream(), max_bytes=settings.blob_upload_max_bytes
+    )
+    await db.commit()
+    response.status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+    return BlobRead(digest=digest, size=size)
+
+
+@router.get("/{digest}")
+async def download_blob(
+    digest: str = Path(..., pattern=DIGEST_PATTERN),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream a blob in chunks; a single ``Range`` is honoured with 206."""
+    size = await owned_blob_size(db, current_user.id, digest)
+    if size is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blob not found")
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        # Content-addressed: the bytes behind a digest never change.
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "ETag": f'"{digest}"',
+    }
+    start, end, status_code = 0, size - 1, status.HTTP_200_OK
+    if range_header and size:
+        start, end = _parse_range(range_header, size)
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        store.get_object(digest, start=start, end=end),
+        status_code=status_code,
+        media_type="application/octet-stream",
+        headers=headers,
+    )
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends
+
+from app.core.ratelimit import rate_limiter
+from app.core.security import password_hasher, require_internal_access, user_cache
+from app.db.pool import pool_status
+from app.db.replicas import replica_router
+from app.db.session import async_engine, engine
+from app.services.audit import audit_writer
+from app.services.blobs import blob_claim_sweeper
+from app.services.item_tombstones import tombstone_sweeper
+from app.services.ot_links import ot_link_sweeper
+from app.services.token_revocation import token_denylist
+
+
+# Operational endpoints; not part of the public API schema, disabled unless
+# INTERNAL_API_ENABLED is set and guarded by INTERNAL_API_TOKEN.
+router = APIRouter(dependencies=[Depends(require_internal_access)])
+
+
+@router.get("/db-pool")
+async def db_pool_stats() -> dict:
+    return {
+        "async": pool_status(async_engine.sync_engine),
+        "sync": pool_status(engine),
+        "replicas": {replica.name: pool_status(replica.engine.sync_engine) for replica in replica_router.replicas},
+    }
+
+
+@router.get("/user-cache")
+async def user_cache_stats() -> dict:
+    return user_cache.stats()
+
+
+@router.get("/audit-writer")
+async def audit_writer_stats() -> dict:
+    return audit_writer.stats()
+
+
+@router.get("/password-hasher")
+async def password_hasher_stats() -> dict:
+    return password_hasher.stats()
+
+
+@router.get("/ot-link-sweeper")
+async def ot_link_sweeper_stats() -> dict:
+    return ot_link_sweeper.stats()
+
+
+@router.get("/blob-claim-sweeper")
+async def blob_claim_sweeper_stats() -> dict:
+    return blob_claim_sweeper.stats()
+
+
+@router.get("/tombstone-sweeper")
+async def tombstone_sweeper_stats() -> dict:
+    return tombstone_sweeper.stats()
+
+
+@router.get("/rate-limiter")
+async def rate_limiter_stats() -> dict:
+    return rate_limiter.stats()
+
+
+@router.get("/token-denylist")
+async def token_denylist_stats() -> dict:
+    return token_denylist.stats()
+
+
+@router.get("/replicas")
+async def replica_stats() -> dict:
+    return replica_router.stats()
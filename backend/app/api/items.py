@@ -1,93 +1,458 @@
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from app.core.security import get_current_user
+from app.api.routing import SessionReleasingRoute
+from app.core.blobstore import BlobStore
+from app.core.config import get_settings
+from app.core.encoding import VARY_ACCEPT, dumps, json_rows, negotiate, vary_accept, wants_msgpack
+from app.core.etag import check_if_match, item_etag, none_match, not_modified, revision_etag
+from app.core.pagination import (
+    decode_change_token,
+    decode_cursor,
+    decode_sync_cursor,
+    encode_change_token,
+    encode_cursor,
+    encode_sync_cursor,
+    set_next_cursor,
+)
+from app.core.security import get_current_reader, get_current_user, get_read_db
+from app.db import queries
+from app.db.expressions import tags_match
 from app.db.session import get_db
-from app.models import Item, User
-from app.schemas.item import ItemCreate, ItemDetail, ItemMeta, ItemUpdate
+from app.models import Item, ItemTombstone, User
+from app.models.item import ITEM_META_COLUMNS
+from app.schemas.item import (
+    ItemBatchRequest,
+    ItemBatchResponse,
+    ItemCreate,
+    ItemDetail,
+    ItemMeta,
+    ItemSyncResponse,
+    ItemUpdate,
+    TagCount,
+    VaultImportResult,
+)
+from app.services import search_index, tag_counts
+from app.services.blobs import get_blob_store, offload_item_blob, purge_unclaimed_objects, release_blobs
+from app.services.item_batch import create_items, delete_items, update_items
+from app.services.item_tombstones import tombstone_horizon
+from app.services.vault_revision import bump_vault_revision, get_vault_revision
+from app.services.vault_transfer import export_vault, import_vault
 
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
+
+settings = get_settings()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+OCTET_STREAM_MEDIA_TYPE = "application/octet-stream"
+
+
+def _cursor_item_id(key: str) -> UUID:
+    try:
+        return UUID(key)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _after_cursor(cursor: str):
+    # Matches the (owner_id, created_at DESC, id) index ordering.
+    created_at, key = decode_cursor(cursor)
+    item_id = _cursor_item_id(key)
+    return or_(Item.created_at < created_at, and_(Item.created_at == created_at, Item.id > item_id))
+
+
+def _etags(item: Item) -> tuple[str, str]:
+    # If-Match may carry the ETag of either encoding of the item.
+    return item_etag(item.version, item.updated_at), item_etag(item.version, item.updated_at, "-msgpack")
+
+
+async def _stream_item_meta(bind: AsyncEngine, query: Select) -> AsyncIterator[bytes]:
+    # The request-scoped session is closed once the handler returns, so the
+    # stream runs on its own session and a server-side cursor.
+    async with AsyncSession(bind) as db:
+        result = await db.stream(query)
+        async for row in result:
+            yield dumps(row._asdict()) + b"\n"
 
 
 @router.post("/", response_model=ItemDetail, status_code=status.HTTP_201_CREATED)
-def create_item(
+async def create_item(
     payload: ItemCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
     current_user: User = Depends(get_current_user),
 ) -> ItemDetail:
+    await offload_item_blob(db, store, current_user.id, payload)
     item = Item(
         owner_id=current_user.id,
         title_hmac=payload.title_hmac,
         encrypted_blob=payload.encrypted_blob,
+        blob_ref=payload.blob_ref,
         iv=payload.iv,
         salt=payload.salt,
         version=payload.version,
         tags=payload.tags,
     )
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    if payload.search_tokens:
+        await db.flush()
+        await search_index.replace_item_tokens(db, current_user.id, {item.id: payload.search_tokens}, replace=False)
+    await tag_counts.apply_tag_changes(db, current_user.id, [(None, payload.tags)])
+    await bump_vault_revision(db, current_user.id)
+    await db.commit()
+    await db.refresh(item)
+    response.headers["ETag"] = item_etag(item.version, item.updated_at)
     return item
 
 
 @router.get("/", response_model=list[ItemMeta])
-def list_items(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_items(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.items_page_size_default, ge=1, le=settings.items_page_size_max),
+    cursor: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None, max_length=32),
+    tag_match: Literal["any", "all"] = "any",
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
 ) -> list[ItemMeta]:
-    items = db.query(Item).filter(Item.owner_id == current_user.id).order_by(Item.created_at.desc()).all()
-    return items
+    """List item metadata newest first, one page at a time.
 
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    Clients sending ``Accept: application/x-ndjson`` instead receive every
+    remaining item as newline-delimited JSON, streamed without a page limit.
+    Repeated ``tag`` parameters keep items carrying any (or, with
+    ``tag_match=all``, every one) of those tags. Pages carry an ETag derived
+    from the vault revision, so ``If-None-Match`` revalidation costs one
+    primary-key lookup.
+    """
+    conditions = [Item.owner_id == current_user.id]
+    if tag:
+        conditions.append(tags_match(db, Item.tags, tag, match_all=tag_match == "all"))
+    if cursor:
+        conditions.append(_after_cursor(cursor))
+    # Metadata columns only: listing never reads the BYTEA payloads.
+    query = select(*ITEM_META_COLUMNS).where(*conditions).order_by(Item.created_at.desc(), Item.id)
 
-@router.get("/{item_id}", response_model=ItemDetail)
-def get_item(
-    item_id: UUID,
-    db: Session = Depends(get_db),
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_item_meta(db.bind, query), media_type=NDJSON_MEDIA_TYPE, headers=VARY_ACCEPT
+        )
+
+    # Read before the page, so a concurrent write can only make the ETag older
+    # than the content (forcing a refetch), never newer.
+    revision = await get_vault_revision(db, current_user.id)
+    etag = revision_etag(revision, str(request.url.query), str(limit))
+    if none_match(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, VARY_ACCEPT)
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    page = json_rows(rows)
+    set_next_cursor(page, next_cursor)
+    page.headers["ETag"] = etag
+    page.headers.update(VARY_ACCEPT)
+    return page
+
+
+@router.get("/tags", response_model=list[TagCount])
+async def list_item_tags(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+) -> list[TagCount]:
+    """Tags in use and how many items carry each, read from the maintained summary."""
+    return json_rows(await tag_counts.list_tag_counts(db, current_user.id))
+
+
+@router.get("/export")
+async def export_items(
+    db: AsyncSession = Depends(get_read_db),
+    store: BlobStore = Depends(get_blob_store),
+    current_user: User = Depends(get_current_reader),
+) -> StreamingResponse:
+    """Stream the whole vault as NDJSON with a closing checksum manifest.
+
+    Items come from a server-side cursor with blob-store ciphertexts inlined,
+    so memory stays flat however large the vault; the body can be posted
+    unchanged to ``/api/items/import``.
+    """
+    return StreamingResponse(
+        export_vault(db.bind, store, current_user.id, batch_size=settings.vault_export_batch_size),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="vault-export.ndjson"'},
+    )
+
+
+@router.post("/import", response_model=VaultImportResult)
+async def import_items(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
+    current_user: User = Depends(get_current_user),
+) -> VaultImportResult:
+    """Import an export stream, parsed as it arrives and inserted in batches.
+
+    All or nothing: the items are committed only if the manifest's count and
+    checksum match the lines received. Items whose id the caller already has
+    are skipped, so re-importing the same export is harmless; items carrying
+    another account's id are imported under a fresh id.
+    """
+    result = await import_vault(
+        db,
+        store,
+        current_user.id,
+        request.stream(),
+        batch_size=settings.vault_import_batch_size,
+        batch_max_bytes=settings.vault_import_batch_max_bytes,
+        max_line_bytes=settings.vault_import_max_line_bytes,
+    )
+    if result.imported:
+        await bump_vault_revision(db, current_user.id)
+    await db.commit()
+    return result
+
+
+@router.post("/batch", response_model=ItemBatchResponse)
+async def batch_items(
+    payload: ItemBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
+    current_user: User = Depends(get_current_user),
+) -> ItemBatchResponse:
+    """Create, update and delete many items in a single transaction.
+
+    Updates only apply when ``expected_version`` matches the stored version;
+    each entry reports its own outcome instead of failing the whole batch.
+    """
+    total = len(payload.create) + len(payload.update) + len(payload.delete)
+    if total > settings.items_batch_max:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {settings.items_batch_max} operations",
+        )
+    update_ids = [change.id for change in payload.update]
+    if len(set(update_ids)) != len(update_ids):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Duplicate item id in update")
+
+    for entry in [*payload.create, *payload.update]:
+        await offload_item_blob(db, store, current_user.id, entry)
+    # Blobs the updated and deleted items held before; released below unless still referenced.
+    previous_refs = (
+        await db.scalars(
+            select(Item.blob_ref).where(
+                Item.owner_id == current_user.id,
+                Item.id.in_([*update_ids, *payload.delete]),
+                Item.blob_ref.is_not(None),
+            )
+        )
+    ).all()
+    created = await create_items(db, current_user.id, payload.create)
+    updated = await update_items(db, current_user.id, payload.update)
+    deleted = await delete_items(db, current_user.id, payload.delete)
+    released = await release_blobs(db, current_user.id, previous_refs)
+    await bump_vault_revision(db, current_user.id)
+    await db.commit()
+    await purge_unclaimed_objects(db, store, released)
+    return ItemBatchResponse(created=created, updated=updated, deleted=deleted)
+
+
+@router.get("/sync", response_model=ItemSyncResponse, dependencies=[Depends(vary_accept)])
+async def sync_items(
+    request: Request,
+    response: Response,
+    since: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.items_page_size_default, ge=1, le=settings.items_page_size_max),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> ItemSyncResponse:
+    """Items changed and ids deleted since a change token.
+
+    The returned token is passed as ``since`` on the next call; changes near
+    the token boundary may be repeated and should be applied idempotently by
+    ``version``. A token older than the tombstone retention window gets 410,
+    since deletions before then are no longer known.
+
+    Omitting ``since`` starts a full sync, served ``limit`` items at a time
+    in ``updated_at`` order: while the X-Next-Cursor header is set, call again
+    with it as ``cursor``. Every page carries the token of the first, and
+    items the client holds but no page returned have been deleted.
+    """
+    served_at = datetime.now(timezone.utc)
+    owned = Item.owner_id == current_user.id
+
+    if since:
+        if cursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Pass either since or cursor")
+        cutoff = decode_change_token(since) - timedelta(seconds=settings.sync_overlap_seconds)
+        horizon = tombstone_horizon(served_at)
+        if horizon is not None and cutoff < horizon:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE, detail="Change token expired, sync again without since"
+            )
+        result = await db.execute(
+            select(ItemTombstone.item_id).where(
+                ItemTombstone.owner_id == current_user.id,
+                ItemTombstone.deleted_at > cutoff,
+            )
+        )
+        deleted = list(result.scalars().all())
+        result = await db.execute(select(Item).where(owned, Item.updated_at > cutoff).order_by(Item.updated_at))
+        return negotiate(
+            request,
+            ItemSyncResponse,
+            ItemSyncResponse(changed=result.scalars().all(), deleted=deleted, token=encode_change_token(served_at)),
+        )
+
+    # Full sync, keyset-paginated on (updated_at, id). An item updated
+    # mid-sync moves past the cursor and is sent again, never skipped.
+    query = select(Item).where(owned)
+    token = encode_change_token(served_at)
+    if cursor:
+        token, updated_at, key = decode_sync_cursor(cursor)
+        item_id = _cursor_item_id(key)
+        query = query.where(or_(Item.updated_at > updated_at, and_(Item.updated_at == updated_at, Item.id > item_id)))
+    result = await db.execute(query.order_by(Item.updated_at, Item.id).limit(limit + 1))
+    changed = result.scalars().all()
+    next_cursor = None
+    if len(changed) > limit:
+        changed = changed[:limit]
+        next_cursor = encode_sync_cursor(token, changed[-1].updated_at, changed[-1].id)
+    body = negotiate(request, ItemSyncResponse, ItemSyncResponse(changed=changed, deleted=[], token=token))
+    set_next_cursor(body if isinstance(body, Response) else response, next_cursor)
+    return body
+
+
+@router.get("/{item_id}", response_model=ItemDetail, dependencies=[Depends(vary_accept)])
+async def get_item(
+    item_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
 ) -> ItemDetail:
-    item = db.query(Item).filter(Item.id == item_id, Item.owner_id == current_user.id).first()
+    """Item with its ciphertext; ``Accept: application/msgpack`` returns MessagePack.
+
+    ``If-None-Match`` is checked against (version, updated_at) alone, so an
+    unchanged item answers 304 without reading its ciphertext.
+    """
+    variant = "-msgpack" if wants_msgpack(request) else ""
+    owned = {"item_id": item_id, "owner_id": current_user.id}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        state = (await db.execute(queries.OWNED_ITEM_STATE, owned)).first()
+        if state is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+        etag = item_etag(state.version, state.updated_at, variant)
+        if none_match(if_none_match, etag):
+            return not_modified(etag, VARY_ACCEPT)
+
+    result = await db.execute(queries.OWNED_ITEM, owned)
+    item = result.scalars().first()
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
-    return item
+    body = negotiate(request, ItemDetail, item)
+    (body if isinstance(body, Response) else response).headers["ETag"] = item_etag(
+        item.version, item.updated_at, variant
+    )
+    return body
+
+
+@router.get("/{item_id}/blob")
+async def download_item_blob(
+    item_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    """The item's ciphertext alone, as raw bytes, wherever it is stored."""
+    result = await db.execute(queries.OWNED_ITEM_CIPHERTEXT, {"item_id": item_id, "owner_id": current_user.id})
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    if row.blob_ref is not None:
+        return StreamingResponse(store.get_object(row.blob_ref), media_type=OCTET_STREAM_MEDIA_TYPE)
+    return Response(row.encrypted_blob, media_type=OCTET_STREAM_MEDIA_TYPE)
 
 
 @router.put("/{item_id}", response_model=ItemDetail)
-def update_item(
+async def update_item(
     item_id: UUID,
     payload: ItemUpdate,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
     current_user: User = Depends(get_current_user),
 ) -> ItemDetail:
-    item = db.query(Item).filter(Item.id == item_id, Item.owner_id == current_user.id).first()
+    # Row lock so the tag count delta is taken against the tags being replaced.
+    result = await db.execute(queries.OWNED_ITEM_FOR_UPDATE, {"item_id": item_id, "owner_id": current_user.id})
+    item = result.scalars().first()
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    check_if_match(request.headers.get("if-match"), *_etags(item))
 
+    await offload_item_blob(db, store, current_user.id, payload)
+    previous_ref = item.blob_ref
     data = payload.model_dump(exclude_unset=True)
+    if "tags" in data:
+        await tag_counts.apply_tag_changes(db, current_user.id, [(item.tags, data["tags"])])
+    if "search_tokens" in data:
+        await search_index.replace_item_tokens(db, current_user.id, {item.id: data.pop("search_tokens") or []})
     for key, value in data.items():
         setattr(item, key, value)
 
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    released: list[str] = []
+    if item.blob_ref != previous_ref:
+        await db.flush()
+        released = await release_blobs(db, current_user.id, [previous_ref])
+    await bump_vault_revision(db, current_user.id)
+    await db.commit()
+    await purge_unclaimed_objects(db, store, released)
+    await db.refresh(item)
+    response.headers["ETag"] = item_etag(item.version, item.updated_at)
     return item
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_item(
+async def delete_item(
     item_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    item = db.query(Item).filter(Item.id == item_id, Item.owner_id == current_user.id).first()
+    if_match = request.headers.get("if-match")
+    result = await db.execute(
+        queries.OWNED_ITEM_FOR_UPDATE if if_match else queries.OWNED_ITEM,
+        {"item_id": item_id, "owner_id": current_user.id},
+    )
+    item = result.scalars().first()
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    check_if_match(if_match, *_etags(item))
 
-    db.delete(item)
-    db.commit()
+    await search_index.delete_item_tokens(db, current_user.id, [item.id])
+    await tag_counts.apply_tag_changes(db, current_user.id, [(item.tags, None)])
+    await db.delete(item)
+    db.add(ItemTombstone(item_id=item.id, owner_id=current_user.id))
+    await db.flush()
+    released = await release_blobs(db, current_user.id, [item.blob_ref])
+    await bump_vault_revision(db, current_user.id)
+    await db.commit()
+    await purge_unclaimed_objects(db, store, released)
     return None
 
 
-
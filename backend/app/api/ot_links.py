@@ -1,38 +1,61 @@
 from datetime import datetime, timezone
+from typing import Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
-
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routing import SessionReleasingRoute
+from app.core.blobstore import BlobStore
+from app.core.config import get_settings
+from app.core.encoding import negotiate, vary_accept
+from app.core.ratelimit import RateLimiter, client_ip, get_rate_limiter
 from app.core.security import get_current_user
 from app.db.session import get_db
 from app.models import OTLink, User
 from app.schemas.ot_link import OTLinkCreate, OTLinkRead
 from app.services.audit import log_action
+from app.services.blobs import get_blob_store, purge_unclaimed_objects, read_blob, release_blobs, store_bytes
+from app.services.ot_links import consume_ot_link
+
+router = APIRouter(route_class=SessionReleasingRoute)
+
+settings = get_settings()
 
-router = APIRouter()
+
+def _with_payload(link: Any, payload: bytes) -> OTLinkRead:
+    # Links whose payload lives in the blob store carry no inline copy.
+    data = {field: getattr(link, field) for field in OTLinkRead.model_fields}
+    data["encrypted_payload"] = payload
+    return OTLinkRead(**data)
 
 
 @router.post("/", response_model=OTLinkRead, status_code=status.HTTP_201_CREATED)
-def create_ot_link(
+async def create_ot_link(
     payload: OTLinkCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
     current_user: User = Depends(get_current_user),
 ) -> OTLinkRead:
+    inline, payload_ref = payload.encrypted_payload, None
+    if len(inline) > settings.blob_inline_max_bytes:
+        inline, payload_ref = None, await store_bytes(db, store, current_user.id, inline)
     link = OTLink(
         owner_id=current_user.id,
-        encrypted_payload=payload.encrypted_payload,
+        encrypted_payload=inline,
+        payload_ref=payload_ref,
         salt=payload.salt,
         iv=payload.iv,
         expiry=payload.expiry,
         single_use=payload.single_use,
     )
     db.add(link)
-    db.commit()
-    db.refresh(link)
+    await db.commit()
+    await db.refresh(link)
 
-    log_action(
+    await log_action(
         db,
         user=current_user,
         action="ot_link_created",
@@ -40,22 +63,36 @@ def create_ot_link(
         details={"ot_link_id": str(link.id), "single_use": link.single_use},
     )
 
-    return link
+    return _with_payload(link, payload.encrypted_payload)
 
 
-@router.get("/{link_id}", response_model=OTLinkRead)
-def get_ot_link(
+@router.get("/{link_id}", response_model=OTLinkRead, dependencies=[Depends(vary_accept)])
+async def get_ot_link(
     link_id: UUID,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
+    limiter: RateLimiter = Depends(get_rate_limiter),
 ) -> OTLinkRead:
-    now = datetime.now(timezone.utc)
+    """Return a live link; single-use links are consumed by this call.
 
-    link = db.query(OTLink).filter(OTLink.id == link_id).first()
-    if not link or link.used or link.expiry < now:
+    ``Accept: application/msgpack`` returns the link as MessagePack.
+    """
+    await limiter.check("ot_link_fetch", ip=client_ip(request))
+    link = await consume_ot_link(db, link_id, datetime.now(timezone.utc))
+    if not link:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OT link invalid or expired")
-
-    log_action(
+    # Read a stored payload before committing, so a store failure leaves a
+    # single-use link unconsumed.
+    payload = link.encrypted_payload if link.payload_ref is None else await read_blob(store, link.payload_ref)
+    released: list[str] = []
+    if link.single_use and link.payload_ref is not None:
+        # Consuming cleared payload_ref; the stored payload is no longer needed.
+        released = await release_blobs(db, link.owner_id, [link.payload_ref])
+    await db.commit()
+    await purge_unclaimed_objects(db, store, released)
+
+    await log_action(
         db,
         user=None,
         action="ot_link_fetched",
@@ -63,24 +100,29 @@ def get_ot_link(
         details={"ot_link_id": str(link.id)},
     )
 
-    return link
+    return negotiate(request, OTLinkRead, _with_payload(link, payload))
 
 
 @router.delete("/{link_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_ot_link(
+async def delete_ot_link(
     link_id: UUID,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    link = db.query(OTLink).filter(OTLink.id == link_id, OTLink.owner_id == current_user.id).first()
+    result = await db.execute(select(OTLink).where(OTLink.id == link_id, OTLink.owner_id == current_user.id))
+    link = result.scalars().first()
     if not link:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OT link not found")
 
-    db.delete(link)
-    db.commit()
+    await db.delete(link)
+    await db.flush()
+    released = await release_blobs(db, current_user.id, [link.payload_ref])
+    await db.commit()
+    await purge_unclaimed_objects(db, store, released)
 
-    log_action(
+    await log_action(
         db,
         user=current_user,
         action="ot_link_deleted",
@@ -0,0 +1,41 @@
+import asyncio
+import functools
+
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class SessionReleasingRoute(APIRoute):
+    """APIRoute that closes the endpoint's database sessions as soon as it returns.
+
+    FastAPI only runs the exit code of ``get_db`` after the response model has
+    been validated and serialized, so without this a read-only request keeps
+    its pooled connection (and open transaction) through serialization of
+    every ciphertext it returns. Sessions are created lazily, so requests that
+    never query (e.g. a cached current user answering 304) never check out a
+    connection at all.
+
+    Endpoints must commit their own writes, as they already do; anything left
+    uncommitted is rolled back here, exactly as ``get_db`` would on exit.
+    Results are read with ``expire_on_commit=False`` sessions, so returned ORM
+    objects stay readable once detached.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        endpoint = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint):
+            self.dependant.call = _release_sessions_after(endpoint)
+
+
+def _release_sessions_after(endpoint):
+    @functools.wraps(endpoint)
+    async def call(**values):
+        try:
+            return await endpoint(**values)
+        finally:
+            for value in values.values():
+                if isinstance(value, AsyncSession):
+                    await value.close()
+
+    return call
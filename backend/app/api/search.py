@@ -1,28 +1,63 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
 
-from app.core.security import get_current_user
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routing import SessionReleasingRoute
+from app.core.security import get_current_reader, get_read_db
+from app.core.encoding import json_rows
+from app.db.expressions import tags_match
 from app.models import Item, User
-from app.schemas.item import ItemMeta
+from app.models.item import ITEM_META_COLUMNS
+from app.schemas.item import ItemMeta, ItemSearchHit
+from app.services.search_index import search_by_tokens
 
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 @router.get("", response_model=list[ItemMeta])
-def search_items(
+async def search_items(
     q: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    tag: Optional[List[str]] = Query(None, max_length=32),
+    tag_match: Literal["any", "all"] = "any",
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
 ) -> list[ItemMeta]:
     # For now, treat q as a precomputed title_hmac provided by the client.
-    items = (
-        db.query(Item)
-        .filter(Item.owner_id == current_user.id, Item.title_hmac == q)
-        .order_by(Item.created_at.desc())
-        .all()
+    query = select(*ITEM_META_COLUMNS).where(Item.owner_id == current_user.id, Item.title_hmac == q)
+    if tag:
+        query = query.where(tags_match(db, Item.tags, tag, match_all=tag_match == "all"))
+    result = await db.execute(query.order_by(Item.created_at.desc()))
+    return json_rows(result.all())
+
+
+@router.get("/tokens", response_model=list[ItemSearchHit])
+async def search_items_by_tokens(
+    t: list[str] = Query(..., min_length=1, max_length=32),
+    match: Literal["any", "all"] = "any",
+    limit: int = Query(50, ge=1, le=200),
+    tag: Optional[List[str]] = Query(None, max_length=32),
+    tag_match: Literal["any", "all"] = "any",
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
+) -> list[ItemSearchHit]:
+    """Blind-index search over client-computed HMAC tokens (words or prefixes).
+
+    Items are ranked by how many of the given tokens they carry; ``match=all``
+    keeps only items carrying every token. ``tag``/``tag_match`` filter as on
+    item listing.
+    """
+    hits = await search_by_tokens(
+        db,
+        current_user.id,
+        t,
+        match_all=match == "all",
+        limit=limit,
+        tags=tag,
+        match_all_tags=tag_match == "all",
     )
-    return items
+    return json_rows(hits)
 
 
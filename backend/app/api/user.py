@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
-from app.core.security import get_current_user
+from app.api.routing import SessionReleasingRoute
+from app.core.etag import body_etag, none_match, not_modified
+from app.core.security import get_current_reader
 from app.models import User
 from app.schemas.user import UserRead
 
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 @router.get("/me", response_model=UserRead)
-async def read_me(current_user: User = Depends(get_current_user)) -> UserRead:
-    return current_user
+async def read_me(request: Request, current_user: User = Depends(get_current_reader)) -> UserRead:
+    body = UserRead.model_validate(current_user).model_dump_json().encode()
+    etag = body_etag(body)
+    if none_match(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
 
 
 
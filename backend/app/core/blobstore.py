@@ -0,0 +1,99 @@
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional, Protocol
+
+
+class BlobStore(Protocol):
+    """Object store for large ciphertexts, keyed by their SHA-256 digest.
+
+    The method set mirrors S3 (put/get with byte range/head/delete) so an S3
+    client can back it; writes must be atomic, never exposing partial objects.
+    """
+
+    async def put_object(self, key: str, chunks: AsyncIterable[bytes]) -> int: ...
+
+    def get_object(self, key: str, *, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]: ...
+
+    async def head_object(self, key: str) -> Optional[int]: ...
+
+    async def delete_object(self, key: str) -> None: ...
+
+
+class LocalBlobStore:
+    """BlobStore on the local filesystem, fanned out by digest prefix."""
+
+    def __init__(self, root: str, chunk_size: int = 64 * 1024) -> None:
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    async def put_object(self, key: str, chunks: AsyncIterable[bytes]) -> int:
+        path = self._path(key)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        fd, tmp_name = await asyncio.to_thread(tempfile.mkstemp, dir=path.parent, prefix=".upload-")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                async for chunk in chunks:
+                    await asyncio.to_thread(fh.write, chunk)
+                    size += len(chunk)
+            await asyncio.to_thread(os.replace, tmp_name, path)
+        except BaseException:
+            await asyncio.to_thread(Path(tmp_name).unlink, missing_ok=True)
+            raise
+        return size
+
+    async def get_object(self, key: str, *, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yield bytes ``start`` through ``end`` (inclusive) in chunk_size reads."""
+        fh = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            await asyncio.to_thread(fh.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+                chunk = await asyncio.to_thread(fh.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(fh.close)
+
+    async def head_object(self, key: str) -> Optional[int]:
+        try:
+            return (await asyncio.to_thread(self._path(key).stat)).st_size
+        except FileNotFoundError:
+            return None
+
+    async def delete_object(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+
+class InMemoryBlobStore:
+    """Process-local BlobStore, standing in for object storage in tests and dev."""
+
+    def __init__(self, chunk_size: int = 64 * 1024) -> None:
+        self.chunk_size = chunk_size
+        self._objects: dict[str, bytes] = {}
+
+    async def put_object(self, key: str, chunks: AsyncIterable[bytes]) -> int:
+        data = b"".join([chunk async for chunk in chunks])
+        self._objects[key] = data
+        return len(data)
+
+    async def get_object(self, key: str, *, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        data = self._objects[key][start : None if end is None else end + 1]
+        for offset in range(0, len(data), self.chunk_size):
+            yield data[offset : offset + self.chunk_size]
+
+    async def head_object(self, key: str) -> Optional[int]:
+        data = self._objects.get(key)
+        return None if data is None else len(data)
+
+    async def delete_object(self, key: str) -> None:
+        self._objects.pop(key, None)
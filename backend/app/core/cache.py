@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Protocol
+
+
+class CacheBackend(Protocol):
+    """Shared cache store consulted when the in-process tier misses.
+
+    Implementations own serialization of the cached dicts (e.g. a Redis client).
+    """
+
+    async def get(self, key: str) -> Optional[dict]: ...
+
+    async def set(self, key: str, value: dict, ttl: float) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class InMemoryCacheBackend:
+    """Process-local CacheBackend, standing in for a shared store in tests and dev."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[float, dict]] = {}
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return dict(value)
+
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, dict(value))
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class TTLCache:
+    """Bounded LRU cache with per-entry TTL and an optional shared second tier."""
+
+    def __init__(self, maxsize: int, ttl: float, backend: Optional[CacheBackend] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_local(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get(self, key: str) -> Optional[dict]:
+        value = self._get_local(key)
+        if value is None and self.backend is not None:
+            value = await self.backend.get(key)
+            if value is not None:
+                self._set_local(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        self._set_local(key, value)
+        if self.backend is not None:
+            await self.backend.set(key, value, self.ttl)
+
+    def invalidate(self, key: str) -> None:
+        """Drop a key; callable from sync code such as ORM event hooks.
+
+        The shared-tier delete is scheduled on the running event loop. Without
+        one only the local tier is cleared and the shared entry ages out by TTL.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.backend is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            loop.create_task(self.backend.delete(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Optional
 
 from pydantic_settings import BaseSettings
 
@@ -8,8 +9,117 @@ class Settings(BaseSettings):
     environment: str = "development"
     secret_key: str = "changeme"  # override in production
     database_url: str = "postgresql://vault:changeme@db:5432/vaultdb"
+    # Defaults to database_url with the asyncio driver swapped in.
+    async_database_url: Optional[str] = None
     access_token_expire_minutes: int = 30
 
+    # pbkdf2_sha256 cost; changing it rehashes each password on its next login.
+    password_hash_rounds: int = 29000
+    # "process" (default) or "thread"; 0 workers means one per CPU.
+    password_hash_executor: str = "process"
+    password_hash_workers: int = 0
+    password_hash_max_pending: int = 64
+
+    # Connection pool tuning (applied to PostgreSQL engines).
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800
+    db_statement_timeout_ms: Optional[int] = None
+    # Transaction-pooling PgBouncer: disables server-side prepared statement caching.
+    db_pgbouncer_mode: bool = False
+
+    # Read replicas (sync URLs, as for database_url) for read-only endpoints.
+    # Replicas lagging more than replica_max_lag_seconds are skipped, and a
+    # user's reads stay on the primary for replica_read_your_writes_seconds
+    # after each of their writes.
+    database_replica_urls: list[str] = []
+    replica_max_lag_seconds: float = 5.0
+    replica_read_your_writes_seconds: float = 10.0
+    replica_check_interval_seconds: float = 5.0
+
+    items_page_size_default: int = 200
+    items_page_size_max: int = 1000
+    items_batch_max: int = 5000
+    # Delta sync re-sends changes this close to the previous token, covering
+    # transactions that committed after a sync but stamped an earlier time.
+    sync_overlap_seconds: int = 5
+    # Tombstones of deleted items are kept this long; older change tokens get
+    # 410 and the client syncs from scratch. 0 keeps tombstones forever.
+    sync_tombstone_retention_days: int = 90
+    tombstone_sweep_interval_seconds: float = 3600.0
+    tombstone_sweep_batch_size: int = 1000
+
+    # Authenticated-user cache; other workers only see invalidations after the TTL.
+    user_cache_enabled: bool = True
+    user_cache_max_entries: int = 10000
+    user_cache_ttl_seconds: float = 60.0
+
+    # "background" batches audit rows off the request path; "sync" writes inline.
+    audit_mode: str = "background"
+    audit_batch_size: int = 500
+    audit_flush_interval_seconds: float = 0.5
+    audit_queue_max: int = 10000
+    # Monthly audit_logs partitions older than this are dropped; 0 keeps everything.
+    audit_retention_months: int = 12
+    audit_partitions_ahead_months: int = 3
+    audit_maintenance_interval_seconds: float = 3600.0
+    audit_page_size_default: int = 100
+    audit_page_size_max: int = 500
+
+    # Expired and consumed one-time links are purged this often; 0 disables the sweeper.
+    ot_link_sweep_interval_seconds: float = 300.0
+    ot_link_sweep_batch_size: int = 1000
+
+    # Revoked token ids are re-read from the database this often; 0 disables
+    # the refresh, leaving only revocations made by this process.
+    token_revocation_refresh_seconds: float = 5.0
+    token_revocation_bloom_capacity: int = 100000
+    token_revocation_bloom_error_rate: float = 0.001
+
+    # Token buckets as "<requests>/<seconds>"; an empty string disables that limit.
+    # Auth limits apply to login and register separately.
+    rate_limit_enabled: bool = True
+    rate_limit_auth_ip: str = "20/60"
+    rate_limit_auth_account: str = "10/60"
+    rate_limit_auth_route: str = "200/1"
+    rate_limit_ot_link_ip: str = "60/60"
+    rate_limit_ot_link_route: str = "1000/1"
+    rate_limit_max_keys: int = 100000
+
+    # Operational endpoints under /api/internal are off unless enabled, and then
+    # require "Authorization: Bearer <internal_api_token>".
+    internal_api_enabled: bool = False
+    internal_api_token: str = ""
+
+    # Request timing, per-request SQL accounting and /metrics; off removes the hooks entirely.
+    instrumentation_enabled: bool = True
+    slow_query_ms: float = 200.0
+    slow_request_ms: float = 1000.0
+
+    # Ciphertexts larger than this are kept in the blob store instead of inline.
+    blob_inline_max_bytes: int = 64 * 1024
+    blob_upload_max_bytes: int = 100 * 1024 * 1024
+    blob_chunk_size: int = 64 * 1024
+    # "local" (filesystem under blob_store_path) or "memory".
+    blob_store_backend: str = "local"
+    blob_store_path: str = "data/blobs"
+    # Claims on uploaded blobs that no item or link references after this long
+    # are released (and unclaimed objects deleted); 0 interval disables the sweeper.
+    blob_claim_grace_seconds: float = 86400.0
+    blob_claim_sweep_interval_seconds: float = 3600.0
+    blob_claim_sweep_batch_size: int = 1000
+
+    # Vault export/import: rows per server-side cursor fetch and per insert
+    # batch; an import batch is also flushed once its lines reach
+    # vault_import_batch_max_bytes, and a single line (one item, ciphertext
+    # inline) may not exceed vault_import_max_line_bytes.
+    vault_export_batch_size: int = 500
+    vault_import_batch_size: int = 1000
+    vault_import_batch_max_bytes: int = 16 * 1024 * 1024
+    vault_import_max_line_bytes: int = 128 * 1024 * 1024
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Any, Iterable, Optional, Sequence, Union
+from uuid import UUID
+
+import msgpack
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from sqlalchemy import Row
+
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+VARY_ACCEPT = {"Vary": "Accept"}
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encoding matching pydantic's JSON output (UTC datetimes end in "Z")."""
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_rows(rows: Iterable[Row]) -> ORJSONResponse:
+    """Render column-tuple rows straight to JSON, skipping response_model validation.
+
+    For hot list endpoints whose SELECT already names exactly the schema's
+    columns (e.g. ITEM_META_COLUMNS for ItemMeta): no ORM instances are
+    built and no per-row pydantic model is validated.
+    """
+    return ORJSONResponse([row._asdict() for row in rows])
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Cannot encode {type(obj).__name__} as MessagePack")
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+class MsgPackResponse(Response):
+    """MessagePack body; ``bytes`` fields go out as bin, without base64 or JSON escaping."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
+
+
+def wants_msgpack(request: Request) -> bool:
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def vary_accept(response: Response) -> None:
+    """Route dependency: the endpoint's JSON body is one of several encodings.
+
+    Covers responses built from returned content; responses an endpoint
+    builds itself (MessagePack bodies, 304s) carry ``VARY_ACCEPT`` directly.
+    """
+    response.headers.update(VARY_ACCEPT)
+
+
+def negotiate(
+    request: Request, schema: type[BaseModel], content: Union[Any, Sequence[Any]], status_code: Optional[int] = None
+) -> Any:
+    """Return ``content`` as MessagePack if the client asks for it.
+
+    Otherwise ``content`` is returned untouched for the route's usual
+    ``response_model`` JSON serialization.
+    """
+    if not wants_msgpack(request):
+        return content
+    if isinstance(content, (list, tuple)):
+        body = [schema.model_validate(entry).model_dump() for entry in content]
+    else:
+        body = schema.model_validate(content).model_dump()
+    return MsgPackResponse(body, status_code=status_code or 200, headers=VARY_ACCEPT)
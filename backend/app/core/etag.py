@@ -0,0 +1,49 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+
+
+def item_etag(version: int, updated_at: datetime, variant: str = "") -> str:
+    """Strong ETag of one item representation; ``variant`` tells encodings apart."""
+    return f'"{version}-{int(updated_at.timestamp() * 1_000_000):x}{variant}"'
+
+
+def revision_etag(revision: int, *parts: str) -> str:
+    """Strong ETag of a listing: the vault revision plus whatever selects the page."""
+    digest = hashlib.sha1("\0".join(parts).encode()).hexdigest()[:12]
+    return f'"r{revision}-{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def _tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def none_match(header: Optional[str], etag: str) -> bool:
+    """True if If-None-Match lists ``etag`` (weak comparison, as RFC 9110 requires)."""
+    if not header:
+        return False
+    tags = _tags(header)
+    return "*" in tags or etag in [tag.removeprefix("W/") for tag in tags]
+
+
+def not_modified(etag: str, headers: Optional[dict[str, str]] = None) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **(headers or {})})
+
+
+def check_if_match(header: Optional[str], *etags: str) -> None:
+    """Raise 412 unless If-Match is absent, ``*`` or lists one of ``etags`` (strong comparison)."""
+    if not header:
+        return
+    tags = _tags(header)
+    if "*" not in tags and not any(etag in tags for etag in etags):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Item has changed",
+            headers={"ETag": etags[0]},
+        )
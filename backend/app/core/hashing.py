@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+
+@lru_cache
+def crypt_context(rounds: int) -> CryptContext:
+    # Pinning min/max to the configured cost makes passlib flag any hash made
+    # with a different cost for update, so logins transparently rehash.
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        deprecated="auto",
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+        pbkdf2_sha256__max_rounds=rounds,
+    )
+
+
+def hash_password(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+
+def verify_and_update(password: str, password_hash: str, rounds: int) -> tuple[bool, Optional[str]]:
+    return crypt_context(rounds).verify_and_update(password, password_hash)
+
+
+class PasswordHasher:
+    """Runs password hashing off the event loop on a bounded worker pool.
+
+    Hashes are CPU-bound and hold the GIL, so by default they run in worker
+    processes. At most ``max_pending`` operations may be queued or running;
+    beyond that requests are shed with 429 instead of piling up.
+    """
+
+    def __init__(self, *, rounds: int, workers: int, max_pending: int, executor: str = "process") -> None:
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.executor_kind = executor
+        self._executor: Optional[Executor] = None
+        self.pending = 0
+        self.shed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.shed += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+        """Verify a password; also return a new hash when the stored cost is stale."""
+        return await self._run(verify_and_update, password, password_hash, self.rounds)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        return {"workers": self.workers, "pending": self.pending, "max_pending": self.max_pending, "shed": self.shed}
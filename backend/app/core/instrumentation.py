@@ -0,0 +1,222 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+from app.core.metrics import DEFAULT_LATENCY_BUCKETS, Histogram
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    # Time pooled connections were checked out, attributed at check-in.
+    connection_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Instrumentation:
+    """Per-route request latency, SQL statement and connection hold accounting.
+
+    Statements and connection check-ins are attributed to the request running
+    in the current context, so work done by background tasks is only counted
+    in the global histograms. Statements slower than ``slow_query_seconds`` and requests
+    slower than ``slow_request_seconds`` are logged.
+    """
+
+    def __init__(self, *, slow_query_seconds: float, slow_request_seconds: float) -> None:
+        self.slow_query_seconds = slow_query_seconds
+        self.slow_request_seconds = slow_request_seconds
+        self.query_duration = Histogram()
+        self._durations: dict[tuple[str, str, int], Histogram] = {}
+        self._queries: dict[tuple[str, str], Histogram] = {}
+        self._db_seconds: dict[tuple[str, str], float] = {}
+        self._connection_seconds: dict[tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    # SQLAlchemy hooks
+
+    def instrument_engine(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info["checked_out"] = time.perf_counter()
+
+    def _checkin(self, dbapi_connection, connection_record) -> None:
+        started = connection_record.info.pop("checked_out", None)
+        stats = _request_stats.get()
+        if started is not None and stats is not None:
+            stats.connection_seconds += time.perf_counter() - started
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        self.query_duration.observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+        if elapsed >= self.slow_query_seconds:
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split())[:1000])
+
+    # Requests
+
+    def begin_request(self) -> tuple[RequestStats, Any]:
+        stats = RequestStats()
+        return stats, _request_stats.set(stats)
+
+    def end_request(self, token: Any) -> None:
+        _request_stats.reset(token)
+
+    def observe_request(self, method: str, route: str, status_code: int, elapsed: float, stats: RequestStats) -> None:
+        with self._lock:
+            duration = self._durations.get((method, route, status_code))
+            if duration is None:
+                duration = self._durations[(method, route, status_code)] = Histogram(DEFAULT_LATENCY_BUCKETS)
+            queries = self._queries.get((method, route))
+            if queries is None:
+                queries = self._queries[(method, route)] = Histogram(QUERY_COUNT_BUCKETS)
+            self._db_seconds[(method, route)] = self._db_seconds.get((method, route), 0.0) + stats.db_seconds
+            held = self._connection_seconds.get((method, route))
+            if held is None:
+                held = self._connection_seconds[(method, route)] = Histogram(DEFAULT_LATENCY_BUCKETS)
+        duration.observe(elapsed)
+        queries.observe(stats.queries)
+        if stats.queries:
+            held.observe(stats.connection_seconds)
+        if elapsed >= self.slow_request_seconds:
+            logger.warning(
+                "Slow request %s %s (%d): %.1f ms, %d queries, %.1f ms in DB, connection held %.1f ms",
+                method,
+                route,
+                status_code,
+                elapsed * 1000,
+                stats.queries,
+                stats.db_seconds * 1000,
+                stats.connection_seconds * 1000,
+            )
+
+    # Exposition
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            durations = dict(self._durations)
+            queries = dict(self._queries)
+            db_seconds = dict(self._db_seconds)
+            connection_seconds = dict(self._connection_seconds)
+
+        lines: list[str] = []
+        _histogram(
+            lines,
+            "http_request_duration_seconds",
+            "Request latency by route.",
+            {(("method", m), ("route", r), ("status", str(s))): h for (m, r, s), h in sorted(durations.items())},
+        )
+        _histogram(
+            lines,
+            "http_request_db_queries",
+            "SQL statements executed per request.",
+            {(("method", m), ("route", r)): h for (m, r), h in sorted(queries.items())},
+        )
+        lines.append("# HELP http_request_db_seconds_total Time spent in SQL statements by route.")
+        lines.append("# TYPE http_request_db_seconds_total counter")
+        for (method, route), seconds in sorted(db_seconds.items()):
+            lines.append(f"http_request_db_seconds_total{_labels((('method', method), ('route', route)))} {seconds}")
+        _histogram(
+            lines,
+            "http_request_db_connection_seconds",
+            "Time a request held pooled database connections, for requests that queried.",
+            {(("method", m), ("route", r)): h for (m, r), h in sorted(connection_seconds.items())},
+        )
+        _histogram(lines, "db_query_duration_seconds", "SQL statement latency.", {(): self.query_duration})
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs: tuple[tuple[str, str], ...]) -> str:
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _histogram(lines: list[str], name: str, help_text: str, series: dict[tuple, Histogram]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in series.items():
+        snapshot = histogram.snapshot()
+        for bound, count in snapshot["buckets"].items():
+            lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {snapshot['sum']}")
+        lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware timing each HTTP request, including streamed bodies.
+
+    Adds a ``Server-Timing`` header with the statements run and the connection
+    hold time released before the response started.
+    """
+
+    def __init__(self, app, instrumentation: Instrumentation) -> None:
+        self.app = app
+        self.instrumentation = instrumentation
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats, token = self.instrumentation.begin_request()
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"dbconn;dur={stats.connection_seconds * 1000:.1f}, "
+                    f"app;dur={(time.perf_counter() - started) * 1000:.1f}"
+                )
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.instrumentation.end_request(token)
+            route = scope.get("route")
+            self.instrumentation.observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+                time.perf_counter() - started,
+                stats,
+            )
+
+
+instrumentation = Instrumentation(
+    slow_query_seconds=settings.slow_query_ms / 1000,
+    slow_request_seconds=settings.slow_request_ms / 1000,
+)
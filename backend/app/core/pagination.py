@@ -0,0 +1,55 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(ts: datetime, key: object) -> str:
+    """Opaque keyset cursor for the row at (ts, key)."""
+    raw = json.dumps([ts.isoformat(), str(key)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, key = json.loads(raw)
+        return datetime.fromisoformat(ts), str(key)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_change_token(ts: datetime) -> str:
+    """Opaque delta-sync token marking the server time a sync was served at."""
+    return base64.urlsafe_b64encode(ts.isoformat().encode()).decode().rstrip("=")
+
+
+def decode_change_token(token: str) -> datetime:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        return datetime.fromisoformat(raw.decode())
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid change token")
+
+
+def encode_sync_cursor(token: str, ts: datetime, key: object) -> str:
+    """Keyset cursor of a paged full sync; carries the change token of its first page."""
+    return f"{token}.{encode_cursor(ts, key)}"
+
+
+def decode_sync_cursor(cursor: str) -> tuple[str, datetime, str]:
+    token, _, position = cursor.partition(".")
+    decode_change_token(token)
+    ts, key = decode_cursor(position)
+    return token, ts, key
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,170 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Token bucket of ``capacity`` requests refilled evenly over ``period`` seconds."""
+
+    capacity: int
+    period: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, spec: str) -> Optional["Rate"]:
+        """Parse ``"<requests>/<seconds>"``; an empty spec means no limit."""
+        if not spec:
+            return None
+        capacity, period = spec.split("/")
+        return cls(int(capacity), float(period))
+
+
+class RateLimitBackend(Protocol):
+    """Token bucket store; a shared one (e.g. Redis with a Lua script) spans workers."""
+
+    async def acquire(self, key: str, rate: Rate) -> float:
+        """Take one token; return 0 if allowed, else seconds until a token is available."""
+        ...
+
+
+class InMemoryRateLimitBackend:
+    """Process-local token buckets, bounded to ``max_keys`` least recently used keys.
+
+    Also stands in for a shared store in tests and single-worker deployments.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str, rate: Rate) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(rate.capacity), now))
+            tokens = min(float(rate.capacity), tokens + (now - updated) * rate.refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate.refill_per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    per_ip: Optional[Rate] = None
+    per_account: Optional[Rate] = None
+    per_route: Optional[Rate] = None
+
+
+class RateLimiter:
+    """Per-IP, per-account and per-route token buckets checked before any real work.
+
+    Buckets are first taken from the process-local backend, so a burst
+    against one worker is rejected without a round-trip; a configured shared
+    backend then enforces the same limits across workers.
+    """
+
+    def __init__(
+        self,
+        policies: dict[str, RoutePolicy],
+        *,
+        local: Optional[InMemoryRateLimitBackend] = None,
+        shared: Optional[RateLimitBackend] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.policies = policies
+        self.local = local or InMemoryRateLimitBackend()
+        self.shared = shared
+        self.enabled = enabled
+        self.rejected: dict[str, int] = {}
+
+    async def _acquire(self, key: str, rate: Rate) -> float:
+        wait = await self.local.acquire(key, rate)
+        if wait == 0 and self.shared is not None:
+            wait = await self.shared.acquire(key, rate)
+        return wait
+
+    async def check(self, route: str, *, ip: Optional[str], account: Optional[str] = None) -> None:
+        """Raise 429 with Retry-After if any of the route's limits is exhausted."""
+        policy = self.policies.get(route)
+        if not self.enabled or policy is None:
+            return
+        limits = []
+        if ip:
+            limits.append((f"ip:{route}:{ip}", policy.per_ip))
+        if account:
+            # Hashed so arbitrary submitted usernames cannot bloat keys.
+            digest = hashlib.sha256(account.strip().lower().encode()).hexdigest()[:32]
+            limits.append((f"account:{route}:{digest}", policy.per_account))
+        # The shared route bucket goes last, so requests one client's own
+        # buckets reject never drain it for everyone else.
+        limits.append((f"route:{route}", policy.per_route))
+
+        for key, rate in limits:
+            if rate is None:
+                continue
+            wait = await self._acquire(key, rate)
+            if wait > 0:
+                self.rejected[route] = self.rejected.get(route, 0) + 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests, retry later",
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+
+    def stats(self) -> dict[str, Any]:
+        return {"enabled": self.enabled, "shared": self.shared is not None, "rejected": dict(self.rejected)}
+
+
+def client_ip(request: Request) -> Optional[str]:
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the real client.
+    return request.client.host if request.client else None
+
+
+rate_limiter = RateLimiter(
+    {
+        route: RoutePolicy(
+            per_ip=Rate.parse(settings.rate_limit_auth_ip),
+            per_account=Rate.parse(settings.rate_limit_auth_account),
+            per_route=Rate.parse(settings.rate_limit_auth_route),
+        )
+        for route in ("login", "register")
+    }
+    | {
+        "ot_link_fetch": RoutePolicy(
+            per_ip=Rate.parse(settings.rate_limit_ot_link_ip),
+            per_route=Rate.parse(settings.rate_limit_ot_link_route),
+        )
+    },
+    local=InMemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys),
+    enabled=settings.rate_limit_enabled,
+)
+
+
+def get_rate_limiter() -> RateLimiter:
+    return rate_limiter
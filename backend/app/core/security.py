@@ -1,22 +1,46 @@
+import secrets
+import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import AsyncIterator, Optional
+from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
+from app.core.hashing import PasswordHasher, crypt_context
+from app.db import queries
+from app.db.replicas import bind_session_user, replica_router
 from app.db.session import get_db
 from app.models import User
+from app.services.token_revocation import token_denylist
 
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 settings = get_settings()
 
+pwd_context = crypt_context(settings.password_hash_rounds)
+
+password_hasher = PasswordHasher(
+    rounds=settings.password_hash_rounds,
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    executor=settings.password_hash_executor,
+)
+
+# Snapshot of the user row kept per user id. Secrets (password hash, 2FA
+# secret) are never cached, so a cached user must not be written back.
+USER_CACHE_FIELDS = ("id", "email", "created_at", "last_login", "two_fa_enabled", "master_salt", "created_by")
+
+user_cache = TTLCache(maxsize=settings.user_cache_max_entries, ttl=settings.user_cache_ttl_seconds)
+
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
     return pwd_context.verify(plain_password, password_hash)
@@ -30,24 +54,58 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.access_token_expire_minutes)
 
-    expire = datetime.now(tz=timezone.utc) + expires_delta
-    to_encode = {"sub": subject, "exp": expire}
+    now = datetime.now(tz=timezone.utc)
+    # jti identifies the token so it can be revoked before it expires.
+    to_encode = {"sub": subject, "exp": now + expires_delta, "iat": now, "jti": uuid.uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm="HS256")
     return encoded_jwt
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(queries.USER_BY_EMAIL, {"email": email})
+    return result.scalars().first()
 
 
-def get_user(db: Session, user_id: str) -> Optional[User]:
-    return db.query(User).filter(User.id == user_id).first()
+async def get_user(db: AsyncSession, user_id: str) -> Optional[User]:
+    result = await db.execute(queries.USER_BY_ID, {"user_id": UUID(user_id)})
+    return result.scalars().first()
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+async def get_cached_user(db: AsyncSession, user_id: str) -> Optional[User]:
+    """get_user through user_cache; returns a detached, read-only User on a hit."""
+    if not settings.user_cache_enabled:
+        return await get_user(db, user_id)
+
+    key = str(UUID(user_id))
+    cached = await user_cache.get(key)
+    if cached is not None:
+        return User(**cached)
+
+    user = await get_user(db, user_id)
+    if user is not None:
+        await user_cache.set(key, {field: getattr(user, field) for field in USER_CACHE_FIELDS})
+    return user
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    user_cache.invalidate(str(target.id))
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("invalidated_user_ids", set()).add(str(target.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    # Invalidate again once committed, in case a concurrent request re-cached
+    # the old row between the flush and the commit.
+    for user_id in session.info.pop("invalidated_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """Decode a bearer token, rejecting it if it has been revoked."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -55,16 +113,95 @@ async def get_current_user(
     )
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
         raise credentials_exception
-
-    user = get_user(db, user_id=user_id)
+    if payload.get("sub") is None:
+        raise credentials_exception
+    jti = payload.get("jti")
+    if jti is not None and token_denylist.is_revoked(jti):
+        raise credentials_exception
+    return payload
+
+
+def require_internal_access(authorization: Optional[str] = Header(None)) -> None:
+    """Gate operational endpoints behind ``internal_api_enabled`` and a shared token.
+
+    Disabled endpoints answer 404; enabled ones need
+    ``Authorization: Bearer <internal_api_token>``, which Prometheus sends
+    through its scrape ``authorization`` setting.
+    """
+    if not settings.internal_api_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    expected = settings.internal_api_token
+    if not expected or scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def get_read_db(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db),
+) -> AsyncIterator[AsyncSession]:
+    """Session for a read-only endpoint: a read replica when one is usable.
+
+    Falls back to the request's primary session when there are no healthy,
+    current replicas, the user wrote recently (read-your-writes), or the
+    chosen replica cannot be reached.
+    """
+    replica = await replica_router.choose(claims["sub"])
+    if replica is None:
+        yield db
+        return
+    read_db = replica.sessionmaker()
+    try:
+        # Connect before the endpoint runs, so a dead replica costs a retry
+        # on the primary instead of a failed request.
+        await read_db.connection()
+    except (OperationalError, OSError):
+        replica_router.mark_failed(replica)
+        await read_db.close()
+        yield db
+        return
+    async with read_db:
+        try:
+            yield read_db
+        except (OperationalError, OSError):
+            replica_router.mark_failed(replica)
+            raise
+
+
+async def _load_user(db: AsyncSession, claims: dict) -> User:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        user = await get_cached_user(db, user_id=claims["sub"])
+    except ValueError:
+        raise credentials_exception
     if user is None:
         raise credentials_exception
 
     return user
 
 
+async def get_current_user(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    user = await _load_user(db, claims)
+    bind_session_user(db, str(user.id))
+    return user
+
+
+async def get_current_reader(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_read_db),
+) -> User:
+    """get_current_user for read-only endpoints, loading the user through get_read_db."""
+    return await _load_user(db, claims)
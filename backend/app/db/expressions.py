@@ -0,0 +1,32 @@
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import String, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def is_postgres(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "postgresql"
+
+
+def id_in(db: AsyncSession, target, ids: Sequence[UUID]):
+    """``target = ANY(:ids)`` on Postgres (one array parameter), ``IN`` elsewhere."""
+    if is_postgres(db):
+        return target == any_(bindparam(None, list(ids), type_=ARRAY(target.type)))
+    return target.in_(ids)
+
+
+def tags_match(db: AsyncSession, target, tags: Sequence[str], *, match_all: bool):
+    """Rows whose tag array holds all (``@>``) or any (``&&``) of ``tags``.
+
+    Both operators are served by the GIN index on Postgres; SQLite stores the
+    array as JSON and is matched through ``json_each``.
+    """
+    tags = sorted(set(tags))
+    if is_postgres(db):
+        param = bindparam(None, tags, type_=ARRAY(String))
+        return target.contains(param) if match_all else target.overlap(param)
+    each = func.json_each(target).table_valued("value")
+    hits = select(func.count(func.distinct(each.c.value))).where(each.c.value.in_(tags)).scalar_subquery()
+    return hits == len(tags) if match_all else hits > 0
@@ -0,0 +1,21 @@
+import zlib
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+def advisory_lock_key(name: str) -> int:
+    """Stable 32-bit key for a named Postgres advisory lock."""
+    return zlib.crc32(name.encode())
+
+
+async def try_advisory_xact_lock(conn: AsyncConnection, name: str) -> bool:
+    """Take a transaction-scoped advisory lock without waiting.
+
+    Used for leader election among workers running the same background job:
+    the lock is released at commit, so it is safe behind a transaction-pooling
+    PgBouncer. Backends without advisory locks (SQLite in tests) always win.
+    """
+    if conn.dialect.name != "postgresql":
+        return True
+    return bool(await conn.scalar(select(func.pg_try_advisory_xact_lock(advisory_lock_key(name)))))
@@ -0,0 +1,280 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import engine_options, to_async_url
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Seconds a streaming replica is behind its primary; 0 when it has replayed
+# everything it received, so an idle primary does not look like lag.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker = field(init=False)
+    healthy: bool = True
+    lag_seconds: Optional[float] = None
+    failures: int = 0
+    reads: int = 0
+
+    def __post_init__(self) -> None:
+        self.sessionmaker = async_sessionmaker(self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+class PinBackend(Protocol):
+    """Read-your-writes pins; a shared store (e.g. Redis keys with a TTL) spans workers."""
+
+    async def pin(self, user_id: str, seconds: float) -> None: ...
+
+    async def pinned(self, user_id: str) -> bool: ...
+
+
+class InMemoryPinBackend:
+    """Process-local PinBackend, standing in for a shared store in tests and dev."""
+
+    def __init__(self) -> None:
+        self._until: dict[str, float] = {}
+
+    async def pin(self, user_id: str, seconds: float) -> None:
+        self._until[user_id] = time.monotonic() + seconds
+
+    async def pinned(self, user_id: str) -> bool:
+        until = self._until.get(user_id)
+        if until is not None and until <= time.monotonic():
+            self._until.pop(user_id, None)
+            until = None
+        return until is not None
+
+
+class ReplicaRouter:
+    """Chooses where a read-only request runs: a read replica or the primary.
+
+    Replicas are used round-robin while they pass the periodic health check
+    and lag at most ``max_lag_seconds`` behind. A user who committed a write
+    in the last ``sticky_seconds`` reads from the primary, so they always see
+    their own changes. With no usable replica every read goes to the primary.
+
+    Pins are kept in process memory, so a write only pins the worker that
+    served it; a configured ``shared`` backend carries them to every worker.
+    """
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        *,
+        max_lag_seconds: float,
+        sticky_seconds: float,
+        check_interval: float,
+        max_sticky_users: int = 100_000,
+        shared: Optional[PinBackend] = None,
+    ) -> None:
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.sticky_seconds = sticky_seconds
+        self.check_interval = check_interval
+        self.max_sticky_users = max_sticky_users
+        self.shared = shared
+        self._next = itertools.count()
+        self._sticky: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pins: set[asyncio.Task] = set()
+        self.primary_reads = 0
+        self.sticky_reads = 0
+
+    # Routing
+
+    def mark_write(self, user_id: str) -> None:
+        """Pin a user to the primary; callable from sync code such as ORM event hooks.
+
+        The shared pin is written by a task on the running event loop, which
+        starts while the response that follows the commit is being sent.
+        """
+        if not self.replicas:
+            return
+        with self._lock:
+            self._sticky[user_id] = time.monotonic() + self.sticky_seconds
+            self._sticky.move_to_end(user_id)
+            while len(self._sticky) > self.max_sticky_users:
+                self._sticky.popitem(last=False)
+        if self.shared is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            task = loop.create_task(self.shared.pin(user_id, self.sticky_seconds))
+            self._pins.add(task)
+            task.add_done_callback(self._pins.discard)
+
+    async def _is_sticky(self, user_id: Optional[str]) -> bool:
+        if user_id is None:
+            return False
+        with self._lock:
+            until = self._sticky.get(user_id)
+            if until is not None and until <= time.monotonic():
+                del self._sticky[user_id]
+                until = None
+        if until is not None:
+            return True
+        if self.shared is None:
+            return False
+        try:
+            return await self.shared.pinned(user_id)
+        except Exception:
+            # Without the shared pins, the primary is the only safe choice.
+            logger.warning("Read-your-writes pin lookup failed", exc_info=True)
+            return True
+
+    def _usable(self, replica: Replica) -> bool:
+        return replica.healthy and (replica.lag_seconds or 0) <= self.max_lag_seconds
+
+    async def choose(self, user_id: Optional[str] = None) -> Optional[Replica]:
+        """A replica for this read, or None to use the primary."""
+        if not self.replicas:
+            return None
+        if await self._is_sticky(user_id):
+            self.sticky_reads += 1
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self._usable(replica):
+                replica.reads += 1
+                return replica
+        self.primary_reads += 1
+        return None
+
+    def mark_failed(self, replica: Replica) -> None:
+        # Taken out of rotation until the next successful health check.
+        replica.healthy = False
+        replica.failures += 1
+
+    # Health checks
+
+    async def check(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    if conn.dialect.name == "postgresql":
+                        lag = float(await conn.scalar(REPLICA_LAG_SQL))
+                    else:
+                        await conn.execute(text("SELECT 1"))
+                        lag = 0.0
+            except Exception:
+                if replica.healthy:
+                    logger.warning("Read replica %s failed its health check", replica.name, exc_info=True)
+                self.mark_failed(replica)
+                continue
+            replica.healthy = True
+            replica.lag_seconds = lag
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running or not self.replicas or self.check_interval <= 0:
+            return
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.running:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "shared_pins": self.shared is not None,
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "failures": replica.failures,
+                    "reads": replica.reads,
+                }
+                for replica in self.replicas
+            ],
+        }
+
+
+def bind_session_user(db: AsyncSession, user_id: str) -> None:
+    """Attribute the session's writes to a user, for read-your-writes routing."""
+    db.sync_session.info["user_id"] = user_id
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush_writes(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement_writes(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _stick_writer_to_primary(session: Session) -> None:
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        replica_router.mark_write(str(user_id))
+
+
+def _create_replica(url: str) -> Replica:
+    async_url = to_async_url(url)
+    return Replica(
+        name=make_url(url).render_as_string(hide_password=True),
+        engine=create_async_engine(async_url, **engine_options(async_url, settings, is_async=True)),
+    )
+
+
+replica_router = ReplicaRouter(
+    [_create_replica(url) for url in settings.database_replica_urls],
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    sticky_seconds=settings.replica_read_your_writes_seconds,
+    check_interval=settings.replica_check_interval_seconds,
+)
@@ -1,21 +1,90 @@
+from uuid import uuid4
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 
 
 class Base(DeclarativeBase):
     pass
 
 
+# Async drivers used for each sync backend named in DATABASE_URL.
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Rewrite a sync SQLAlchemy URL to use the matching asyncio driver."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for backend {backend!r}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def engine_options(database_url: str, settings: Settings, *, is_async: bool) -> dict:
+    """Pool and connection options for an engine; only PostgreSQL is tuned."""
+    if make_url(database_url).get_backend_name() != "postgresql":
+        return {}
+
+    options: dict = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    connect_args: dict = {}
+
+    if settings.db_pgbouncer_mode:
+        # PgBouncer in transaction mode cannot track named prepared statements
+        # across server connections, and rejects unknown startup parameters, so
+        # statement_timeout must be set on the role instead.
+        if is_async:
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    elif settings.db_statement_timeout_ms:
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
 settings = get_settings()
 
-engine = create_engine(settings.database_url, future=True)
+# Sync engine: used by Alembic, scripts and tests that seed data directly.
+engine = create_engine(
+    settings.database_url,
+    future=True,
+    **engine_options(settings.database_url, settings, is_async=False),
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 
+# Async engine: used by the request path.
+async_database_url = settings.async_database_url or to_async_url(settings.database_url)
+async_engine = create_async_engine(
+    async_database_url,
+    **engine_options(async_database_url, settings, is_async=True),
+)
 
-def get_db():
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
@@ -23,3 +92,8 @@ def get_db():
         db.close()
 
 
+async def get_db():
+    # The session checks out a connection on its first statement only; routes
+    # built with SessionReleasingRoute return it as soon as the endpoint ends.
+    async with AsyncSessionLocal() as db:
+        yield db
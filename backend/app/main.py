@@ -1,7 +1,75 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.api import router as api_router
+from app.core.config import get_settings
+from app.core.encoding import ORJSONResponse
+from app.core.instrumentation import InstrumentationMiddleware, instrumentation
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import password_hasher, require_internal_access
+from app.db.queries import warm_up
+from app.db.replicas import replica_router
+from app.db.session import async_engine, engine
+from app.services.audit import audit_writer
+from app.services.audit_partitions import run_audit_maintenance_loop
+from app.services.blobs import blob_claim_sweeper
+from app.services.item_tombstones import tombstone_sweeper
+from app.services.ot_links import ot_link_sweeper
+from app.services.token_revocation import token_denylist
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.audit_mode == "background":
+        await audit_writer.start()
+    maintenance = None
+    if settings.audit_maintenance_interval_seconds > 0:
+        maintenance = asyncio.create_task(
+            run_audit_maintenance_loop(
+                async_engine,
+                interval=settings.audit_maintenance_interval_seconds,
+                retention_months=settings.audit_retention_months,
+                months_ahead=settings.audit_partitions_ahead_months,
+            )
+        )
+    try:
+        await warm_up(async_engine)
+    except Exception:
+        logger.warning("Statement warm-up failed; continuing with a cold cache", exc_info=True)
+    await ot_link_sweeper.start()
+    await blob_claim_sweeper.start()
+    await tombstone_sweeper.start()
+    await token_denylist.start()
+    await replica_router.start()
+    try:
+        yield
+    finally:
+        if maintenance is not None:
+            maintenance.cancel()
+            with suppress(asyncio.CancelledError):
+                await maintenance
+        await replica_router.stop()
+        await token_denylist.stop()
+        await tombstone_sweeper.stop()
+        await blob_claim_sweeper.stop()
+        await ot_link_sweeper.stop()
+        await audit_writer.stop()
+        password_hasher.shutdown()
+
+
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of request and SQL metrics."""
+    return PlainTextResponse(instrumentation.render_prometheus(), media_type="text/plain; version=0.0.4")
 
 
 def create_app() -> FastAPI:
@@ -9,6 +77,8 @@ def create_app() -> FastAPI:
         title="Aami API",
         version="0.1.0",
         description="Password Vault backend for Aami.",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     origins = [
@@ -24,8 +94,20 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
     )
 
+    if settings.instrumentation_enabled:
+        instrumentation.instrument_engine(async_engine.sync_engine)
+        instrumentation.instrument_engine(engine)
+        for replica in replica_router.replicas:
+            instrumentation.instrument_engine(replica.engine.sync_engine)
+        app.add_middleware(InstrumentationMiddleware, instrumentation=instrumentation)
+        # Same gate as /api/internal; Prometheus sends the token via its scrape authorization.
+        app.add_api_route(
+            "/metrics", metrics, include_in_schema=False, dependencies=[Depends(require_internal_access)]
+        )
+
     app.include_router(api_router, prefix="/api")
 
     return app
@@ -1,8 +1,13 @@
 from .user import User
 from .item import Item
+from .item_tombstone import ItemTombstone
+from .item_search_token import ItemSearchToken
+from .item_tag_count import ItemTagCount
 from .ot_link import OTLink
 from .audit_log import AuditLog
+from .blob import Blob, BlobObject
+from .revoked_token import RevokedToken
 
-__all__ = ["User", "Item", "OTLink", "AuditLog"]
+__all__ = ["User", "Item", "ItemTombstone", "ItemSearchToken", "ItemTagCount", "OTLink", "AuditLog", "Blob", "BlobObject", "RevokedToken"]
 
 
@@ -1,21 +1,25 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from app.db.session import Base
 
 
 class AuditLog(Base):
+    # On PostgreSQL the table is range-partitioned by month on ts, with
+    # primary key (id, ts); see migration 0004 and app.services.audit_partitions.
     __tablename__ = "audit_logs"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
 
     action = Column(String, nullable=False)
     ip_address = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
-    details = Column(JSONB, nullable=True)
+    details = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=True)
     ts = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
-
+    __table_args__ = (
+        Index("ix_audit_logs_user_id_ts", user_id, ts.desc()),
+    )
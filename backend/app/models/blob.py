@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.session import Base
+
+
+class Blob(Base):
+    """A user's claim on a ciphertext held in the blob store, keyed by its SHA-256.
+
+    The stored object is shared by everyone who uploaded identical bytes; a
+    row here records that this owner has proven possession of them.
+    """
+
+    __tablename__ = "blobs"
+
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    digest = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+
+class BlobObject(Base):
+    """One row per object in the blob store, locked while it is claimed or collected.
+
+    Storing bytes takes this row's lock before checking the store, and garbage
+    collection takes it before checking for claims, so an object can never be
+    deleted between another request's upload and its claim committing.
+    """
+
+    __tablename__ = "blob_objects"
+
+    digest = Column(String(64), primary_key=True)
+    claimed_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
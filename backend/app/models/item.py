@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, Index
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text
 from sqlalchemy.dialects.postgresql import UUID, BYTEA, ARRAY
 
 from app.db.session import Base
@@ -11,14 +11,16 @@ class Item(Base):
     __tablename__ = "items"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-
-    title_hmac = Column(Text, nullable=True, index=True)
-    encrypted_blob = Column(BYTEA, nullable=False)
-    iv = Column(BYTEA, nullable=False)
-    salt = Column(BYTEA, nullable=False)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    title_hmac = Column(Text, nullable=True)
+    # Ciphertexts above blob_inline_max_bytes live in the blob store under blob_ref.
+    encrypted_blob = Column(BYTEA().with_variant(LargeBinary(), "sqlite"), nullable=True)
+    blob_ref = Column(String(64), nullable=True)
+    iv = Column(BYTEA().with_variant(LargeBinary(), "sqlite"), nullable=False)
+    salt = Column(BYTEA().with_variant(LargeBinary(), "sqlite"), nullable=False)
     version = Column(Integer, nullable=False, default=1)
-    tags = Column(ARRAY(String), nullable=True)
+    tags = Column(ARRAY(String).with_variant(JSON(), "sqlite"), nullable=True)
 
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at = Column(
@@ -29,8 +31,15 @@ class Item(Base):
     )
 
     __table_args__ = (
-        Index("ix_items_owner_id", "owner_id"),
+        # Serves owner-scoped listing and keyset pagination newest first.
+        Index("ix_items_owner_id_created_at_id", owner_id, created_at.desc(), id),
+        # Serves delta sync: items changed since a client's change token.
+        Index("ix_items_owner_id_updated_at", "owner_id", "updated_at"),
         Index("ix_items_title_hmac", "title_hmac"),
+        # Serves tag filters (@> for all, && for any).
+        Index("ix_items_tags", "tags", postgresql_using="gin"),
     )
 
 
+# Columns behind ItemMeta; selecting these avoids loading the BYTEA payloads.
+ITEM_META_COLUMNS = (Item.id, Item.title_hmac, Item.tags, Item.version, Item.created_at, Item.updated_at)
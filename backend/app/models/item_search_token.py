@@ -0,0 +1,19 @@
+from sqlalchemy import Column, ForeignKey, Index, Text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.session import Base
+
+
+class ItemSearchToken(Base):
+    """Blind-index entry: one client-computed HMAC token (word or prefix) of an item."""
+
+    __tablename__ = "item_search_tokens"
+
+    # Primary key order serves lookups by (owner_id, token).
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    token = Column(Text, primary_key=True)
+    item_id = Column(UUID(as_uuid=True), ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_item_search_tokens_item_id", "item_id"),
+    )
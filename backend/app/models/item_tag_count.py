@@ -0,0 +1,14 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.session import Base
+
+
+class ItemTagCount(Base):
+    """Number of a user's items carrying a tag, kept current on every item write."""
+
+    __tablename__ = "item_tag_counts"
+
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.session import Base
+
+
+class ItemTombstone(Base):
+    """Marker left behind by a deleted item so delta sync can report it."""
+
+    __tablename__ = "item_tombstones"
+
+    item_id = Column(UUID(as_uuid=True), primary_key=True)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_item_tombstones_owner_id_deleted_at", "owner_id", "deleted_at"),
+        # Retention sweeps, across owners.
+        Index("ix_item_tombstones_deleted_at", "deleted_at"),
+    )
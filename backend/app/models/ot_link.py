@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, LargeBinary, String
 from sqlalchemy.dialects.postgresql import UUID, BYTEA
 
 from app.db.session import Base
@@ -13,9 +13,11 @@ class OTLink(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
-    encrypted_payload = Column(BYTEA, nullable=False)
-    salt = Column(BYTEA, nullable=False)
-    iv = Column(BYTEA, nullable=False)
+    # Payloads above blob_inline_max_bytes live in the blob store under payload_ref.
+    encrypted_payload = Column(BYTEA().with_variant(LargeBinary(), "sqlite"), nullable=True)
+    payload_ref = Column(String(64), nullable=True)
+    salt = Column(BYTEA().with_variant(LargeBinary(), "sqlite"), nullable=False)
+    iv = Column(BYTEA().with_variant(LargeBinary(), "sqlite"), nullable=False)
     expiry = Column(DateTime(timezone=True), nullable=False)
     single_use = Column(Boolean, nullable=False, default=True)
     used = Column(Boolean, nullable=False, default=False)
@@ -24,6 +26,8 @@ class OTLink(Base):
 
     __table_args__ = (
         Index("ix_ot_links_expiry", "expiry"),
+        # Consumed links awaiting the sweeper; stays small as they are purged.
+        Index("ix_ot_links_used", "expiry", postgresql_where=used.is_(True)),
     )
 
 
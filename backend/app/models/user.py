@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, String, Text
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, LargeBinary, String, Text
 from sqlalchemy.dialects.postgresql import UUID, BYTEA
 
 from app.db.session import Base
@@ -20,9 +20,12 @@ class User(Base):
     two_fa_secret = Column(Text, nullable=True)
 
     # Client-derived salt for master key derivation (never a key itself).
-    master_salt = Column(BYTEA, nullable=True)
+    master_salt = Column(BYTEA().with_variant(LargeBinary(), "sqlite"), nullable=True)
 
     created_by = Column(UUID(as_uuid=True), nullable=True)
 
+    # Bumped on every item write; listing ETags are derived from it.
+    vault_revision = Column(BigInteger, default=0, server_default="0", nullable=False)
+
 
 
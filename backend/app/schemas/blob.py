@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class BlobRead(BaseModel):
+    digest: str
+    size: int
@@ -1,8 +1,15 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, StringConstraints, model_validator
+
+
+# Blind-index tokens are HMACs of title words/prefixes computed client-side.
+MAX_SEARCH_TOKENS = 512
+
+# SHA-256 digest of a ciphertext uploaded to /api/blobs.
+BlobRef = Annotated[str, StringConstraints(pattern=r"^[0-9a-f]{64}$")]
 
 
 class ItemBase(BaseModel):
@@ -11,19 +18,30 @@ class ItemBase(BaseModel):
 
 
 class ItemCreate(ItemBase):
-    encrypted_blob: bytes
+    # Exactly one of encrypted_blob (inline) and blob_ref (uploaded blob).
+    encrypted_blob: Optional[bytes] = None
+    blob_ref: Optional[BlobRef] = None
     iv: bytes
     salt: bytes
     version: int = 1
+    search_tokens: Optional[List[str]] = Field(None, max_length=MAX_SEARCH_TOKENS)
+
+    @model_validator(mode="after")
+    def check_payload(self) -> "ItemCreate":
+        if (self.encrypted_blob is None) == (self.blob_ref is None):
+            raise ValueError("Provide exactly one of encrypted_blob and blob_ref")
+        return self
 
 
 class ItemUpdate(BaseModel):
     encrypted_blob: Optional[bytes] = None
+    blob_ref: Optional[BlobRef] = None
     iv: Optional[bytes] = None
     salt: Optional[bytes] = None
     title_hmac: Optional[str] = None
     tags: Optional[List[str]] = None
     version: Optional[int] = None
+    search_tokens: Optional[List[str]] = Field(None, max_length=MAX_SEARCH_TOKENS)
 
 
 class ItemMeta(BaseModel):
@@ -38,9 +56,66 @@ class ItemMeta(BaseModel):
         from_attributes = True
 
 
+class ItemSearchHit(ItemMeta):
+    matches: int
+
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+    class Config:
+        from_attributes = True
+
+
 class ItemDetail(ItemMeta):
-    encrypted_blob: bytes
+    # Null when the ciphertext is in the blob store; fetch /api/blobs/{blob_ref}.
+    encrypted_blob: Optional[bytes]
+    blob_ref: Optional[str] = None
     iv: bytes
     salt: bytes
 
 
+class ItemSyncResponse(BaseModel):
+    changed: List[ItemDetail]
+    deleted: List[UUID]
+    token: str
+
+
+class ItemBatchUpdate(ItemUpdate):
+    id: UUID
+    # Version the client last saw; the update is rejected if the row has moved on.
+    expected_version: int
+
+
+class ItemBatchRequest(BaseModel):
+    create: List[ItemCreate] = []
+    update: List[ItemBatchUpdate] = []
+    delete: List[UUID] = []
+
+
+class ItemBatchResult(BaseModel):
+    id: UUID
+    status: Literal["created", "updated", "deleted", "conflict", "not_found"]
+    version: Optional[int] = None
+
+
+class ItemBatchResponse(BaseModel):
+    created: List[ItemBatchResult]
+    updated: List[ItemBatchResult]
+    deleted: List[ItemBatchResult]
+
+
+class ItemExport(ItemCreate):
+    """One item line of a vault export, with the ciphertext always inline."""
+
+    id: UUID
+    created_at: datetime
+    # Informational; an import stamps items with its own time so delta sync sees them.
+    updated_at: Optional[datetime] = None
+
+
+class VaultImportResult(BaseModel):
+    imported: int
+    # Lines whose item id the importer already has (e.g. re-importing the same export).
+    skipped: int
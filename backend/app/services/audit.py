@@ -1,13 +1,130 @@
-from typing import Any, Optional
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Callable, Optional
 
 from fastapi import Request
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
 from app.models import AuditLog, User
 
 
-def log_action(
-    db: Session,
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Background pipeline that batches audit rows into multi-row INSERTs.
+
+    Rows are flushed when ``batch_size`` accumulate or ``flush_interval``
+    seconds pass after the first queued row. When the writer is not running
+    or its queue is full, ``submit`` refuses the row and the caller writes it
+    inline, so bursts slow requests down rather than losing audit entries.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        *,
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flushed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything already queued, then stop the background task."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def submit(self, row: dict[str, Any]) -> bool:
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self.flush(batch)
+
+    async def flush(self, rows: list[dict[str, Any]]) -> None:
+        try:
+            async with self.session_factory() as db:
+                await db.execute(insert(AuditLog.__table__), rows)
+                await db.commit()
+        except Exception:
+            self.failed += len(rows)
+            logger.exception("Failed to write %d audit log rows", len(rows))
+        else:
+            self.flushed += len(rows)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+audit_writer = AuditWriter(
+    AsyncSessionLocal,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval_seconds,
+    max_queue=settings.audit_queue_max,
+)
+
+
+async def log_action(
+    db: AsyncSession,
     *,
     user: Optional[User],
     action: str,
@@ -21,14 +138,17 @@ def log_action(
         ip = request.client.host if request.client else None
         user_agent = request.headers.get("user-agent")
 
-    entry = AuditLog(
-        user_id=user.id if user else None,
-        action=action,
-        ip_address=ip,
-        user_agent=user_agent,
-        details=details or {},
-    )
-    db.add(entry)
-    db.commit()
-
+    row = {
+        "user_id": user.id if user else None,
+        "action": action,
+        "ip_address": ip,
+        "user_agent": user_agent,
+        "details": details or {},
+        "ts": datetime.utcnow(),
+    }
+    if audit_writer.submit(row):
+        return
 
+    # Sync mode, writer not started (e.g. tests without lifespan) or queue full.
+    db.add(AuditLog(**row))
+    await db.commit()
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.db.locks import try_advisory_xact_lock
+from app.models import AuditLog
+
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"audit_logs_{month:%Y_%m}"
+
+
+async def ensure_partitions(conn: AsyncConnection, today: date, months_ahead: int) -> list[str]:
+    """Create monthly partitions from the current month through months_ahead."""
+    current = today.replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        exists = await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+        if exists:
+            continue
+        start, end = month.isoformat(), add_months(month, 1).isoformat()
+        await conn.execute(
+            text(
+                f'CREATE TABLE "{name}" PARTITION OF audit_logs '
+                f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+async def drop_expired_partitions(conn: AsyncConnection, today: date, retention_months: int) -> list[str]:
+    """Detach and drop monthly partitions that end before the retention cutoff."""
+    cutoff = add_months(today.replace(day=1), -retention_months)
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'audit_logs'"
+        )
+    )
+    dropped = []
+    for (name,) in result.all():
+        match = PARTITION_NAME.match(name)
+        if match is None:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if add_months(month, 1) > cutoff:
+            continue
+        await conn.execute(text(f'ALTER TABLE audit_logs DETACH PARTITION "{name}"'))
+        await conn.execute(text(f'DROP TABLE "{name}"'))
+        dropped.append(name)
+    return sorted(dropped)
+
+
+async def maintain_audit_partitions(conn: AsyncConnection, *, retention_months: int, months_ahead: int) -> dict:
+    """Pre-create upcoming partitions and enforce retention.
+
+    Non-partitioned backends (SQLite in tests) fall back to deleting old rows.
+    """
+    today = datetime.now(timezone.utc).date()
+    if conn.dialect.name != "postgresql":
+        deleted = 0
+        if retention_months > 0:
+            cutoff = add_months(today.replace(day=1), -retention_months)
+            result = await conn.execute(delete(AuditLog).where(AuditLog.ts < datetime.combine(cutoff, datetime.min.time())))
+            deleted = result.rowcount
+        return {"created": [], "dropped": [], "deleted_rows": deleted}
+
+    created = await ensure_partitions(conn, today, months_ahead)
+    dropped = await drop_expired_partitions(conn, today, retention_months) if retention_months > 0 else []
+    if created or dropped:
+        logger.info("Audit partitions created=%s dropped=%s", created, dropped)
+    return {"created": created, "dropped": dropped, "deleted_rows": 0}
+
+
+async def run_audit_maintenance_loop(
+    engine: AsyncEngine, *, interval: float, retention_months: int, months_ahead: int
+) -> None:
+    while True:
+        try:
+            async with engine.begin() as conn:
+                # Only one worker creates and drops partitions at a time.
+                if await try_advisory_xact_lock(conn, "audit_partitions"):
+                    await maintain_audit_partitions(conn, retention_months=retention_months, months_ahead=months_ahead)
+        except Exception:
+            logger.exception("Audit partition maintenance failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,343 @@
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, select, union
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.blobstore import BlobStore, InMemoryBlobStore, LocalBlobStore
+from app.core.config import get_settings
+from app.core.metrics import Histogram
+from app.db.expressions import is_postgres
+from app.db.locks import try_advisory_xact_lock
+from app.db.session import async_engine
+from app.models import Blob, BlobObject, Item, OTLink
+from app.schemas.item import ItemCreate, ItemUpdate
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+blobs_table = Blob.__table__
+blob_objects_table = BlobObject.__table__
+items_table = Item.__table__
+ot_links_table = OTLink.__table__
+
+# Blob keys are lowercase hex SHA-256 digests of the ciphertext.
+DIGEST_PATTERN = r"^[0-9a-f]{64}$"
+
+
+def create_blob_store() -> BlobStore:
+    if settings.blob_store_backend == "memory":
+        return InMemoryBlobStore(chunk_size=settings.blob_chunk_size)
+    return LocalBlobStore(settings.blob_store_path, chunk_size=settings.blob_chunk_size)
+
+
+blob_store = create_blob_store()
+
+
+def get_blob_store() -> BlobStore:
+    return blob_store
+
+
+async def _one(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+def _insert(db: AsyncSession):
+    return postgresql.insert if is_postgres(db) else sqlite.insert
+
+
+async def _lock_object(db: AsyncSession, digest: str, *, claiming: bool = True) -> None:
+    # Upserting (rather than DO NOTHING) locks the row until commit, waiting
+    # for anyone else holding it, even if it did not exist before.
+    stmt = _insert(db)(blob_objects_table).values(digest=digest, claimed_at=datetime.now(timezone.utc))
+    claimed_at = stmt.excluded.claimed_at if claiming else blob_objects_table.c.claimed_at
+    await db.execute(
+        stmt.on_conflict_do_update(index_elements=[blob_objects_table.c.digest], set_={"claimed_at": claimed_at})
+    )
+
+
+async def _claim(db: AsyncSession, owner_id: UUID, digest: str, size: int) -> None:
+    # Also an upsert, so a concurrent release_blobs waits for this claim to commit.
+    stmt = _insert(db)(blobs_table).values(owner_id=owner_id, digest=digest, size=size)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[blobs_table.c.owner_id, blobs_table.c.digest], set_={"size": stmt.excluded.size}
+        )
+    )
+
+
+async def owned_blob_size(db: AsyncSession, owner_id: UUID, digest: str) -> Optional[int]:
+    return await db.scalar(
+        select(blobs_table.c.size).where(blobs_table.c.owner_id == owner_id, blobs_table.c.digest == digest)
+    )
+
+
+async def store_upload(
+    db: AsyncSession,
+    store: BlobStore,
+    owner_id: UUID,
+    digest: str,
+    chunks: AsyncIterable[bytes],
+    *,
+    max_bytes: int,
+) -> tuple[int, bool]:
+    """Stream an upload into the store, verifying it hashes to ``digest``.
+
+    Returns ``(size, created)``. If the owner already holds the digest the body
+    is never read. Otherwise the bytes must be sent even when another user
+    stored them first, so knowing a digest never grants access to a blob.
+    """
+    size = await owned_blob_size(db, owner_id, digest)
+    if size is not None:
+        return size, False
+
+    async def verified() -> AsyncIterator[bytes]:
+        hasher = hashlib.sha256()
+        total = 0
+        async for chunk in chunks:
+            total += len(chunk)
+            if total > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Blob exceeds {max_bytes} bytes",
+                )
+            hasher.update(chunk)
+            yield chunk
+        if hasher.hexdigest() != digest:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Blob does not match its digest")
+
+    # The store only publishes the object once the stream completes, so a
+    # rejected upload never replaces an existing object with the same key.
+    await _lock_object(db, digest)
+    size = await store.put_object(digest, verified())
+    await _claim(db, owner_id, digest, size)
+    return size, True
+
+
+async def store_bytes(db: AsyncSession, store: BlobStore, owner_id: UUID, data: bytes) -> str:
+    """Store a ciphertext the server already holds; returns its digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    await _lock_object(db, digest)
+    if await store.head_object(digest) is None:
+        await store.put_object(digest, _one(data))
+    await _claim(db, owner_id, digest, len(data))
+    return digest
+
+
+async def read_blob(store: BlobStore, digest: str) -> bytes:
+    return b"".join([chunk async for chunk in store.get_object(digest)])
+
+
+async def offload_item_blob(
+    db: AsyncSession, store: BlobStore, owner_id: UUID, payload: Union[ItemCreate, ItemUpdate]
+) -> None:
+    """Move an oversized inline ciphertext into the blob store, or check a blob_ref claim.
+
+    Leaves ``encrypted_blob`` and ``blob_ref`` mutually exclusive on the
+    payload, so applying it replaces whichever the item held before.
+    """
+    fields = payload.model_fields_set
+    if "encrypted_blob" in fields and payload.encrypted_blob is not None:
+        if len(payload.encrypted_blob) > settings.blob_inline_max_bytes:
+            payload.blob_ref = await store_bytes(db, store, owner_id, payload.encrypted_blob)
+            payload.encrypted_blob = None
+        else:
+            payload.blob_ref = None
+    elif "blob_ref" in fields and payload.blob_ref is not None:
+        if await owned_blob_size(db, owner_id, payload.blob_ref) is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Unknown blob_ref")
+        payload.encrypted_blob = None
+
+
+async def release_blobs(
+    db: Union[AsyncSession, AsyncConnection], owner_id: UUID, digests: Iterable[Optional[str]]
+) -> list[str]:
+    """Drop the owner's claims on digests none of their items or links reference any more.
+
+    Call after the referencing rows have been changed or deleted (and flushed),
+    in the same transaction. Returns the released digests nobody claims now;
+    pass them to ``purge_unclaimed_objects`` once the transaction commits.
+    """
+    candidates = {digest for digest in digests if digest is not None}
+    if not candidates:
+        return []
+    # Lock the claims first so a concurrent claim of the same digest commits,
+    # along with whatever references it, before references are checked.
+    claims = await db.execute(
+        select(blobs_table.c.digest)
+        .where(blobs_table.c.owner_id == owner_id, blobs_table.c.digest.in_(candidates))
+        .with_for_update()
+    )
+    candidates = set(claims.scalars())
+    if not candidates:
+        return []
+    referenced = union(
+        select(items_table.c.blob_ref).where(
+            items_table.c.owner_id == owner_id, items_table.c.blob_ref.in_(candidates)
+        ),
+        select(ot_links_table.c.payload_ref).where(
+            ot_links_table.c.owner_id == owner_id, ot_links_table.c.payload_ref.in_(candidates)
+        ),
+    )
+    released = candidates - set((await db.execute(referenced)).scalars())
+    if not released:
+        return []
+    await db.execute(
+        delete(blobs_table).where(blobs_table.c.owner_id == owner_id, blobs_table.c.digest.in_(released))
+    )
+    claimed = await db.execute(select(blobs_table.c.digest).where(blobs_table.c.digest.in_(released)).distinct())
+    return sorted(released - set(claimed.scalars()))
+
+
+async def purge_unclaimed_objects(db: AsyncSession, store: BlobStore, digests: Iterable[str]) -> None:
+    """Delete stored objects for digests that still have no claim; commits as it goes.
+
+    Call after the transaction that released the claims has committed. Each
+    digest is handled in its own short transaction holding its
+    ``blob_objects`` row lock, so a request storing the same bytes either
+    finishes claiming them first or finds the object gone and stores it again.
+    """
+    for digest in sorted(set(digests)):
+        await _lock_object(db, digest, claiming=False)
+        # A fresh statement, so claims committed while waiting for the lock are seen.
+        claimed = await db.scalar(select(blobs_table.c.digest).where(blobs_table.c.digest == digest).limit(1))
+        if claimed is None:
+            await store.delete_object(digest)
+            await db.execute(delete(blob_objects_table).where(blob_objects_table.c.digest == digest))
+        await db.commit()
+
+
+class BlobClaimSweeper:
+    """Periodically releases blob claims nothing has referenced for ``grace_seconds``.
+
+    Blobs uploaded through ``PUT /api/blobs`` are claimed before any item
+    refers to them, so a client that never follows up would otherwise keep
+    the object forever. Batches are guarded by an advisory lock, as for the
+    one-time link sweeper, and objects left without claims are deleted.
+    """
+
+    lock_name = "blob_claim_sweeper"
+
+    def __init__(
+        self, engine: AsyncEngine, store: BlobStore, *, interval: float, batch_size: int, grace_seconds: float
+    ) -> None:
+        self.engine = engine
+        self.store = store
+        self.interval = interval
+        self.batch_size = batch_size
+        self.grace_seconds = grace_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.sweeps = 0
+        self.skipped = 0
+        self.failed = 0
+        self.stale = 0
+        self.duration = Histogram()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                self.failed += 1
+                logger.exception("Blob claim sweep failed")
+            await asyncio.sleep(self.interval)
+
+    async def _release_batch(self, cutoff: datetime) -> Optional[tuple[int, int]]:
+        """Release one batch of stale claims; returns ``(found, released)`` or None if not leader."""
+        async with AsyncSession(self.engine) as db:
+            if not await try_advisory_xact_lock(await db.connection(), self.lock_name):
+                return None
+            result = await db.execute(
+                select(blobs_table.c.owner_id, blobs_table.c.digest)
+                .where(
+                    blobs_table.c.created_at < cutoff,
+                    ~exists().where(
+                        items_table.c.owner_id == blobs_table.c.owner_id, items_table.c.blob_ref == blobs_table.c.digest
+                    ),
+                    ~exists().where(
+                        ot_links_table.c.owner_id == blobs_table.c.owner_id,
+                        ot_links_table.c.payload_ref == blobs_table.c.digest,
+                    ),
+                )
+                .limit(self.batch_size)
+            )
+            stale: dict[UUID, set[str]] = {}
+            found = 0
+            for owner_id, digest in result.all():
+                stale.setdefault(owner_id, set()).add(digest)
+                found += 1
+            released: list[str] = []
+            for owner_id, digests in stale.items():
+                released += await release_blobs(db, owner_id, digests)
+            await db.commit()
+            await purge_unclaimed_objects(db, self.store, released)
+        return found, len(released)
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """Release every stale claim; returns the number of objects deleted."""
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.grace_seconds)
+        started = time.perf_counter()
+        deleted = 0
+        while True:
+            batch = await self._release_batch(cutoff)
+            if batch is None:
+                # Another worker holds the sweeper lock.
+                self.skipped += 1
+                return deleted
+            found, released = batch
+            deleted += released
+            self.stale += found
+            if found < self.batch_size:
+                break
+        self.sweeps += 1
+        self.duration.observe(time.perf_counter() - started)
+        if deleted:
+            logger.info("Deleted %d unclaimed blobs", deleted)
+        return deleted
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "sweeps": self.sweeps,
+            "skipped_not_leader": self.skipped,
+            "failed": self.failed,
+            "stale_claims": self.stale,
+            "duration_seconds": self.duration.snapshot(),
+        }
+
+
+blob_claim_sweeper = BlobClaimSweeper(
+    async_engine,
+    blob_store,
+    interval=settings.blob_claim_sweep_interval_seconds,
+    batch_size=settings.blob_claim_sweep_batch_size,
+    grace_seconds=settings.blob_claim_grace_seconds,
+)
@@ -0,0 +1,200 @@
+import uuid
+from datetime import datetime
+from itertools import groupby
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import Integer, column, delete, insert, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.expressions import id_in, is_postgres
+from app.models import Item, ItemTombstone
+from app.schemas.item import ItemBatchResult, ItemBatchUpdate, ItemCreate
+from app.services import search_index, tag_counts
+
+
+items_table = Item.__table__
+
+# Columns a batch update may change; version is managed by the batch itself.
+UPDATABLE_FIELDS = ("encrypted_blob", "blob_ref", "iv", "salt", "title_hmac", "tags")
+
+
+def _changed_fields(change: ItemBatchUpdate) -> tuple[str, ...]:
+    return tuple(field for field in UPDATABLE_FIELDS if field in change.model_fields_set)
+
+
+def _new_version(change: ItemBatchUpdate) -> int:
+    return change.version if change.version is not None else change.expected_version + 1
+
+
+async def create_items(db: AsyncSession, owner_id: UUID, payloads: Sequence[ItemCreate]) -> list[ItemBatchResult]:
+    if not payloads:
+        return []
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "owner_id": owner_id,
+            "title_hmac": payload.title_hmac,
+            "encrypted_blob": payload.encrypted_blob,
+            "blob_ref": payload.blob_ref,
+            "iv": payload.iv,
+            "salt": payload.salt,
+            "version": payload.version,
+            "tags": payload.tags,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for payload in payloads
+    ]
+    await db.execute(insert(items_table), rows)
+    await search_index.replace_item_tokens(
+        db,
+        owner_id,
+        {row["id"]: payload.search_tokens for row, payload in zip(rows, payloads) if payload.search_tokens},
+        replace=False,
+    )
+    await tag_counts.apply_tag_changes(db, owner_id, [(None, payload.tags) for payload in payloads])
+    return [ItemBatchResult(id=row["id"], status="created", version=row["version"]) for row in rows]
+
+
+async def _update_group_postgres(
+    db: AsyncSession, owner_id: UUID, fields: tuple[str, ...], changes: list[ItemBatchUpdate]
+) -> list[tuple[UUID, int]]:
+    # UPDATE items SET ... FROM (VALUES ...) AS v WHERE items.id = v.id AND items.version = v.expected_version
+    data = values(
+        column("id", items_table.c.id.type),
+        column("expected_version", Integer),
+        column("new_version", Integer),
+        *(column(field, items_table.c[field].type) for field in fields),
+        name="v",
+    ).data(
+        [
+            (change.id, change.expected_version, _new_version(change), *(getattr(change, f) for f in fields))
+            for change in changes
+        ]
+    )
+    stmt = (
+        update(items_table)
+        .where(
+            items_table.c.id == data.c.id,
+            items_table.c.owner_id == owner_id,
+            items_table.c.version == data.c.expected_version,
+        )
+        .values(version=data.c.new_version, **{field: data.c[field] for field in fields})
+        .returning(items_table.c.id, items_table.c.version)
+    )
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
+async def _update_group_rowwise(
+    db: AsyncSession, owner_id: UUID, fields: tuple[str, ...], changes: list[ItemBatchUpdate]
+) -> list[tuple[UUID, int]]:
+    # Fallback for backends without UPDATE ... FROM (VALUES ...), e.g. SQLite in tests.
+    updated = []
+    for change in changes:
+        stmt = (
+            update(items_table)
+            .where(
+                items_table.c.id == change.id,
+                items_table.c.owner_id == owner_id,
+                items_table.c.version == change.expected_version,
+            )
+            .values(version=_new_version(change), **{field: getattr(change, field) for field in fields})
+            .returning(items_table.c.id, items_table.c.version)
+        )
+        row = (await db.execute(stmt)).first()
+        if row is not None:
+            updated.append(tuple(row))
+    return updated
+
+
+async def update_items(
+    db: AsyncSession, owner_id: UUID, changes: Sequence[ItemBatchUpdate]
+) -> list[ItemBatchResult]:
+    """Apply updates guarded by expected_version, one statement per set of changed fields."""
+    if not changes:
+        return []
+
+    # Tags before the update, to keep the tag count summary in step. The rows
+    # stay locked until commit, as in update_item, so a concurrent retag
+    # cannot slip in between this read and the update; locking in id order
+    # keeps overlapping batches from deadlocking.
+    retagged = [change for change in changes if "tags" in change.model_fields_set]
+    old_tags: dict[UUID, list[str]] = {}
+    if retagged:
+        result = await db.execute(
+            select(items_table.c.id, items_table.c.tags)
+            .where(
+                id_in(db, items_table.c.id, [change.id for change in retagged]), items_table.c.owner_id == owner_id
+            )
+            .order_by(items_table.c.id)
+            .with_for_update()
+        )
+        old_tags = {item_id: tags for item_id, tags in result.all()}
+
+    update_group = _update_group_postgres if is_postgres(db) else _update_group_rowwise
+    applied: dict[UUID, int] = {}
+    for fields, group in groupby(sorted(changes, key=_changed_fields), key=_changed_fields):
+        for item_id, version in await update_group(db, owner_id, fields, list(group)):
+            applied[item_id] = version
+
+    await search_index.replace_item_tokens(
+        db,
+        owner_id,
+        {
+            change.id: change.search_tokens or []
+            for change in changes
+            if change.id in applied and "search_tokens" in change.model_fields_set
+        },
+    )
+
+    await tag_counts.apply_tag_changes(
+        db, owner_id, [(old_tags.get(change.id), change.tags) for change in retagged if change.id in applied]
+    )
+
+    missing = [change.id for change in changes if change.id not in applied]
+    current: dict[UUID, int] = {}
+    if missing:
+        result = await db.execute(
+            select(items_table.c.id, items_table.c.version).where(
+                id_in(db, items_table.c.id, missing), items_table.c.owner_id == owner_id
+            )
+        )
+        current = {item_id: version for item_id, version in result.all()}
+
+    results = []
+    for change in changes:
+        if change.id in applied:
+            results.append(ItemBatchResult(id=change.id, status="updated", version=applied[change.id]))
+        elif change.id in current:
+            results.append(ItemBatchResult(id=change.id, status="conflict", version=current[change.id]))
+        else:
+            results.append(ItemBatchResult(id=change.id, status="not_found"))
+    return results
+
+
+async def delete_items(db: AsyncSession, owner_id: UUID, ids: Sequence[UUID]) -> list[ItemBatchResult]:
+    if not ids:
+        return []
+
+    await search_index.delete_item_tokens(db, owner_id, ids)
+    result = await db.execute(
+        delete(items_table)
+        .where(id_in(db, items_table.c.id, ids), items_table.c.owner_id == owner_id)
+        .returning(items_table.c.id, items_table.c.tags)
+    )
+    deleted_tags = dict(result.all())
+    deleted = set(deleted_tags)
+    await tag_counts.apply_tag_changes(db, owner_id, [(tags, None) for tags in deleted_tags.values()])
+
+    if deleted:
+        now = datetime.utcnow()
+        await db.execute(
+            insert(ItemTombstone.__table__),
+            [{"item_id": item_id, "owner_id": owner_id, "deleted_at": now} for item_id in deleted],
+        )
+
+    return [ItemBatchResult(id=item_id, status="deleted" if item_id in deleted else "not_found") for item_id in ids]
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import get_settings
+from app.core.metrics import Histogram
+from app.db.locks import try_advisory_xact_lock
+from app.db.session import async_engine
+from app.models import ItemTombstone
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+tombstones_table = ItemTombstone.__table__
+
+
+def tombstone_horizon(now: datetime) -> Optional[datetime]:
+    """Oldest deletion delta sync can still report, or None if tombstones are kept forever."""
+    if settings.sync_tombstone_retention_days <= 0:
+        return None
+    return now - timedelta(days=settings.sync_tombstone_retention_days)
+
+
+class TombstoneSweeper:
+    """Periodically deletes item tombstones older than the sync retention window.
+
+    Change tokens older than the window are refused by ``/api/items/sync``,
+    so no client can still need these rows. Batches are guarded by an
+    advisory lock, as for the one-time link sweeper, and found through
+    ``ix_item_tombstones_deleted_at``.
+    """
+
+    lock_name = "tombstone_sweeper"
+
+    def __init__(self, engine: AsyncEngine, *, interval: float, batch_size: int) -> None:
+        self.engine = engine
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.sweeps = 0
+        self.skipped = 0
+        self.failed = 0
+        self.purged = 0
+        self.duration = Histogram()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running or self.interval <= 0 or settings.sync_tombstone_retention_days <= 0:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                self.failed += 1
+                logger.exception("Tombstone sweep failed")
+            await asyncio.sleep(self.interval)
+
+    async def _purge_batch(self, horizon: datetime) -> Optional[int]:
+        async with self.engine.begin() as conn:
+            if not await try_advisory_xact_lock(conn, self.lock_name):
+                return None
+            batch = (
+                select(tombstones_table.c.item_id)
+                .where(tombstones_table.c.deleted_at < horizon)
+                .order_by(tombstones_table.c.deleted_at)
+                .limit(self.batch_size)
+            )
+            result = await conn.execute(
+                delete(tombstones_table).where(tombstones_table.c.item_id.in_(batch.scalar_subquery()))
+            )
+        return result.rowcount
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """Purge every expired tombstone; returns the number of rows deleted."""
+        horizon = tombstone_horizon(now or datetime.now(timezone.utc))
+        if horizon is None:
+            return 0
+        started = time.perf_counter()
+        purged = 0
+        while True:
+            deleted = await self._purge_batch(horizon)
+            if deleted is None:
+                # Another worker holds the sweeper lock.
+                self.skipped += 1
+                return purged
+            purged += deleted
+            self.purged += deleted
+            if deleted < self.batch_size:
+                break
+        self.sweeps += 1
+        self.duration.observe(time.perf_counter() - started)
+        if purged:
+            logger.info("Purged %d item tombstones", purged)
+        return purged
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "sweeps": self.sweeps,
+            "skipped_not_leader": self.skipped,
+            "failed": self.failed,
+            "purged": self.purged,
+            "duration_seconds": self.duration.snapshot(),
+        }
+
+
+tombstone_sweeper = TombstoneSweeper(
+    async_engine,
+    interval=settings.tombstone_sweep_interval_seconds,
+    batch_size=settings.tombstone_sweep_batch_size,
+)
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import Row, delete, select, true, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.blobstore import BlobStore
+from app.core.config import get_settings
+from app.core.metrics import Histogram
+from app.db.expressions import is_postgres
+from app.db.locks import try_advisory_xact_lock
+from app.db.session import async_engine
+from app.models import OTLink
+from app.services.blobs import blob_store, purge_unclaimed_objects, release_blobs
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+ot_links_table = OTLink.__table__
+
+
+# Cleared when a single-use link is consumed; nothing may serve it again.
+PAYLOAD_COLUMNS = ("encrypted_payload", "payload_ref")
+
+
+async def consume_ot_link(db: AsyncSession, link_id: UUID, now: datetime) -> Optional[Row]:
+    """Fetch a live link, consuming it in the same statement if it is single-use.
+
+    Consuming marks the link used and clears its payload, while the row
+    returned still carries the payload as it was. The ``NOT used`` guard on
+    the UPDATE gives exactly-once delivery: of concurrent fetches of a
+    single-use link only one gets a row back. On Postgres this is a single
+    round-trip, with the UPDATE in a CTE and the multi-use branch a plain
+    read, so a hot shared link never takes a row lock.
+    """
+    live = (ot_links_table.c.id == link_id, ot_links_table.c.used.is_(False), ot_links_table.c.expiry > now)
+    shared = select(*ot_links_table.c).where(*live, ot_links_table.c.single_use.is_(False))
+    consumed_values = {"used": True, **{name: None for name in PAYLOAD_COLUMNS}}
+
+    if is_postgres(db):
+        # RETURNING sees the updated row, so the payload comes from a
+        # self-join on the statement's snapshot of it.
+        prior = ot_links_table.alias("prior")
+        consume = (
+            update(ot_links_table)
+            .where(*live, ot_links_table.c.single_use.is_(True), prior.c.id == ot_links_table.c.id)
+            .values(consumed_values)
+            .returning(*(prior.c[c.name] if c.name in PAYLOAD_COLUMNS else c for c in ot_links_table.c))
+            .cte("consumed")
+        )
+        result = await db.execute(select(*consume.c).union_all(shared))
+        return result.first()
+
+    # SQLite cannot put UPDATE ... RETURNING in a CTE or return pre-update
+    # values; it serializes writers anyway. The row is read as it will be once
+    # consumed, apart from the payload.
+    as_consumed = (true().label("used") if c.name == "used" else c for c in ot_links_table.c)
+    row = (await db.execute(select(*as_consumed).where(*live, ot_links_table.c.single_use.is_(True)))).first()
+    if row is not None:
+        consumed = await db.execute(
+            update(ot_links_table).where(*live).values(consumed_values).returning(ot_links_table.c.id)
+        )
+        return row if consumed.first() is not None else None
+    return (await db.execute(shared)).first()
+
+
+class OTLinkSweeper:
+    """Periodically deletes expired and consumed one-time links in bounded batches.
+
+    Each batch is its own short transaction guarded by an advisory lock, so
+    with several workers only one sweeps at a time and a long backlog never
+    holds locks for long. Expired rows are found through ``ix_ot_links_expiry``
+    and consumed ones through the partial ``ix_ot_links_used``. Claims on
+    stored payloads go with their links, and objects nobody else claims are
+    deleted from ``store`` after each batch commits.
+    """
+
+    lock_name = "ot_link_sweeper"
+
+    def __init__(self, engine: AsyncEngine, store: BlobStore, *, interval: float, batch_size: int) -> None:
+        self.engine = engine
+        self.store = store
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.sweeps = 0
+        self.skipped = 0
+        self.failed = 0
+        self.purged = 0
+        self.duration = Histogram()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                self.failed += 1
+                logger.exception("One-time link sweep failed")
+            await asyncio.sleep(self.interval)
+
+    async def _purge_batch(self, condition, order_by) -> Optional[int]:
+        async with self.engine.begin() as conn:
+            if not await try_advisory_xact_lock(conn, self.lock_name):
+                return None
+            batch = select(ot_links_table.c.id).where(condition).order_by(order_by).limit(self.batch_size)
+            result = await conn.execute(
+                delete(ot_links_table)
+                .where(ot_links_table.c.id.in_(batch.scalar_subquery()))
+                .returning(ot_links_table.c.owner_id, ot_links_table.c.payload_ref)
+            )
+            rows = result.all()
+            payload_refs: dict[UUID, set[str]] = {}
+            for owner_id, payload_ref in rows:
+                if payload_ref is not None:
+                    payload_refs.setdefault(owner_id, set()).add(payload_ref)
+            released: list[str] = []
+            for owner_id, digests in payload_refs.items():
+                released += await release_blobs(conn, owner_id, digests)
+        if released:
+            async with AsyncSession(self.engine) as db:
+                await purge_unclaimed_objects(db, self.store, released)
+        return len(rows)
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """Purge everything currently sweepable; returns the number of rows deleted."""
+        now = now or datetime.now(timezone.utc)
+        started = time.perf_counter()
+        purged = 0
+        for condition, order_by in (
+            (ot_links_table.c.expiry <= now, ot_links_table.c.expiry),
+            (ot_links_table.c.used.is_(True), ot_links_table.c.expiry),
+        ):
+            while True:
+                deleted = await self._purge_batch(condition, order_by)
+                if deleted is None:
+                    # Another worker holds the sweeper lock.
+                    self.skipped += 1
+                    return purged
+                purged += deleted
+                self.purged += deleted
+                if deleted < self.batch_size:
+                    break
+        self.sweeps += 1
+        self.duration.observe(time.perf_counter() - started)
+        if purged:
+            logger.info("Purged %d one-time links", purged)
+        return purged
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "sweeps": self.sweeps,
+            "skipped_not_leader": self.skipped,
+            "failed": self.failed,
+            "purged": self.purged,
+            "duration_seconds": self.duration.snapshot(),
+        }
+
+
+ot_link_sweeper = OTLinkSweeper(
+    async_engine,
+    blob_store,
+    interval=settings.ot_link_sweep_interval_seconds,
+    batch_size=settings.ot_link_sweep_batch_size,
+)
@@ -0,0 +1,81 @@
+from typing import Iterable, Mapping, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.expressions import id_in, tags_match
+from app.models import Item, ItemSearchToken
+from app.models.item import ITEM_META_COLUMNS
+
+
+tokens_table = ItemSearchToken.__table__
+
+
+async def delete_item_tokens(db: AsyncSession, owner_id: UUID, item_ids: Sequence[UUID]) -> None:
+    if item_ids:
+        await db.execute(
+            delete(tokens_table).where(
+                tokens_table.c.owner_id == owner_id,
+                id_in(db, tokens_table.c.item_id, item_ids),
+            )
+        )
+
+
+async def replace_item_tokens(
+    db: AsyncSession,
+    owner_id: UUID,
+    tokens_by_item: Mapping[UUID, Iterable[str]],
+    *,
+    replace: bool = True,
+) -> None:
+    """Set the blind-index tokens of many items with one DELETE and one multi-row INSERT.
+
+    ``replace=False`` skips the DELETE for freshly created items.
+    """
+    if not tokens_by_item:
+        return
+    if replace:
+        await delete_item_tokens(db, owner_id, list(tokens_by_item))
+    rows = [
+        {"owner_id": owner_id, "token": token, "item_id": item_id}
+        for item_id, tokens in tokens_by_item.items()
+        for token in set(tokens)
+    ]
+    if rows:
+        await db.execute(insert(tokens_table), rows)
+
+
+async def search_by_tokens(
+    db: AsyncSession,
+    owner_id: UUID,
+    tokens: Sequence[str],
+    *,
+    match_all: bool,
+    limit: int,
+    tags: Optional[Sequence[str]] = None,
+    match_all_tags: bool = False,
+):
+    """Items matching any (or all) of the tokens, ranked by number of matching tokens.
+
+    ``tags`` further restricts hits to items carrying any (or all) of them.
+    Only index entries for the requested tokens are read, via the
+    (owner_id, token, item_id) primary key, so cost follows the hit count
+    rather than vault size.
+    """
+    tokens = sorted(set(tokens))
+    matches = func.count().label("matches")
+    hits = (
+        select(tokens_table.c.item_id, matches)
+        .where(tokens_table.c.owner_id == owner_id, tokens_table.c.token.in_(tokens))
+        .group_by(tokens_table.c.item_id)
+    )
+    if match_all:
+        hits = hits.having(func.count() == len(tokens))
+    hits = hits.subquery()
+
+    query = select(*ITEM_META_COLUMNS, hits.c.matches).join(hits, Item.id == hits.c.item_id)
+    if tags:
+        query = query.where(tags_match(db, Item.tags, tags, match_all=match_all_tags))
+    result = await db.execute(query.order_by(hits.c.matches.desc(), Item.created_at.desc()).limit(limit))
+    return result.all()
@@ -0,0 +1,58 @@
+from collections import Counter
+from typing import Iterable, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.expressions import is_postgres
+from app.models import ItemTagCount
+
+
+tag_counts_table = ItemTagCount.__table__
+
+TagChange = tuple[Optional[Sequence[str]], Optional[Sequence[str]]]
+
+
+async def apply_tag_changes(db: AsyncSession, owner_id: UUID, changes: Iterable[TagChange]) -> None:
+    """Fold (tags before, tags after) pairs of written items into the summary table.
+
+    Creates pass ``(None, tags)`` and deletes ``(tags, None)``. The net delta
+    per tag is applied with one upsert, so concurrent writers only ever add
+    to a counter instead of overwriting it.
+    """
+    deltas: Counter[str] = Counter()
+    for before, after in changes:
+        before, after = set(before or ()), set(after or ())
+        deltas.update(after - before)
+        deltas.subtract(before - after)
+    # Sorted so concurrent transactions lock summary rows in the same order.
+    rows = [{"owner_id": owner_id, "tag": tag, "count": delta} for tag, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+
+    dialect_insert = postgresql.insert if is_postgres(db) else sqlite.insert
+    stmt = dialect_insert(tag_counts_table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tag_counts_table.c.owner_id, tag_counts_table.c.tag],
+        set_={"count": tag_counts_table.c.count + stmt.excluded.count},
+    )
+    await db.execute(stmt)
+    if any(row["count"] < 0 for row in rows):
+        await db.execute(
+            delete(tag_counts_table).where(
+                tag_counts_table.c.owner_id == owner_id,
+                tag_counts_table.c.tag.in_([row["tag"] for row in rows if row["count"] < 0]),
+                tag_counts_table.c.count <= 0,
+            )
+        )
+
+
+async def list_tag_counts(db: AsyncSession, owner_id: UUID):
+    result = await db.execute(
+        select(tag_counts_table.c.tag, tag_counts_table.c.count)
+        .where(tag_counts_table.c.owner_id == owner_id)
+        .order_by(tag_counts_table.c.tag)
+    )
+    return result.all()
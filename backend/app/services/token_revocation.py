@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.bloom import BloomFilter
+from app.core.config import get_settings
+from app.db.expressions import is_postgres
+from app.db.locks import try_advisory_xact_lock
+from app.db.session import async_engine
+from app.models import RevokedToken
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+revoked_tokens_table = RevokedToken.__table__
+
+# Re-read rows revoked this long before the newest one seen, so a revocation
+# whose transaction committed late is still picked up.
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything stored here is UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class TokenDenylist:
+    """Revoked access token ids, checked on every authenticated request.
+
+    ``is_revoked`` never touches the database: a Bloom filter answers "not
+    revoked" for almost every live token, and only filter hits consult the
+    exact set. Both are kept in step with ``revoked_tokens`` by a background
+    refresh that reads only rows revoked since the previous pass, so a
+    revocation made on another worker takes effect within ``interval``
+    seconds. Entries are dropped once their token has expired anyway.
+    """
+
+    lock_name = "revoked_tokens_purge"
+
+    def __init__(self, engine: AsyncEngine, *, interval: float, capacity: int, error_rate: float) -> None:
+        self.engine = engine
+        self.interval = interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._revoked: dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._cursor: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failed = 0
+        self.bloom_hits = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running or self.interval <= 0:
+            return
+        try:
+            await self.refresh()
+        except Exception:
+            self.failed += 1
+            logger.exception("Initial token denylist load failed")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception:
+                self.failed += 1
+                logger.exception("Token denylist refresh failed")
+
+    # Hot path
+
+    def is_revoked(self, jti: str, now: Optional[float] = None) -> bool:
+        if jti not in self._bloom:
+            return False
+        self.bloom_hits += 1
+        expires_at = self._revoked.get(jti)
+        if expires_at is None or expires_at <= (now or time.time()):
+            return False
+        self.rejected += 1
+        return True
+
+    # Maintenance
+
+    def _add(self, jti: str, expires_at: datetime) -> None:
+        if jti in self._revoked:
+            return
+        self._revoked[jti] = _utc(expires_at).timestamp()
+        if self._bloom.count >= self._bloom.capacity:
+            self._rebuild()
+        else:
+            self._bloom.add(jti)
+
+    def _rebuild(self) -> None:
+        bloom = BloomFilter(max(self.capacity, 2 * len(self._revoked)), self.error_rate)
+        for jti in self._revoked:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def _prune(self, now: float) -> None:
+        expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= now]
+        if not expired:
+            return
+        for jti in expired:
+            del self._revoked[jti]
+        self._rebuild()
+
+    async def revoke(self, db: AsyncSession, jti: str, user_id: UUID, expires_at: datetime) -> None:
+        """Record a revocation; effective at once on this worker."""
+        dialect_insert = postgresql.insert if is_postgres(db) else sqlite.insert
+        await db.execute(
+            dialect_insert(revoked_tokens_table)
+            .values(jti=jti, user_id=user_id, expires_at=expires_at, revoked_at=datetime.now(timezone.utc))
+            .on_conflict_do_nothing(index_elements=[revoked_tokens_table.c.jti])
+        )
+        self._add(jti, expires_at)
+
+    async def refresh(self, now: Optional[datetime] = None) -> int:
+        """Load revocations newer than the last pass and drop expired ones; returns rows read."""
+        now = now or datetime.now(timezone.utc)
+        query = select(
+            revoked_tokens_table.c.jti, revoked_tokens_table.c.expires_at, revoked_tokens_table.c.revoked_at
+        ).where(revoked_tokens_table.c.expires_at > now)
+        if self._cursor is not None:
+            query = query.where(revoked_tokens_table.c.revoked_at > self._cursor - REFRESH_OVERLAP)
+
+        async with self.engine.begin() as conn:
+            rows = (await conn.execute(query)).all()
+            if await try_advisory_xact_lock(conn, self.lock_name):
+                await conn.execute(delete(revoked_tokens_table).where(revoked_tokens_table.c.expires_at <= now))
+
+        for jti, expires_at, revoked_at in rows:
+            self._add(jti, expires_at)
+            if self._cursor is None or _utc(revoked_at) > self._cursor:
+                self._cursor = _utc(revoked_at)
+        if self._cursor is None:
+            self._cursor = now
+        self._prune(now.timestamp())
+        self.refreshes += 1
+        return len(rows)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "revoked": len(self._revoked),
+            "bloom_bits": self._bloom.size,
+            "bloom_hashes": self._bloom.hashes,
+            "bloom_hits": self.bloom_hits,
+            "rejected": self.rejected,
+            "refreshes": self.refreshes,
+            "failed": self.failed,
+        }
+
+
+token_denylist = TokenDenylist(
+    async_engine,
+    interval=settings.token_revocation_refresh_seconds,
+    capacity=settings.token_revocation_bloom_capacity,
+    error_rate=settings.token_revocation_bloom_error_rate,
+)
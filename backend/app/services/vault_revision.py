@@ -0,0 +1,20 @@
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+
+
+async def bump_vault_revision(db: AsyncSession, owner_id: UUID) -> None:
+    """Advance the owner's vault revision, invalidating listing ETags.
+
+    Called in the same transaction as every item write; the counter is
+    updated with Core, bypassing the ORM events that evict cached users.
+    """
+    await db.execute(update(User).where(User.id == owner_id).values(vault_revision=User.vault_revision + 1))
+
+
+async def get_vault_revision(db: AsyncSession, owner_id: UUID) -> Optional[int]:
+    return await db.scalar(select(User.vault_revision).where(User.id == owner_id))
@@ -0,0 +1,368 @@
+"""Whole-vault export and import as a single NDJSON stream.
+
+The stream is a header line, one ``"type": "item"`` line per item and a
+closing manifest with the item count and the SHA-256 of the item lines'
+exact bytes::
+
+    {"type":"header","format":"aami-vault","version":2,"encoding":"base64","exported_at":"..."}
+    {"type":"item","id":"...","encrypted_blob":"...","iv":"...","salt":"...",...}
+    {"type":"manifest","count":1,"sha256":"..."}
+
+Ciphertexts held in the blob store are inlined, so an export is
+self-contained. Ciphertext fields are base64 of the stored bytes, since
+uploaded blobs need not be text; version 1 exports carried them as text and
+are still accepted. An import is applied in one transaction that commits
+only when the manifest matches what was received; objects it stored are
+removed again when it fails. Items keep their ids unless
+another account already uses the id, in which case they get a fresh one.
+"""
+
+import base64
+import binascii
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterable, AsyncIterator, Optional
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import Column, MetaData, Table, delete, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.blobstore import BlobStore
+from app.core.encoding import dumps
+from app.db.expressions import id_in, is_postgres
+from app.models import Item, ItemSearchToken, ItemTombstone
+from app.schemas.item import ItemExport, VaultImportResult
+from app.services import search_index, tag_counts
+from app.services.blobs import offload_item_blob, purge_unclaimed_objects, read_blob
+
+
+EXPORT_FORMAT = "aami-vault"
+EXPORT_VERSION = 2
+EXPORT_ENCODING = "base64"
+# Item fields holding raw ciphertext bytes.
+CIPHERTEXT_FIELDS = ("encrypted_blob", "iv", "salt")
+
+items_table = Item.__table__
+tokens_table = ItemSearchToken.__table__
+tombstones_table = ItemTombstone.__table__
+
+EXPORT_COLUMNS = (
+    Item.id,
+    Item.title_hmac,
+    Item.tags,
+    Item.version,
+    Item.created_at,
+    Item.updated_at,
+    Item.encrypted_blob,
+    Item.blob_ref,
+    Item.iv,
+    Item.salt,
+)
+
+IMPORT_COLUMNS = tuple(column.name for column in items_table.columns)
+
+# Staging table for COPY; ON COMMIT DROP keeps it to the importing transaction.
+import_table = Table("items_import", MetaData(), *(Column(c.name, c.type) for c in items_table.columns))
+
+
+def _encode(value: Optional[bytes]) -> Optional[str]:
+    return None if value is None else base64.b64encode(value).decode()
+
+
+def _decode(record: dict) -> None:
+    for field in CIPHERTEXT_FIELDS:
+        if isinstance(record.get(field), str):
+            record[field] = base64.b64decode(record[field], validate=True)
+
+
+async def _tokens_by_item(db: AsyncSession, owner_id: UUID, item_ids: list[UUID]) -> dict[UUID, list[str]]:
+    result = await db.execute(
+        select(tokens_table.c.item_id, tokens_table.c.token).where(
+            tokens_table.c.owner_id == owner_id, id_in(db, tokens_table.c.item_id, item_ids)
+        )
+    )
+    tokens: dict[UUID, list[str]] = {}
+    for item_id, token in result.all():
+        tokens.setdefault(item_id, []).append(token)
+    return tokens
+
+
+async def export_vault(
+    bind: AsyncEngine, store: BlobStore, owner_id: UUID, *, batch_size: int
+) -> AsyncIterator[bytes]:
+    """Yield the export line by line from a server-side cursor, ``batch_size`` rows at a time."""
+    yield dumps(
+        {
+            "type": "header",
+            "format": EXPORT_FORMAT,
+            "version": EXPORT_VERSION,
+            "encoding": EXPORT_ENCODING,
+            "exported_at": datetime.now(timezone.utc),
+        }
+    ) + b"\n"
+
+    digest = hashlib.sha256()
+    count = 0
+    if bind.dialect.name == "postgresql":
+        # One snapshot for the whole stream, however long it takes to send.
+        bind = bind.execution_options(isolation_level="REPEATABLE READ")
+    async with AsyncSession(bind) as db:
+        result = await db.stream(
+            select(*EXPORT_COLUMNS)
+            .where(Item.owner_id == owner_id)
+            .order_by(Item.created_at, Item.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            tokens = await _tokens_by_item(db, owner_id, [row.id for row in rows])
+            for row in rows:
+                ciphertext = row.encrypted_blob if row.blob_ref is None else await read_blob(store, row.blob_ref)
+                line = dumps(
+                    {
+                        "type": "item",
+                        "id": row.id,
+                        "title_hmac": row.title_hmac,
+                        "tags": row.tags,
+                        "version": row.version,
+                        "created_at": row.created_at,
+                        "updated_at": row.updated_at,
+                        "encrypted_blob": _encode(ciphertext),
+                        "iv": _encode(row.iv),
+                        "salt": _encode(row.salt),
+                        "search_tokens": tokens.get(row.id),
+                    }
+                ) + b"\n"
+                digest.update(line)
+                count += 1
+                yield line
+
+    yield dumps({"type": "manifest", "count": count, "sha256": digest.hexdigest()}) + b"\n"
+
+
+async def _lines(chunks: AsyncIterable[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+    # Only the new chunk is scanned for newlines, so long lines stay linear.
+    buffer = bytearray()
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            buffer += chunk[start : end + 1]
+            yield bytes(buffer)
+            buffer.clear()
+            start = end + 1
+        buffer += chunk[start:]
+        if len(buffer) > max_line_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Import line exceeds {max_line_bytes} bytes",
+            )
+    if buffer:
+        yield bytes(buffer)
+
+
+def _invalid(line_number: int, detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Line {line_number}: {detail}")
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def _insert_rows(db: AsyncSession, rows: list[dict]) -> list[UUID]:
+    if is_postgres(db):
+        return await _copy_rows(db, rows)
+    result = await db.execute(
+        sqlite.insert(items_table).on_conflict_do_nothing(index_elements=[items_table.c.id]).returning(
+            items_table.c.id
+        ),
+        rows,
+    )
+    return list(result.scalars().all())
+
+
+async def _copy_rows(db: AsyncSession, rows: list[dict]) -> list[UUID]:
+    # COPY into a staging table, then move rows across so existing ids are
+    # skipped rather than aborting the whole import.
+    conn = await db.connection()
+    await conn.execute(text("CREATE TEMP TABLE IF NOT EXISTS items_import (LIKE items) ON COMMIT DROP"))
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        import_table.name,
+        records=[tuple(row[name] for name in IMPORT_COLUMNS) for row in rows],
+        columns=IMPORT_COLUMNS,
+    )
+    result = await conn.execute(
+        postgresql.insert(items_table)
+        .from_select(IMPORT_COLUMNS, select(import_table))
+        .on_conflict_do_nothing(index_elements=[items_table.c.id])
+        .returning(items_table.c.id)
+    )
+    inserted = list(result.scalars().all())
+    await conn.execute(text("TRUNCATE items_import"))
+    return inserted
+
+
+async def _import_batch(
+    db: AsyncSession, store: BlobStore, owner_id: UUID, batch: list[ItemExport], stored: set[str]
+) -> int:
+    result = await db.execute(
+        select(items_table.c.id, items_table.c.owner_id).where(id_in(db, items_table.c.id, [item.id for item in batch]))
+    )
+    owners = dict(result.all())
+    # Ids the owner already has are skipped before their ciphertexts are stored.
+    batch = [item for item in batch if owners.get(item.id) != owner_id]
+    if not batch:
+        return 0
+    now = datetime.now(timezone.utc)
+    rows = []
+    for item in batch:
+        if item.id in owners:
+            # Another account's item, e.g. an export from a different account.
+            item.id = uuid.uuid4()
+        await offload_item_blob(db, store, owner_id, item)
+        if item.blob_ref is not None:
+            stored.add(item.blob_ref)
+        rows.append(
+            {
+                "id": item.id,
+                "owner_id": owner_id,
+                "title_hmac": item.title_hmac,
+                "encrypted_blob": item.encrypted_blob,
+                "blob_ref": item.blob_ref,
+                "iv": item.iv,
+                "salt": item.salt,
+                "version": item.version,
+                "tags": item.tags,
+                "created_at": _utc(item.created_at),
+                "updated_at": now,
+            }
+        )
+    inserted = set(await _insert_rows(db, rows))
+    added = [item for item in batch if item.id in inserted]
+    if inserted:
+        # A restored item must not still be reported as deleted by delta sync.
+        await db.execute(
+            delete(tombstones_table).where(
+                tombstones_table.c.owner_id == owner_id, id_in(db, tombstones_table.c.item_id, list(inserted))
+            )
+        )
+    await search_index.replace_item_tokens(
+        db, owner_id, {item.id: item.search_tokens for item in added if item.search_tokens}, replace=False
+    )
+    await tag_counts.apply_tag_changes(db, owner_id, [(None, item.tags) for item in added])
+    return len(added)
+
+
+async def _import_stream(
+    db: AsyncSession,
+    store: BlobStore,
+    owner_id: UUID,
+    chunks: AsyncIterable[bytes],
+    stored: set[str],
+    *,
+    batch_size: int,
+    batch_max_bytes: int,
+    max_line_bytes: int,
+) -> VaultImportResult:
+    digest = hashlib.sha256()
+    count = imported = 0
+    encoding: Optional[str] = None
+    manifest: Optional[dict] = None
+    batch: list[ItemExport] = []
+    batch_bytes = 0
+
+    line_number = 0
+    async for line in _lines(chunks, max_line_bytes):
+        line_number += 1
+        if not line.strip():
+            continue
+        if manifest is not None:
+            raise _invalid(line_number, "data after manifest")
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            raise _invalid(line_number, "not valid JSON")
+        kind = record.get("type") if isinstance(record, dict) else None
+
+        if kind == "header":
+            if record.get("format") != EXPORT_FORMAT:
+                raise _invalid(line_number, "unsupported export format")
+            if record.get("version") == 1:
+                encoding = "text"
+            elif record.get("version") == EXPORT_VERSION and record.get("encoding") == EXPORT_ENCODING:
+                encoding = EXPORT_ENCODING
+            else:
+                raise _invalid(line_number, "unsupported export format")
+        elif encoding is None:
+            raise _invalid(line_number, "missing header")
+        elif kind == "item":
+            digest.update(line if line.endswith(b"\n") else line + b"\n")
+            try:
+                if encoding == EXPORT_ENCODING:
+                    _decode(record)
+                batch.append(ItemExport.model_validate(record))
+            except ValidationError as exc:
+                raise _invalid(line_number, str(exc.errors(include_url=False)))
+            except binascii.Error:
+                raise _invalid(line_number, "ciphertext is not valid base64")
+            count += 1
+            batch_bytes += len(line)
+            if len(batch) >= batch_size or batch_bytes >= batch_max_bytes:
+                imported += await _import_batch(db, store, owner_id, batch, stored)
+                batch, batch_bytes = [], 0
+        elif kind == "manifest":
+            manifest = record
+        else:
+            raise _invalid(line_number, f"unknown record type {kind!r}")
+
+    if batch:
+        imported += await _import_batch(db, store, owner_id, batch, stored)
+    if manifest is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Missing manifest")
+    if manifest.get("count") != count or manifest.get("sha256") != digest.hexdigest():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Manifest does not match the items received"
+        )
+    return VaultImportResult(imported=imported, skipped=count - imported)
+
+
+async def import_vault(
+    db: AsyncSession,
+    store: BlobStore,
+    owner_id: UUID,
+    chunks: AsyncIterable[bytes],
+    *,
+    batch_size: int,
+    batch_max_bytes: int,
+    max_line_bytes: int,
+) -> VaultImportResult:
+    """Parse an export stream incrementally and insert its items in batches.
+
+    A batch is flushed at ``batch_size`` items or once its lines reach
+    ``batch_max_bytes``, so inline ciphertexts held at once stay bounded.
+
+    Items whose id the owner already has are skipped; ids belonging to other
+    accounts are replaced with fresh ones. Raises 422 on a malformed line or
+    a manifest that does not match, after rolling back and removing any
+    objects the import stored; the caller commits only on success.
+    """
+    stored: set[str] = set()
+    try:
+        return await _import_stream(
+            db,
+            store,
+            owner_id,
+            chunks,
+            stored,
+            batch_size=batch_size,
+            batch_max_bytes=batch_max_bytes,
+            max_line_bytes=max_line_bytes,
+        )
+    except Exception:
+        await db.rollback()
+        await purge_unclaimed_objects(db, store, stored)
+        raise
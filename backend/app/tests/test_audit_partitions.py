@@ -0,0 +1,13 @@
+from datetime import date
+
+from app.services.audit_partitions import add_months, partition_name
+
+
+def test_add_months_wraps_years():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 1, 1), -12) == date(2025, 1, 1)
+
+
+def test_partition_name_matches_migration_naming():
+    assert partition_name(date(2026, 3, 1)) == "audit_logs_2026_03"
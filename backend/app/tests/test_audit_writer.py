@@ -0,0 +1,45 @@
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.session import Base, to_async_url
+from app.models import AuditLog
+from app.services.audit import AuditWriter
+
+
+DATABASE_URL = f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'audit.db')}"
+
+Base.metadata.create_all(bind=create_engine(DATABASE_URL))
+
+
+def audit_row(action: str) -> dict:
+    return {"user_id": None, "action": action, "ip_address": None, "user_agent": None, "details": {}, "ts": datetime.utcnow()}
+
+
+def test_audit_writer_batches_and_drains_on_stop():
+    async def scenario():
+        engine = create_async_engine(to_async_url(DATABASE_URL))
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        writer = AuditWriter(session_factory, batch_size=2, flush_interval=60, max_queue=3)
+
+        assert not writer.submit(audit_row("before-start"))
+
+        await writer.start()
+        assert all(writer.submit(audit_row(f"action-{i}")) for i in range(3))
+        assert not writer.submit(audit_row("overflow"))  # queue full: caller writes inline
+        await writer.stop()
+
+        async with session_factory() as db:
+            count = await db.scalar(select(func.count()).select_from(AuditLog))
+        await engine.dispose()
+        return count, writer.stats()
+
+    count, stats = asyncio.run(scenario())
+    assert count == 3
+    assert stats["flushed"] == 3
+    assert stats["rejected"] == 1
+    assert not stats["running"]
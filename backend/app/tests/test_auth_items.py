@@ -1,28 +1,54 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import uuid
 from datetime import datetime, timedelta, timezone
 
+import msgpack
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 
-from app.db.session import Base, get_db
+from app.core.blobstore import InMemoryBlobStore
+from app.core.config import get_settings
+from app.core.pagination import encode_change_token
+from app.core.ratelimit import RateLimiter, get_rate_limiter
+from app.core import security
+from app.core.security import user_cache
+from app.db import replicas
+from app.db.replicas import Replica, ReplicaRouter
+from app.db.session import Base, get_db, to_async_url
 from app.main import app
+from app.models import AuditLog, OTLink
+from app.schemas.item import ItemMeta
+from app.services.blobs import get_blob_store
 
 
-SQLALCHEMY_TEST_URL = "sqlite+pysqlite:///:memory:"
+# A file-backed database lets the sync engine create the schema while the
+# async engine (one connection per request) serves the app under test.
+SQLALCHEMY_TEST_URL = f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
 
-engine = create_engine(SQLALCHEMY_TEST_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(SQLALCHEMY_TEST_URL)
+async_engine = create_async_engine(to_async_url(SQLALCHEMY_TEST_URL), poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
-def override_get_db():
-  db = TestingSessionLocal()
-  try:
+async def override_get_db():
+  async with TestingSessionLocal() as db:
     yield db
-  finally:
-    db.close()
 
 
+blob_store = InMemoryBlobStore(chunk_size=4)
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_blob_store] = lambda: blob_store
+# Every test registers from the same client address.
+app.dependency_overrides[get_rate_limiter] = lambda: RateLimiter({}, enabled=False)
 
 Base.metadata.create_all(bind=engine)
 
@@ -107,8 +133,728 @@ def test_ot_link_lifecycle():
 
   get_resp = client.get(f"/api/ot-links/{link_id}")
   assert get_resp.status_code == 200
+  assert get_resp.json()["used"] is True
+  assert get_resp.json()["encrypted_payload"] == "payload"
+  assert client.get(f"/api/ot-links/{link_id}").status_code == 404
+  # Consuming the link cleared its stored payload.
+  with Session(engine) as db:
+    assert db.get(OTLink, uuid.UUID(link_id)).encrypted_payload is None
 
   delete_resp = client.delete(f"/api/ot-links/{link_id}", headers=auth_header(token))
   assert delete_resp.status_code == 204
 
 
+def create_item(token: str, title_hmac: str) -> str:
+  resp = client.post(
+    "/api/items/",
+    json={"encrypted_blob": "blob", "iv": "iv", "salt": "salt", "title_hmac": title_hmac},
+    headers=auth_header(token),
+  )
+  assert resp.status_code == 201
+  return resp.json()["id"]
+
+
+def test_list_items_keyset_pagination():
+  token = register_user("pages@example.com")
+  created = [create_item(token, f"hmac-{i}") for i in range(5)]
+
+  seen = []
+  cursor = None
+  pages = 0
+  while True:
+    params = {"limit": 2}
+    if cursor:
+      params["cursor"] = cursor
+    resp = client.get("/api/items/", params=params, headers=auth_header(token))
+    assert resp.status_code == 200
+    seen.extend(item["id"] for item in resp.json())
+    pages += 1
+    cursor = resp.headers.get("x-next-cursor")
+    if not cursor:
+      break
+
+  assert pages == 3
+  assert seen == list(reversed(created))
+
+  bad = client.get("/api/items/", params={"cursor": "not-a-cursor"}, headers=auth_header(token))
+  assert bad.status_code == 400
+
+
+def test_list_items_ndjson_stream():
+  token = register_user("stream@example.com")
+  created = [create_item(token, f"hmac-{i}") for i in range(3)]
+
+  resp = client.get(
+    "/api/items/",
+    headers={**auth_header(token), "Accept": "application/x-ndjson"},
+  )
+  assert resp.status_code == 200
+  assert resp.headers["content-type"].startswith("application/x-ndjson")
+  assert resp.headers["vary"] == "Accept"
+  rows = [json.loads(line) for line in resp.text.splitlines()]
+  assert [row["id"] for row in rows] == list(reversed(created))
+  assert "encrypted_blob" not in rows[0]
+
+
+def test_item_delta_sync():
+  token = register_user("sync@example.com")
+  kept = create_item(token, "kept")
+  removed = create_item(token, "removed")
+
+  initial = client.get("/api/items/sync", headers=auth_header(token))
+  assert initial.status_code == 200
+  body = initial.json()
+  assert {item["id"] for item in body["changed"]} == {kept, removed}
+  assert body["deleted"] == []
+
+  client.put(f"/api/items/{kept}", json={"title_hmac": "renamed", "version": 2}, headers=auth_header(token))
+  assert client.delete(f"/api/items/{removed}", headers=auth_header(token)).status_code == 204
+
+  delta = client.get("/api/items/sync", params={"since": body["token"]}, headers=auth_header(token))
+  assert delta.status_code == 200
+  delta_body = delta.json()
+  assert [item["title_hmac"] for item in delta_body["changed"]] == ["renamed"]
+  assert delta_body["deleted"] == [removed]
+
+
+def test_full_sync_is_paginated():
+  token = register_user("fullsync@example.com")
+  created = {create_item(token, f"page-{i}") for i in range(3)}
+
+  first = client.get("/api/items/sync", params={"limit": 2}, headers=auth_header(token))
+  assert first.status_code == 200
+  assert len(first.json()["changed"]) == 2
+  cursor = first.headers["x-next-cursor"]
+
+  rest = client.get("/api/items/sync", params={"limit": 2, "cursor": cursor}, headers=auth_header(token))
+  assert rest.status_code == 200
+  assert "x-next-cursor" not in rest.headers
+  assert {item["id"] for item in first.json()["changed"] + rest.json()["changed"]} == created
+  assert rest.json()["token"] == first.json()["token"]
+
+  both = {"since": first.json()["token"], "cursor": cursor}
+  assert client.get("/api/items/sync", params=both, headers=auth_header(token)).status_code == 400
+
+
+def test_sync_refuses_change_tokens_past_tombstone_retention():
+  token = register_user("expired-sync@example.com")
+  retention = timedelta(days=get_settings().sync_tombstone_retention_days)
+  stale = encode_change_token(datetime.now(timezone.utc) - retention - timedelta(hours=1))
+  fresh = encode_change_token(datetime.now(timezone.utc) - retention + timedelta(hours=1))
+
+  assert client.get("/api/items/sync", params={"since": stale}, headers=auth_header(token)).status_code == 410
+  assert client.get("/api/items/sync", params={"since": fresh}, headers=auth_header(token)).status_code == 200
+
+
+def test_item_batch_operations():
+  token = register_user("batch@example.com")
+  existing = create_item(token, "existing")
+  doomed = create_item(token, "doomed")
+
+  resp = client.post(
+    "/api/items/batch",
+    json={
+      "create": [{"encrypted_blob": "b", "iv": "i", "salt": "s", "title_hmac": f"new-{i}"} for i in range(3)],
+      "update": [
+        {"id": existing, "expected_version": 1, "title_hmac": "existing-v2"},
+        {"id": doomed, "expected_version": 7, "title_hmac": "stale"},
+      ],
+      "delete": [doomed, "00000000-0000-0000-0000-000000000000"],
+    },
+    headers=auth_header(token),
+  )
+  assert resp.status_code == 200
+  body = resp.json()
+  assert [r["status"] for r in body["created"]] == ["created"] * 3
+  assert body["updated"] == [
+    {"id": existing, "status": "updated", "version": 2},
+    {"id": doomed, "status": "conflict", "version": 1},
+  ]
+  assert [r["status"] for r in body["deleted"]] == ["deleted", "not_found"]
+
+  listed = client.get("/api/items/", headers=auth_header(token)).json()
+  assert len(listed) == 4
+  assert client.get(f"/api/items/{existing}", headers=auth_header(token)).json()["title_hmac"] == "existing-v2"
+
+
+def test_current_user_served_from_cache_and_invalidated_on_login():
+  user_cache.clear()
+  token = register_user("cache@example.com")
+
+  first = client.get("/api/user/me", headers=auth_header(token))
+  assert first.status_code == 200
+  assert first.json()["last_login"] is None
+  hits = user_cache.hits
+  assert client.get("/api/user/me", headers=auth_header(token)).status_code == 200
+  assert user_cache.hits == hits + 1
+
+  client.post(
+    "/api/auth/login",
+    data={"username": "cache@example.com", "password": "secret123"},
+    headers={"Content-Type": "application/x-www-form-urlencoded"},
+  )
+  refreshed = client.get("/api/user/me", headers=auth_header(token))
+  assert refreshed.json()["last_login"] is not None
+
+
+def test_audit_logs_keyset_pagination_and_filters():
+  token = register_user("audit@example.com")
+  user_id = uuid.UUID(client.get("/api/user/me", headers=auth_header(token)).json()["id"])
+  base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+  with Session(engine) as db:
+    db.add_all(
+      AuditLog(user_id=user_id, action="login" if i % 2 else "item_read", ts=base + timedelta(hours=i))
+      for i in range(6)
+    )
+    db.commit()
+
+  resp = client.get("/api/audit/logs", params={"limit": 2}, headers=auth_header(token))
+  assert resp.status_code == 200
+  first_page = resp.json()
+  assert [log["action"] for log in first_page] == ["login", "item_read"]
+  cursor = resp.headers["x-next-cursor"]
+
+  resp = client.get("/api/audit/logs", params={"limit": 10, "cursor": cursor}, headers=auth_header(token))
+  assert len(resp.json()) == 4
+  assert "x-next-cursor" not in resp.headers
+
+  filtered = client.get(
+    "/api/audit/logs",
+    params={"action": "login", "since": (base + timedelta(hours=2)).isoformat()},
+    headers=auth_header(token),
+  ).json()
+  assert len(filtered) == 2
+  assert {log["action"] for log in filtered} == {"login"}
+
+
+def test_blind_index_token_search():
+  token = register_user("blind@example.com")
+
+  def create_with_tokens(tokens: list[str]) -> str:
+    resp = client.post(
+      "/api/items/",
+      json={"encrypted_blob": "b", "iv": "i", "salt": "s", "search_tokens": tokens},
+      headers=auth_header(token),
+    )
+    assert resp.status_code == 201
+    return resp.json()["id"]
+
+  bank = create_with_tokens(["w:bank", "p:ba", "w:login"])
+  mail = create_with_tokens(["w:mail", "w:login"])
+
+  def search(*tokens: str, match: str = "any") -> list[dict]:
+    resp = client.get("/api/search/tokens", params={"t": list(tokens), "match": match}, headers=auth_header(token))
+    assert resp.status_code == 200
+    return resp.json()
+
+  ranked = search("w:bank", "w:login")
+  assert [(hit["id"], hit["matches"]) for hit in ranked] == [(bank, 2), (mail, 1)]
+  assert [hit["id"] for hit in search("w:bank", "w:login", match="all")] == [bank]
+
+  client.put(f"/api/items/{mail}", json={"search_tokens": ["w:inbox"]}, headers=auth_header(token))
+  assert [hit["id"] for hit in search("w:login")] == [bank]
+  assert [hit["id"] for hit in search("w:inbox")] == [mail]
+
+  batch = client.post(
+    "/api/items/batch",
+    json={"create": [{"encrypted_blob": "b", "iv": "i", "salt": "s", "search_tokens": ["w:inbox"]}], "delete": [mail]},
+    headers=auth_header(token),
+  ).json()
+  assert [hit["id"] for hit in search("w:inbox")] == [batch["created"][0]["id"]]
+
+
+def test_tag_filters_and_tag_counts():
+  token = register_user("tags@example.com")
+
+  def create_tagged(tags: list[str]) -> str:
+    resp = client.post(
+      "/api/items/",
+      json={"title_hmac": "h", "encrypted_blob": "b", "iv": "i", "salt": "s", "tags": tags},
+      headers=auth_header(token),
+    )
+    assert resp.status_code == 201
+    return resp.json()["id"]
+
+  work = create_tagged(["work", "email"])
+  home = create_tagged(["home", "email"])
+  bank = create_tagged(["finance"])
+
+  def listed(path: str = "/api/items/", **params) -> set[str]:
+    resp = client.get(path, params=params, headers=auth_header(token))
+    assert resp.status_code == 200
+    return {item["id"] for item in resp.json()}
+
+  assert listed(tag=["work", "finance"]) == {work, bank}
+  assert listed(tag=["work", "email"], tag_match="all") == {work}
+  assert listed("/api/search", q="h", tag=["email"]) == {work, home}
+
+  def counts() -> dict[str, int]:
+    resp = client.get("/api/items/tags", headers=auth_header(token))
+    assert resp.status_code == 200
+    return {row["tag"]: row["count"] for row in resp.json()}
+
+  assert counts() == {"email": 2, "finance": 1, "home": 1, "work": 1}
+
+  client.put(f"/api/items/{home}", json={"tags": ["home"]}, headers=auth_header(token))
+  client.delete(f"/api/items/{bank}", headers=auth_header(token))
+  client.post(
+    "/api/items/batch",
+    json={
+      "create": [{"encrypted_blob": "b", "iv": "i", "salt": "s", "tags": ["finance"]}],
+      "update": [{"id": work, "expected_version": 1, "tags": ["work"]}],
+    },
+    headers=auth_header(token),
+  )
+  assert counts() == {"finance": 1, "home": 1, "work": 1}
+
+
+def test_multi_use_ot_link_served_until_expiry():
+  token = register_user("shared@example.com")
+  create_resp = client.post(
+    "/api/ot-links/",
+    json={
+      "encrypted_payload": "payload",
+      "salt": "salt",
+      "iv": "iv",
+      "expiry": (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat(),
+      "single_use": False,
+    },
+    headers=auth_header(token),
+  )
+  link_id = create_resp.json()["id"]
+
+  for _ in range(3):
+    resp = client.get(f"/api/ot-links/{link_id}")
+    assert resp.status_code == 200
+    assert resp.json()["used"] is False
+
+
+def test_blob_upload_download_and_item_reference():
+  token = register_user("blobs@example.com")
+  other = register_user("blobs-other@example.com")
+  data = b"ciphertext-bytes"
+  digest = hashlib.sha256(data).hexdigest()
+
+  bad = client.put(f"/api/blobs/{digest}", content=b"tampered", headers=auth_header(token))
+  assert bad.status_code == 400
+
+  created = client.put(f"/api/blobs/{digest}", content=data, headers=auth_header(token))
+  assert created.status_code == 201
+  assert created.json() == {"digest": digest, "size": len(data)}
+  assert client.put(f"/api/blobs/{digest}", content=data, headers=auth_header(token)).status_code == 200
+
+  full = client.get(f"/api/blobs/{digest}", headers=auth_header(token))
+  assert full.status_code == 200
+  assert full.content == data
+  partial = client.get(f"/api/blobs/{digest}", headers={**auth_header(token), "Range": "bytes=2-5"})
+  assert partial.status_code == 206
+  assert partial.content == data[2:6]
+  assert partial.headers["content-range"] == f"bytes 2-5/{len(data)}"
+
+  # Knowing a digest is not enough to read or reference someone else's blob.
+  assert client.get(f"/api/blobs/{digest}", headers=auth_header(other)).status_code == 404
+  payload = {"blob_ref": digest, "iv": "i", "salt": "s"}
+  assert client.post("/api/items/", json=payload, headers=auth_header(other)).status_code == 422
+
+  resp = client.post("/api/items/", json=payload, headers=auth_header(token))
+  assert resp.status_code == 201
+  assert resp.json()["blob_ref"] == digest
+  assert resp.json()["encrypted_blob"] is None
+
+
+def test_large_ciphertexts_offloaded_to_blob_store():
+  token = register_user("offload@example.com")
+  large = "x" * (get_settings().blob_inline_max_bytes + 1)
+
+  resp = client.post("/api/items/", json={"encrypted_blob": large, "iv": "i", "salt": "s"}, headers=auth_header(token))
+  assert resp.status_code == 201
+  item = resp.json()
+  assert item["encrypted_blob"] is None
+  assert item["blob_ref"] == hashlib.sha256(large.encode()).hexdigest()
+  assert client.get(f"/api/blobs/{item['blob_ref']}", headers=auth_header(token)).content == large.encode()
+
+  # Going back to a small inline ciphertext drops the reference.
+  resp = client.put(f"/api/items/{item['id']}", json={"encrypted_blob": "small"}, headers=auth_header(token))
+  assert resp.json()["encrypted_blob"] == "small"
+  assert resp.json()["blob_ref"] is None
+
+  link = client.post(
+    "/api/ot-links/",
+    json={
+      "encrypted_payload": large,
+      "salt": "s",
+      "iv": "i",
+      "expiry": (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat(),
+    },
+    headers=auth_header(token),
+  ).json()
+  fetched = client.get(f"/api/ot-links/{link['id']}")
+  assert fetched.status_code == 200
+  assert fetched.json()["encrypted_payload"] == large
+
+
+def test_released_blobs_removed_from_store():
+  token = register_user("release@example.com")
+  other = register_user("release-other@example.com")
+  size = get_settings().blob_inline_max_bytes + 1
+
+  def offloaded(fill: str) -> tuple[str, str]:
+    data = fill * size
+    return data, hashlib.sha256(data.encode()).hexdigest()
+
+  def stored(digest: str) -> bool:
+    return asyncio.run(blob_store.head_object(digest)) is not None
+
+  def claimed(digest: str, owner: str) -> bool:
+    return client.get(f"/api/blobs/{digest}", headers=auth_header(owner)).status_code == 200
+
+  def create(data: str, owner: str = token) -> str:
+    resp = client.post("/api/items/", json={"encrypted_blob": data, "iv": "i", "salt": "s"}, headers=auth_header(owner))
+    return resp.json()["id"]
+
+  def create_link(data: str) -> str:
+    expiry = (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat()
+    resp = client.post(
+      "/api/ot-links/",
+      json={"encrypted_payload": data, "salt": "s", "iv": "i", "expiry": expiry},
+      headers=auth_header(token),
+    )
+    return resp.json()["id"]
+
+  # Replacing an item's ciphertext releases the old blob.
+  data, digest = offloaded("a")
+  item_id = create(data)
+  assert stored(digest)
+  client.put(f"/api/items/{item_id}", json={"encrypted_blob": "small"}, headers=auth_header(token))
+  assert not stored(digest)
+  assert not claimed(digest, token)
+
+  # Deleting the item releases it too.
+  data, digest = offloaded("b")
+  item_id = create(data)
+  assert client.delete(f"/api/items/{item_id}", headers=auth_header(token)).status_code == 204
+  assert not stored(digest)
+  assert not claimed(digest, token)
+
+  data, digest = offloaded("c")
+  item_id = create(data)
+  resp = client.post("/api/items/batch", json={"delete": [item_id]}, headers=auth_header(token))
+  assert resp.status_code == 200
+  assert not stored(digest)
+
+  # An object stays while anyone still claims it.
+  data, digest = offloaded("d")
+  mine, theirs = create(data), create(data, other)
+  client.delete(f"/api/items/{mine}", headers=auth_header(token))
+  assert stored(digest)
+  assert not claimed(digest, token)
+  assert claimed(digest, other)
+  client.delete(f"/api/items/{theirs}", headers=auth_header(other))
+  assert not stored(digest)
+
+  # Consuming or deleting a one-time link drops its stored payload.
+  data, digest = offloaded("e")
+  link_id = create_link(data)
+  assert client.get(f"/api/ot-links/{link_id}").json()["encrypted_payload"] == data
+  assert not stored(digest)
+  assert not claimed(digest, token)
+
+  data, digest = offloaded("f")
+  link_id = create_link(data)
+  assert client.delete(f"/api/ot-links/{link_id}", headers=auth_header(token)).status_code == 204
+  assert not stored(digest)
+  assert not claimed(digest, token)
+
+
+def test_msgpack_negotiation_and_raw_blob_download():
+  token = register_user("msgpack@example.com")
+  item_id = client.post(
+    "/api/items/",
+    json={"encrypted_blob": "cipher", "iv": "iv", "salt": "salt", "tags": ["a"]},
+    headers=auth_header(token),
+  ).json()["id"]
+
+  resp = client.get(f"/api/items/{item_id}", headers={**auth_header(token), "Accept": "application/msgpack"})
+  assert resp.status_code == 200
+  assert resp.headers["content-type"] == "application/msgpack"
+  assert resp.headers["vary"] == "Accept"
+  item = msgpack.unpackb(resp.content)
+  assert item["id"] == item_id
+  assert item["encrypted_blob"] == b"cipher"
+  assert item["tags"] == ["a"]
+
+  synced = client.get("/api/items/sync", headers={**auth_header(token), "Accept": "application/msgpack"})
+  assert [entry["id"] for entry in msgpack.unpackb(synced.content)["changed"]] == [item_id]
+  assert synced.headers["vary"] == "Accept"
+  assert client.get("/api/items/sync", headers=auth_header(token)).headers["vary"] == "Accept"
+
+  raw = client.get(f"/api/items/{item_id}/blob", headers=auth_header(token))
+  assert raw.headers["content-type"] == "application/octet-stream"
+  assert raw.content == b"cipher"
+
+  link_id = client.post(
+    "/api/ot-links/",
+    json={
+      "encrypted_payload": "payload",
+      "salt": "s",
+      "iv": "i",
+      "single_use": False,
+      "expiry": (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat(),
+    },
+    headers=auth_header(token),
+  ).json()["id"]
+  link = client.get(f"/api/ot-links/{link_id}", headers={"Accept": "application/msgpack"})
+  assert msgpack.unpackb(link.content)["encrypted_payload"] == b"payload"
+  assert link.headers["vary"] == "Accept"
+  assert client.get(f"/api/ot-links/{link_id}").headers["vary"] == "Accept"
+
+
+def test_listing_reads_metadata_columns_only():
+  token = register_user("columns@example.com")
+  create_item(token, "columns")
+
+  statements: list[str] = []
+
+  def capture(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+  event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+  try:
+    listed = client.get("/api/items/", headers=auth_header(token)).json()
+    found = client.get("/api/search", params={"q": "columns"}, headers=auth_header(token)).json()
+  finally:
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+  item_selects = [statement for statement in statements if "FROM items" in statement]
+  assert item_selects
+  assert not any("encrypted_blob" in statement for statement in item_selects)
+  assert set(listed[0]) == set(ItemMeta.model_fields)
+  assert found == listed
+
+
+def test_conditional_requests_with_etags():
+  token = register_user("etag@example.com")
+  headers = auth_header(token)
+  item_id = create_item(token, "etag")
+
+  item = client.get(f"/api/items/{item_id}", headers=headers)
+  etag = item.headers["etag"]
+  assert item.headers["vary"] == "Accept"
+  revalidated = client.get(f"/api/items/{item_id}", headers={**headers, "If-None-Match": etag})
+  assert revalidated.status_code == 304
+  assert revalidated.headers["vary"] == "Accept"
+  msgpack_etag = client.get(f"/api/items/{item_id}", headers={**headers, "Accept": "application/msgpack"}).headers["etag"]
+  assert msgpack_etag != etag
+
+  listing = client.get("/api/items/", headers=headers)
+  list_etag = listing.headers["etag"]
+  assert listing.headers["vary"] == "Accept"
+  revalidated = client.get("/api/items/", headers={**headers, "If-None-Match": list_etag})
+  assert revalidated.status_code == 304
+  assert revalidated.headers["vary"] == "Accept"
+  assert client.get("/api/items/?limit=1", headers={**headers, "If-None-Match": list_etag}).status_code == 200
+
+  stale = client.put(f"/api/items/{item_id}", json={"title_hmac": "x"}, headers={**headers, "If-Match": '"0-0"'})
+  assert stale.status_code == 412
+  updated = client.put(f"/api/items/{item_id}", json={"title_hmac": "new"}, headers={**headers, "If-Match": etag})
+  assert updated.status_code == 200
+  assert updated.headers["etag"] != etag
+
+  # Any item write moves the vault revision and with it the listing ETag.
+  assert client.get("/api/items/", headers={**headers, "If-None-Match": list_etag}).status_code == 200
+  assert client.get(f"/api/items/{item_id}", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+  assert client.delete(f"/api/items/{item_id}", headers={**headers, "If-Match": etag}).status_code == 412
+  assert client.delete(f"/api/items/{item_id}", headers={**headers, "If-Match": updated.headers["etag"]}).status_code == 204
+
+  me = client.get("/api/user/me", headers=headers)
+  assert me.json()["email"] == "etag@example.com"
+  assert client.get("/api/user/me", headers={**headers, "If-None-Match": me.headers["etag"]}).status_code == 304
+
+
+def test_logout_revokes_the_presented_token():
+  token = register_user("logout@example.com")
+  other = client.post(
+    "/api/auth/login",
+    data={"username": "logout@example.com", "password": "secret123"},
+    headers={"Content-Type": "application/x-www-form-urlencoded"},
+  ).json()["access_token"]
+
+  resp = client.post("/api/auth/logout", headers=auth_header(token))
+  assert resp.status_code == 200
+
+  assert client.get("/api/user/me", headers=auth_header(token)).status_code == 401
+  assert client.post("/api/auth/logout", headers=auth_header(token)).status_code == 401
+  # Other sessions of the same account stay valid.
+  assert client.get("/api/user/me", headers=auth_header(other)).status_code == 200
+
+
+def test_reads_go_to_replicas_except_after_own_writes():
+  router = ReplicaRouter(
+    [Replica(name="replica", engine=async_engine)], max_lag_seconds=5, sticky_seconds=60, check_interval=5
+  )
+  previous = replicas.replica_router
+  replicas.replica_router = security.replica_router = router
+  try:
+    token = register_user("replica@example.com")
+    # Registering pins the new user to the primary.
+    assert client.get("/api/user/me", headers=auth_header(token)).status_code == 200
+    assert router.stats()["sticky_reads"] == 1
+
+    router._sticky.clear()
+    assert client.get("/api/items/", headers=auth_header(token)).status_code == 200
+    assert client.get("/api/audit/logs", headers=auth_header(token)).status_code == 200
+    assert router.stats()["replicas"][0]["reads"] == 2
+
+    resp = client.post(
+      "/api/items/",
+      json={"title_hmac": "h", "encrypted_blob": "YQ==", "iv": "aXY=", "salt": "c2FsdA=="},
+      headers=auth_header(token),
+    )
+    assert resp.status_code == 201
+    listed = client.get("/api/items/", headers=auth_header(token))
+    assert [item["id"] for item in listed.json()] == [resp.json()["id"]]
+    assert router.stats()["sticky_reads"] == 2
+    assert router.stats()["replicas"][0]["reads"] == 2
+  finally:
+    replicas.replica_router = security.replica_router = previous
+
+
+def test_unreachable_replica_falls_back_to_the_primary():
+  missing = f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'missing', 'replica.db')}"
+  dead = Replica(name="dead", engine=create_async_engine(to_async_url(missing)))
+  router = ReplicaRouter([dead], max_lag_seconds=5, sticky_seconds=60, check_interval=5)
+  previous = replicas.replica_router
+  replicas.replica_router = security.replica_router = router
+  try:
+    token = register_user("dead-replica@example.com")
+    router._sticky.clear()
+    assert client.get("/api/items/", headers=auth_header(token)).status_code == 200
+    assert not dead.healthy
+    assert dead.failures == 1
+  finally:
+    replicas.replica_router = security.replica_router = previous
+
+
+def test_vault_export_and_import_roundtrip():
+  token = register_user("export@example.com")
+  large = "x" * (get_settings().blob_inline_max_bytes + 1)
+  created = [
+    client.post(
+      "/api/items/",
+      json={"encrypted_blob": blob, "iv": "i", "salt": "s", "tags": ["work"], "search_tokens": ["tok"]},
+      headers=auth_header(token),
+    ).json()
+    for blob in ("small", large, "other")
+  ]
+
+  resp = client.get("/api/items/export", headers=auth_header(token))
+  assert resp.status_code == 200
+  assert resp.headers["content-type"].startswith("application/x-ndjson")
+  lines = resp.content.splitlines(keepends=True)
+  records = [json.loads(line) for line in lines]
+  assert [record["type"] for record in records] == ["header", "item", "item", "item", "manifest"]
+  assert base64.b64decode(records[2]["encrypted_blob"]) == large.encode()
+  assert records[-1]["count"] == 3
+  assert records[-1]["sha256"] == hashlib.sha256(b"".join(lines[1:-1])).hexdigest()
+
+  # Tampered or truncated exports are rejected without importing anything.
+  for body in (lines[:-2] + lines[-1:], lines[:-1]):
+    resp = client.post("/api/items/import", content=b"".join(body), headers=auth_header(token))
+    assert resp.status_code == 422
+
+  removed = created[1]["id"]
+  assert client.delete(f"/api/items/{removed}", headers=auth_header(token)).status_code == 204
+
+  def chunks():
+    # Split mid-line, as a network stream would be.
+    body = b"".join(lines)
+    for offset in range(0, len(body), 1000):
+      yield body[offset : offset + 1000]
+
+  resp = client.post("/api/items/import", content=chunks(), headers=auth_header(token))
+  assert resp.status_code == 200
+  assert resp.json() == {"imported": 1, "skipped": 2}
+
+  restored = client.get(f"/api/items/{removed}", headers=auth_header(token)).json()
+  assert restored["blob_ref"] == hashlib.sha256(large.encode()).hexdigest()
+  hits = client.get("/api/search/tokens", params={"t": "tok"}, headers=auth_header(token)).json()
+  assert {hit["id"] for hit in hits} == {item["id"] for item in created}
+  tags = client.get("/api/items/tags", headers=auth_header(token)).json()
+  assert tags == [{"tag": "work", "count": 3}]
+  sync = client.get("/api/items/sync", headers=auth_header(token)).json()
+  assert removed not in sync["deleted"]
+
+
+def test_vault_import_from_another_account():
+  source = register_user("export-source@example.com")
+  target = register_user("export-target@example.com")
+  created = [
+    client.post(
+      "/api/items/",
+      json={"encrypted_blob": blob, "iv": "i", "salt": "s", "tags": ["moved"]},
+      headers=auth_header(source),
+    ).json()
+    for blob in ("one", "two")
+  ]
+  export = client.get("/api/items/export", headers=auth_header(source)).content
+
+  resp = client.post("/api/items/import", content=export, headers=auth_header(target))
+  assert resp.status_code == 200
+  assert resp.json() == {"imported": 2, "skipped": 0}
+
+  # The copies get fresh ids; the source account's items are untouched.
+  imported = [
+    client.get(f"/api/items/{item['id']}", headers=auth_header(target)).json()
+    for item in client.get("/api/items/", headers=auth_header(target)).json()
+  ]
+  assert sorted(item["encrypted_blob"] for item in imported) == ["one", "two"]
+  assert not {item["id"] for item in imported} & {item["id"] for item in created}
+  assert len(client.get("/api/items/", headers=auth_header(source)).json()) == 2
+  assert client.get("/api/items/tags", headers=auth_header(target)).json() == [{"tag": "moved", "count": 2}]
+
+
+def test_vault_import_skips_owned_items_without_storing_them():
+  token = register_user("export-skip@example.com")
+  large = "s" * (get_settings().blob_inline_max_bytes + 1)
+  digest = hashlib.sha256(large.encode()).hexdigest()
+  item = client.post(
+    "/api/items/", json={"encrypted_blob": large, "iv": "i", "salt": "s"}, headers=auth_header(token)
+  ).json()
+  export = client.get("/api/items/export", headers=auth_header(token)).content
+  client.put(f"/api/items/{item['id']}", json={"encrypted_blob": "small"}, headers=auth_header(token))
+  assert asyncio.run(blob_store.head_object(digest)) is None
+
+  resp = client.post("/api/items/import", content=export, headers=auth_header(token))
+  assert resp.json() == {"imported": 0, "skipped": 1}
+  assert asyncio.run(blob_store.head_object(digest)) is None
+  assert client.get(f"/api/blobs/{digest}", headers=auth_header(token)).status_code == 404
+
+
+def test_vault_export_carries_binary_blobs():
+  source = register_user("export-binary@example.com")
+  target = register_user("export-binary-target@example.com")
+  data = bytes(range(256)) * (get_settings().blob_inline_max_bytes // 256 + 1)
+  digest = hashlib.sha256(data).hexdigest()
+  assert client.put(f"/api/blobs/{digest}", content=data, headers=auth_header(source)).status_code == 201
+  item = client.post(
+    "/api/items/", json={"blob_ref": digest, "iv": "i", "salt": "s"}, headers=auth_header(source)
+  ).json()
+
+  export = client.get("/api/items/export", headers=auth_header(source)).content
+  lines = export.splitlines(keepends=True)
+  assert json.loads(lines[0])["encoding"] == "base64"
+  assert json.loads(lines[-1])["count"] == 1
+
+  # A failed import leaves nothing behind in the store.
+  client.delete(f"/api/items/{item['id']}", headers=auth_header(source))
+  assert asyncio.run(blob_store.head_object(digest)) is None
+  resp = client.post("/api/items/import", content=b"".join(lines[:-1]), headers=auth_header(target))
+  assert resp.status_code == 422
+  assert asyncio.run(blob_store.head_object(digest)) is None
+
+  resp = client.post("/api/items/import", content=export, headers=auth_header(target))
+  assert resp.json() == {"imported": 1, "skipped": 0}
+  imported = client.get("/api/items/", headers=auth_header(target)).json()[0]
+  raw = client.get(f"/api/items/{imported['id']}/blob", headers=auth_header(target))
+  assert raw.content == data
@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.blobstore import InMemoryBlobStore
+from app.db.session import Base, to_async_url
+from app.models import Blob, BlobObject, Item, User
+from app.services.blobs import BlobClaimSweeper
+
+
+DATABASE_URL = f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'blob_sweeper.db')}"
+
+Base.metadata.create_all(bind=create_engine(DATABASE_URL))
+
+
+async def _one(data: bytes):
+    yield data
+
+
+def test_sweeper_releases_stale_unreferenced_claims():
+    now = datetime.now(timezone.utc)
+    stale, fresh = now - timedelta(days=2), now - timedelta(minutes=5)
+    owner_id, other_id = uuid.uuid4(), uuid.uuid4()
+    abandoned, referenced, recent, shared = (hashlib.sha256(name).hexdigest() for name in (b"a", b"r", b"n", b"s"))
+    claims = [
+        (owner_id, abandoned, stale),
+        (owner_id, referenced, stale),
+        (owner_id, recent, fresh),
+        (owner_id, shared, stale),
+        (other_id, shared, fresh),
+    ]
+
+    async def scenario():
+        engine = create_async_engine(to_async_url(DATABASE_URL))
+        store = InMemoryBlobStore()
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(User.__table__),
+                [
+                    {"id": user_id, "email": f"{user_id}@example.com", "password_hash": "x", "created_at": now}
+                    for user_id in (owner_id, other_id)
+                ],
+            )
+            await conn.execute(
+                insert(Blob.__table__),
+                [{"owner_id": owner, "digest": digest, "size": 1, "created_at": at} for owner, digest, at in claims],
+            )
+            await conn.execute(
+                insert(BlobObject.__table__),
+                [{"digest": digest, "claimed_at": now} for digest in (abandoned, referenced, recent, shared)],
+            )
+            await conn.execute(
+                insert(Item.__table__),
+                {
+                    "id": uuid.uuid4(),
+                    "owner_id": owner_id,
+                    "blob_ref": referenced,
+                    "iv": b"i",
+                    "salt": b"s",
+                    "version": 1,
+                    "created_at": now,
+                    "updated_at": now,
+                },
+            )
+        for digest in (abandoned, referenced, recent, shared):
+            await store.put_object(digest, _one(b"x"))
+
+        sweeper = BlobClaimSweeper(engine, store, interval=60, batch_size=1, grace_seconds=86400)
+        deleted = await sweeper.sweep(now)
+        async with engine.connect() as conn:
+            remaining = set((await conn.execute(select(Blob.owner_id, Blob.digest))).all())
+        await engine.dispose()
+        stored = {digest for digest in (abandoned, referenced, recent, shared) if await store.head_object(digest)}
+        return deleted, remaining, stored, sweeper.stats()
+
+    deleted, remaining, stored, stats = asyncio.run(scenario())
+    assert deleted == 1
+    assert remaining == {(owner_id, referenced), (owner_id, recent), (other_id, shared)}
+    assert stored == {referenced, recent, shared}
+    assert stats["stale_claims"] == 2
+    assert stats["sweeps"] == 1
@@ -0,0 +1,40 @@
+import asyncio
+import tempfile
+
+import pytest
+
+from app.core.blobstore import LocalBlobStore
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def failing_chunks():
+    yield b"partial"
+    raise ValueError("upload aborted")
+
+
+def test_local_blob_store_roundtrip_and_ranges():
+    async def scenario():
+        store = LocalBlobStore(tempfile.mkdtemp(), chunk_size=3)
+        key = "ab" + "0" * 62
+        assert await store.head_object(key) is None
+        assert await store.put_object(key, chunks(b"hello ", b"world")) == 11
+        whole = [chunk async for chunk in store.get_object(key)]
+        ranged = b"".join([chunk async for chunk in store.get_object(key, start=6, end=9)])
+
+        # A failed upload leaves the existing object untouched.
+        with pytest.raises(ValueError):
+            await store.put_object(key, failing_chunks())
+        after_failure = b"".join([chunk async for chunk in store.get_object(key)])
+
+        await store.delete_object(key)
+        return whole, ranged, after_failure, await store.head_object(key)
+
+    whole, ranged, after_failure, head = asyncio.run(scenario())
+    assert whole == [b"hel", b"lo ", b"wor", b"ld"]
+    assert ranged == b"worl"
+    assert after_failure == b"hello world"
+    assert head is None
@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core import security
+from app.core.config import Settings
+from app.db.pool import InstrumentedQueuePool, pool_status
+from app.db.session import engine_options
+from app.main import app
+
+
+client = TestClient(app)
+
+
+def test_pool_status_records_checkout_wait():
+    engine = create_engine("sqlite+pysqlite://", poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1)
+
+    with engine.connect() as conn:
+        conn.execute(text("select 1"))
+        status = pool_status(engine)
+        assert status["checked_out"] == 1
+
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["wait_seconds"]["count"] == 1
+    assert status["wait_seconds"]["buckets"]["+Inf"] == 1
+
+
+def test_engine_options_pgbouncer_disables_statement_cache():
+    settings = Settings(db_pgbouncer_mode=True, db_statement_timeout_ms=5000, db_pool_size=3)
+    options = engine_options("postgresql+asyncpg://u:p@db/vault", settings, is_async=True)
+
+    assert options["pool_size"] == 3
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    assert "server_settings" not in options["connect_args"]
+
+
+def test_engine_options_statement_timeout():
+    settings = Settings(db_statement_timeout_ms=5000)
+
+    sync_options = engine_options("postgresql://u:p@db/vault", settings, is_async=False)
+    async_options = engine_options("postgresql+asyncpg://u:p@db/vault", settings, is_async=True)
+
+    assert sync_options["connect_args"] == {"options": "-c statement_timeout=5000"}
+    assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+    assert engine_options("sqlite://", settings, is_async=False) == {}
+
+
+def test_internal_pool_endpoint(monkeypatch):
+    assert client.get("/api/internal/db-pool").status_code == 404
+
+    monkeypatch.setattr(security.settings, "internal_api_enabled", True)
+    monkeypatch.setattr(security.settings, "internal_api_token", "ops-secret")
+    assert client.get("/api/internal/db-pool").status_code == 401
+    assert client.get("/api/internal/db-pool", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/api/internal/db-pool", headers={"Authorization": "Bearer ops-secret"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["async"]["pool_class"] == "InstrumentedAsyncQueuePool"
+    assert "wait_seconds" in body["sync"]
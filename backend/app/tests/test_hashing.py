@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.hashing import PasswordHasher, hash_password
+
+
+def test_verify_and_update_rehashes_when_cost_changes():
+    old_hash = hash_password("secret", 1000)
+    hasher = PasswordHasher(rounds=2000, workers=1, max_pending=4, executor="thread")
+
+    async def scenario():
+        valid, new_hash = await hasher.verify_and_update("secret", old_hash)
+        assert valid
+        assert new_hash is not None and "$2000$" in new_hash
+
+        valid, again = await hasher.verify_and_update("secret", new_hash)
+        assert valid and again is None
+
+        valid, _ = await hasher.verify_and_update("wrong", new_hash)
+        assert not valid
+
+    asyncio.run(scenario())
+    hasher.shutdown()
+
+
+def test_process_pool_hashing():
+    hasher = PasswordHasher(rounds=1000, workers=1, max_pending=4)
+
+    async def scenario():
+        password_hash = await hasher.hash("secret")
+        return await hasher.verify_and_update("secret", password_hash)
+
+    assert asyncio.run(scenario()) == (True, None)
+    hasher.shutdown()
+
+
+def test_sheds_load_when_saturated():
+    hasher = PasswordHasher(rounds=1000, workers=1, max_pending=1, executor="thread")
+    hasher.pending = 1
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(hasher.hash("secret"))
+
+    assert exc_info.value.status_code == 429
+    assert hasher.stats()["shed"] == 1
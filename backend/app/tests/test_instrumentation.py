@@ -0,0 +1,54 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import security
+from app.core.instrumentation import Instrumentation, InstrumentationMiddleware
+from app.main import app as main_app
+
+
+def test_middleware_counts_queries_per_route_and_logs_slow_queries(caplog):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrumentation = Instrumentation(slow_query_seconds=0, slow_request_seconds=60)
+    instrumentation.instrument_engine(engine.sync_engine)
+
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware, instrumentation=instrumentation)
+
+    @app.get("/things/{thing_id}")
+    async def read_thing(thing_id: int) -> dict:
+        async with engine.connect() as conn:
+            await conn.execute(text("select 1"))
+            await conn.execute(text("select 2"))
+        return {"id": thing_id}
+
+    with caplog.at_level(logging.WARNING, logger="app.core.instrumentation"):
+        response = TestClient(app).get("/things/7")
+    assert response.status_code == 200
+    assert 'desc="2 queries"' in response.headers["server-timing"]
+    assert any("Slow query" in record.message for record in caplog.records)
+
+    exposition = instrumentation.render_prometheus()
+    labels = 'method="GET",route="/things/{thing_id}"'
+    assert f'http_request_duration_seconds_count{{{labels},status="200"}} 1' in exposition
+    assert f"http_request_db_queries_sum{{{labels}}} 2" in exposition
+    assert "db_query_duration_seconds_count 2" in exposition
+    assert f"http_request_db_connection_seconds_count{{{labels}}} 1" in exposition
+    assert "dbconn;dur=" in response.headers["server-timing"]
+
+
+def test_metrics_endpoint_serves_prometheus_text(monkeypatch):
+    client = TestClient(main_app)
+    assert client.get("/api/items/").status_code == 401
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(security.settings, "internal_api_enabled", True)
+    monkeypatch.setattr(security.settings, "internal_api_token", "ops-secret")
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer ops-secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/items/",status="401"' in response.text
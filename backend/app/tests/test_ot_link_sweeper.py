@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.session import Base, to_async_url
+from app.core.blobstore import InMemoryBlobStore
+from app.models import Blob, BlobObject, OTLink, User
+from app.services.ot_links import OTLinkSweeper
+
+
+DATABASE_URL = f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'sweeper.db')}"
+
+Base.metadata.create_all(bind=create_engine(DATABASE_URL))
+
+
+async def _one(data: bytes):
+    yield data
+
+
+def test_sweeper_purges_expired_and_used_links_in_batches():
+    now = datetime.now(timezone.utc)
+    owner_id = uuid.uuid4()
+
+    def link(expiry: datetime, used: bool = False, payload_ref: Optional[str] = None) -> dict:
+        return {
+            "id": uuid.uuid4(),
+            "owner_id": owner_id,
+            "encrypted_payload": None if payload_ref else b"p",
+            "payload_ref": payload_ref,
+            "salt": b"s",
+            "iv": b"i",
+            "expiry": expiry,
+            "single_use": True,
+            "used": used,
+            "created_at": now,
+        }
+
+    payload = b"stored payload"
+    digest = hashlib.sha256(payload).hexdigest()
+    live = link(now + timedelta(hours=1))
+    rows = [link(now - timedelta(minutes=i)) for i in range(1, 5)] + [
+        link(now - timedelta(minutes=5), payload_ref=digest),
+        link(now + timedelta(hours=1), used=True),
+        live,
+    ]
+
+    async def scenario():
+        engine = create_async_engine(to_async_url(DATABASE_URL))
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(User.__table__),
+                {"id": owner_id, "email": "sweep@example.com", "password_hash": "x", "created_at": now},
+            )
+            await conn.execute(insert(OTLink.__table__), rows)
+            await conn.execute(
+                insert(Blob.__table__), {"owner_id": owner_id, "digest": digest, "size": len(payload), "created_at": now}
+            )
+            await conn.execute(insert(BlobObject.__table__), {"digest": digest, "claimed_at": now})
+        store = InMemoryBlobStore()
+        await store.put_object(digest, _one(payload))
+
+        sweeper = OTLinkSweeper(engine, store, interval=60, batch_size=2)
+        purged = await sweeper.sweep(now)
+        async with engine.connect() as conn:
+            remaining = (await conn.execute(select(OTLink.id))).scalars().all()
+            claims = (await conn.execute(select(Blob.digest))).scalars().all()
+        await engine.dispose()
+        return purged, remaining, claims, await store.head_object(digest), sweeper.stats()
+
+    purged, remaining, claims, stored_size, stats = asyncio.run(scenario())
+    assert purged == 6
+    assert remaining == [live["id"]]
+    assert claims == []
+    assert stored_size is None
+    assert stats["purged"] == 6
+    assert stats["sweeps"] == 1
+    assert stats["duration_seconds"]["count"] == 1
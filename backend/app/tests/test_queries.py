@@ -0,0 +1,79 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db import queries
+from app.db.session import Base, to_async_url
+from app.models import Item, User
+
+
+DATABASE_URL = f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'queries.db')}"
+
+Base.metadata.create_all(bind=create_engine(DATABASE_URL))
+
+
+def test_prebuilt_statements_bind_fresh_values_on_every_call():
+    now = datetime.now(timezone.utc)
+    owners = [uuid.uuid4(), uuid.uuid4()]
+    items = [uuid.uuid4(), uuid.uuid4()]
+
+    async def scenario():
+        engine = create_async_engine(to_async_url(DATABASE_URL))
+        await queries.warm_up(engine)
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(User.__table__),
+                [
+                    {"id": owner, "email": f"{n}@example.com", "password_hash": "x", "created_at": now}
+                    for n, owner in enumerate(owners)
+                ],
+            )
+            await conn.execute(
+                insert(Item.__table__),
+                [
+                    {
+                        "id": item_id,
+                        "owner_id": owner,
+                        "title_hmac": "h",
+                        "encrypted_blob": f"blob-{n}".encode(),
+                        "iv": b"i",
+                        "salt": b"s",
+                        "version": n + 1,
+                        "tags": [],
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for n, (item_id, owner) in enumerate(zip(items, owners))
+                ],
+            )
+
+        async with AsyncSession(engine) as db:
+            emails = [
+                (await db.execute(queries.USER_BY_ID, {"user_id": owner})).scalar_one().email for owner in owners
+            ]
+            by_email = (await db.execute(queries.USER_BY_EMAIL, {"email": "1@example.com"})).scalar_one().id
+            versions = [
+                (await db.execute(queries.OWNED_ITEM_STATE, {"item_id": item_id, "owner_id": owner})).first().version
+                for item_id, owner in zip(items, owners)
+            ]
+            # Another owner's item is never visible.
+            foreign = (
+                await db.execute(queries.OWNED_ITEM_FOR_UPDATE, {"item_id": items[0], "owner_id": owners[1]})
+            ).first()
+            blob = (
+                await db.execute(queries.OWNED_ITEM_CIPHERTEXT, {"item_id": items[1], "owner_id": owners[1]})
+            ).first().encrypted_blob
+        await engine.dispose()
+        return emails, by_email, versions, foreign, blob
+
+    emails, by_email, versions, foreign, blob = asyncio.run(scenario())
+    assert emails == ["0@example.com", "1@example.com"]
+    assert by_email == owners[1]
+    assert versions == [1, 2]
+    assert foreign is None
+    assert blob == b"blob-1"
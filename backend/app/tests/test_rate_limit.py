@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.ratelimit import InMemoryRateLimitBackend, Rate, RateLimiter, RoutePolicy, get_rate_limiter
+from app.main import app
+
+
+def test_token_bucket_allows_burst_then_reports_wait():
+    backend = InMemoryRateLimitBackend()
+    rate = Rate(capacity=3, period=60)
+
+    async def scenario():
+        return [await backend.acquire("k", rate) for _ in range(4)]
+
+    waits = asyncio.run(scenario())
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 19 < waits[3] <= 20
+
+
+def test_backend_evicts_least_recently_used_keys():
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    rate = Rate(capacity=1, period=60)
+
+    async def scenario():
+        await backend.acquire("a", rate)
+        await backend.acquire("b", rate)
+        await backend.acquire("c", rate)
+        # "a" was evicted, so it starts from a full bucket again.
+        return await backend.acquire("a", rate), await backend.acquire("c", rate)
+
+    evicted, kept = asyncio.run(scenario())
+    assert evicted == 0.0
+    assert kept > 0
+
+
+def test_limits_apply_per_account_and_to_the_shared_backend():
+    shared = InMemoryRateLimitBackend()
+    limiter = RateLimiter({"login": RoutePolicy(per_account=Rate.parse("1/60"))}, shared=shared)
+
+    async def scenario():
+        await limiter.check("login", ip="10.0.0.1", account="Alice@example.com")
+        await limiter.check("login", ip="10.0.0.2", account="bob@example.com")
+        # A second worker has its own local buckets but shares the store.
+        other_worker = RateLimiter(limiter.policies, shared=shared)
+        with pytest.raises(HTTPException) as exc:
+            await other_worker.check("login", ip="10.0.0.3", account=" alice@example.com")
+        return exc.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) == 60
+    assert Rate.parse("") is None
+
+
+def test_one_ip_burst_does_not_exhaust_the_route_for_others():
+    limiter = RateLimiter({"login": RoutePolicy(per_ip=Rate.parse("2/60"), per_route=Rate.parse("5/60"))})
+
+    async def scenario():
+        async def attempt(ip: str) -> bool:
+            try:
+                await limiter.check("login", ip=ip)
+            except HTTPException:
+                return False
+            return True
+
+        burst = [await attempt("10.0.0.1") for _ in range(10)]
+        return burst, [await attempt("10.0.0.2") for _ in range(2)]
+
+    burst, others = asyncio.run(scenario())
+    assert burst.count(True) == 2
+    assert others == [True, True]
+
+
+def test_ot_link_fetch_is_rejected_before_lookup():
+    limiter = RateLimiter({"ot_link_fetch": RoutePolicy(per_ip=Rate(capacity=1, period=30))})
+    asyncio.run(limiter.check("ot_link_fetch", ip="testclient"))
+
+    previous = app.dependency_overrides.get(get_rate_limiter)
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    try:
+        response = TestClient(app).get(f"/api/ot-links/{uuid.uuid4()}")
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_rate_limiter)
+        else:
+            app.dependency_overrides[get_rate_limiter] = previous
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "30"
+    assert limiter.stats()["rejected"] == {"ot_link_fetch": 1}
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+from typing import Optional
+
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import replicas
+from app.db.replicas import InMemoryPinBackend, Replica, ReplicaRouter, bind_session_user
+from app.db.session import to_async_url
+
+
+DATABASE_URL = f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'replica.db')}"
+
+counters = Table("counters", MetaData(), Column("id", Integer, primary_key=True))
+counters.metadata.create_all(bind=create_engine(DATABASE_URL))
+
+
+def make_router(*replicas: Replica, shared: Optional[InMemoryPinBackend] = None) -> ReplicaRouter:
+    return ReplicaRouter(list(replicas), max_lag_seconds=5, sticky_seconds=60, check_interval=5, shared=shared)
+
+
+def choose(router: ReplicaRouter, user_id: Optional[str] = None) -> Optional[Replica]:
+    return asyncio.run(router.choose(user_id))
+
+
+def replica(name: str, url: str = DATABASE_URL) -> Replica:
+    return Replica(name=name, engine=create_async_engine(to_async_url(url)))
+
+
+def test_round_robin_skips_unhealthy_and_lagging_replicas():
+    first, second, third = replica("a"), replica("b"), replica("c")
+    router = make_router(first, second, third)
+
+    assert [choose(router).name for _ in range(3)] == ["a", "b", "c"]
+
+    router.mark_failed(second)
+    third.lag_seconds = 30
+    assert {choose(router).name for _ in range(4)} == {"a"}
+
+    router.mark_failed(first)
+    assert choose(router) is None
+    assert router.stats()["primary_reads"] == 1
+
+
+def test_health_check_restores_replicas_and_marks_broken_ones():
+    good = replica("good")
+    broken = replica("broken", f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'missing', 'x.db')}")
+    router = make_router(good, broken)
+    router.mark_failed(good)
+
+    asyncio.run(router.check())
+
+    assert good.healthy and good.lag_seconds == 0.0
+    assert not broken.healthy
+    assert [choose(router).name for _ in range(2)] == ["good", "good"]
+
+
+def test_committed_writes_pin_the_user_to_the_primary(monkeypatch):
+    router = make_router(replica("a"))
+    monkeypatch.setattr(replicas, "replica_router", router)
+
+    async def scenario():
+        engine = create_async_engine(to_async_url(DATABASE_URL))
+        async with async_sessionmaker(engine)() as db:
+            bind_session_user(db, "reader")
+            await db.execute(counters.select())
+            await db.commit()
+            bind_session_user(db, "writer")
+            await db.execute(insert(counters).values(id=1))
+            await db.commit()
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    assert choose(router, "reader") is not None
+    assert choose(router, "writer") is None
+    assert router.stats()["sticky_reads"] == 1
+
+
+def test_shared_pins_route_other_workers_to_the_primary(monkeypatch):
+    shared = InMemoryPinBackend()
+    writer_worker = make_router(replica("a"), shared=shared)
+    other_worker = make_router(replica("b"), shared=shared)
+    monkeypatch.setattr(replicas, "replica_router", writer_worker)
+
+    async def scenario():
+        engine = create_async_engine(to_async_url(DATABASE_URL))
+        async with async_sessionmaker(engine)() as db:
+            bind_session_user(db, "writer")
+            await db.execute(insert(counters).values(id=2))
+            await db.commit()
+        await engine.dispose()
+        await asyncio.sleep(0)
+        return await other_worker.choose("writer"), await other_worker.choose("reader")
+
+    writer_read, reader_read = asyncio.run(scenario())
+    assert writer_read is None
+    assert reader_read is not None
+    assert other_worker.stats()["sticky_reads"] == 1
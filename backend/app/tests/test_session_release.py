@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, field_validator
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.routing import SessionReleasingRoute
+
+
+engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'release.db')}")
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+checked_out_while_serializing: list[int] = []
+
+
+async def get_session():
+    async with SessionLocal() as db:
+        yield db
+
+
+class Answer(BaseModel):
+    value: int
+
+    @field_validator("value")
+    @classmethod
+    def record_pool(cls, value: int) -> int:
+        checked_out_while_serializing.append(engine.sync_engine.pool.checkedout())
+        return value
+
+
+def make_client(route_class) -> TestClient:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/answer", response_model=Answer)
+    async def answer(db: AsyncSession = Depends(get_session)) -> dict:
+        return {"value": await db.scalar(text("select 42"))}
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_connection_released_before_response_serialization():
+    checked_out_while_serializing.clear()
+    assert make_client(APIRouter().route_class).get("/answer").json() == {"value": 42}
+    assert make_client(SessionReleasingRoute).get("/answer").json() == {"value": 42}
+    # The plain route still holds its connection while the response is built.
+    assert checked_out_while_serializing == [1, 0]
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.bloom import BloomFilter
+from app.db.session import Base, to_async_url
+from app.models import RevokedToken, User
+from app.services.token_revocation import TokenDenylist
+
+
+DATABASE_URL = f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'revocation.db')}"
+
+Base.metadata.create_all(bind=create_engine(DATABASE_URL))
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    members = [uuid.uuid4().hex for _ in range(1000)]
+    for member in members:
+        bloom.add(member)
+
+    assert all(member in bloom for member in members)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_revocations_reach_other_workers_and_age_out():
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+
+    async def scenario():
+        engine = create_async_engine(to_async_url(DATABASE_URL))
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(User.__table__),
+                {"id": user_id, "email": "revoke@example.com", "password_hash": "x", "created_at": now},
+            )
+
+        worker_a = TokenDenylist(engine, interval=60, capacity=4, error_rate=0.01)
+        worker_b = TokenDenylist(engine, interval=60, capacity=4, error_rate=0.01)
+        await worker_b.refresh(now)
+
+        async with async_sessionmaker(engine)() as db:
+            await worker_a.revoke(db, "short", user_id, now + timedelta(minutes=1))
+            await worker_a.revoke(db, "long", user_id, now + timedelta(hours=1))
+            await db.commit()
+
+        results = {"local": worker_a.is_revoked("long"), "before_refresh": worker_b.is_revoked("long")}
+        await worker_b.refresh(now)
+        results["after_refresh"] = worker_b.is_revoked("long"), worker_b.is_revoked("short")
+        results["unrelated"] = worker_b.is_revoked(uuid.uuid4().hex)
+
+        later = now + timedelta(minutes=5)
+        await worker_b.refresh(later)
+        results["aged_out"] = worker_b.is_revoked("short", now=later.timestamp())
+        results["still_revoked"] = worker_b.is_revoked("long", now=later.timestamp())
+        async with engine.connect() as conn:
+            results["rows"] = (await conn.execute(select(RevokedToken.jti))).scalars().all()
+        results["stats"] = worker_b.stats()
+        await engine.dispose()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results["local"] is True
+    assert results["before_refresh"] is False
+    assert results["after_refresh"] == (True, True)
+    assert results["unrelated"] is False
+    assert results["aged_out"] is False
+    assert results["still_revoked"] is True
+    assert results["rows"] == ["long"]
+    assert results["stats"]["revoked"] == 1
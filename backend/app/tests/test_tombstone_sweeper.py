@@ -0,0 +1,55 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import get_settings
+from app.db.session import Base, to_async_url
+from app.models import ItemTombstone, User
+from app.services.item_tombstones import TombstoneSweeper
+
+
+DATABASE_URL = f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(), 'tombstones.db')}"
+
+Base.metadata.create_all(bind=create_engine(DATABASE_URL))
+
+
+def test_sweeper_purges_tombstones_past_retention_in_batches():
+    now = datetime.now(timezone.utc)
+    retention = timedelta(days=get_settings().sync_tombstone_retention_days)
+    owner_id = uuid.uuid4()
+    expired = [uuid.uuid4() for _ in range(5)]
+    kept = uuid.uuid4()
+
+    async def scenario():
+        engine = create_async_engine(to_async_url(DATABASE_URL))
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(User.__table__),
+                {"id": owner_id, "email": "tombstones@example.com", "password_hash": "x", "created_at": now},
+            )
+            await conn.execute(
+                insert(ItemTombstone.__table__),
+                [
+                    {"item_id": item_id, "owner_id": owner_id, "deleted_at": now - retention - timedelta(days=i + 1)}
+                    for i, item_id in enumerate(expired)
+                ]
+                + [{"item_id": kept, "owner_id": owner_id, "deleted_at": now - retention + timedelta(days=1)}],
+            )
+
+        sweeper = TombstoneSweeper(engine, interval=60, batch_size=2)
+        purged = await sweeper.sweep(now)
+        async with engine.connect() as conn:
+            remaining = (await conn.execute(select(ItemTombstone.item_id))).scalars().all()
+        await engine.dispose()
+        return purged, remaining, sweeper.stats()
+
+    purged, remaining, stats = asyncio.run(scenario())
+    assert purged == 5
+    assert remaining == [kept]
+    assert stats["sweeps"] == 1
+    assert stats["purged"] == 5
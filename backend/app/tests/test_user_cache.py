@@ -0,0 +1,48 @@
+import asyncio
+
+from app.core.cache import InMemoryCacheBackend, TTLCache
+
+
+def test_ttl_cache_lru_eviction_and_stats():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    async def scenario():
+        await cache.set("a", {"v": 1})
+        await cache.set("b", {"v": 2})
+        assert await cache.get("a") == {"v": 1}
+        await cache.set("c", {"v": 3})  # evicts "b", the least recently used
+        assert await cache.get("b") is None
+        assert await cache.get("c") == {"v": 3}
+
+    asyncio.run(scenario())
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_ttl_cache_expiry():
+    cache = TTLCache(maxsize=10, ttl=0)
+
+    async def scenario():
+        await cache.set("a", {"v": 1})
+        assert await cache.get("a") is None
+
+    asyncio.run(scenario())
+
+
+def test_ttl_cache_shared_backend_and_invalidation():
+    backend = InMemoryCacheBackend()
+    writer = TTLCache(maxsize=10, ttl=60, backend=backend)
+    reader = TTLCache(maxsize=10, ttl=60, backend=backend)
+
+    async def scenario():
+        await writer.set("user", {"email": "a@example.com"})
+        assert await reader.get("user") == {"email": "a@example.com"}
+
+        reader.invalidate("user")
+        await asyncio.sleep(0)  # let the scheduled shared-tier delete run
+        assert await backend.get("user") is None
+
+    asyncio.run(scenario())
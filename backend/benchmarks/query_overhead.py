@@ -0,0 +1,122 @@
+"""Per-call Python overhead of hot lookups: per-request select() versus app.db.queries.
+
+Each variant runs the same primary-key lookups through an ORM Session against
+an in-memory SQLite database, so the differences between them are statement
+construction and cache-key work rather than database time. ``lambda_stmt``
+is included for comparison; it was measured slower than plain statements on
+these ORM lookups, which is why app.db.queries prebuilds statements instead::
+
+    python -m benchmarks.query_overhead --iterations 20000
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from sqlalchemy import create_engine, insert, lambda_stmt, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+
+def cpu_per_call(fn: Callable[[], Any], iterations: int) -> float:
+    fn()
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    from app.db import queries
+    from app.db.session import Base
+    from app.models import Item, User
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    owner_id, item_id = uuid.uuid4(), uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User.__table__),
+            {"id": owner_id, "email": "bench@example.com", "password_hash": "x", "created_at": now},
+        )
+        conn.execute(
+            insert(Item.__table__),
+            {
+                "id": item_id,
+                "owner_id": owner_id,
+                "title_hmac": "h",
+                "encrypted_blob": b"b",
+                "iv": b"i",
+                "salt": b"s",
+                "version": 1,
+                "tags": [],
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+
+    owned = {"item_id": item_id, "owner_id": owner_id}
+    cases = {
+        "user_by_id": (
+            lambda: (select(User).where(User.id == owner_id), None),
+            lambda: (lambda_stmt(lambda: select(User).where(User.id == owner_id)), None),
+            lambda: (queries.USER_BY_ID, {"user_id": owner_id}),
+        ),
+        "user_by_email": (
+            lambda: (select(User).where(User.email == "bench@example.com"), None),
+            lambda: (lambda_stmt(lambda: select(User).where(User.email == "bench@example.com")), None),
+            lambda: (queries.USER_BY_EMAIL, {"email": "bench@example.com"}),
+        ),
+        "owned_item": (
+            lambda: (select(Item).where(Item.id == item_id, Item.owner_id == owner_id), None),
+            lambda: (lambda_stmt(lambda: select(Item).where(Item.id == item_id, Item.owner_id == owner_id)), None),
+            lambda: (queries.OWNED_ITEM, owned),
+        ),
+        "owned_item_state": (
+            lambda: (
+                select(Item.version, Item.updated_at).where(Item.id == item_id, Item.owner_id == owner_id),
+                None,
+            ),
+            lambda: (
+                lambda_stmt(
+                    lambda: select(Item.version, Item.updated_at).where(Item.id == item_id, Item.owner_id == owner_id)
+                ),
+                None,
+            ),
+            lambda: (queries.OWNED_ITEM_STATE, owned),
+        ),
+    }
+
+    results = []
+    with Session(engine) as db:
+
+        def run(case: Callable[[], tuple]) -> Any:
+            stmt, params = case()
+            return db.execute(stmt, params).first()
+
+        for name, (plain, lambda_case, prebuilt) in cases.items():
+            timings = {
+                variant: cpu_per_call(lambda: run(case), args.iterations) * 1e6
+                for variant, case in (("plain", plain), ("lambda", lambda_case), ("prebuilt", prebuilt))
+            }
+            db.expunge_all()
+            results.append({"query": name, **{f"{variant}_us": us for variant, us in timings.items()}})
+            print(
+                f"{name:>16}: plain {timings['plain']:7.1f} us  lambda {timings['lambda']:7.1f} us  "
+                f"prebuilt {timings['prebuilt']:7.1f} us  saved {timings['plain'] - timings['prebuilt']:6.1f} us/call",
+                file=sys.stderr,
+            )
+    print(json.dumps({"iterations": args.iterations, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
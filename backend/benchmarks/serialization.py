@@ -0,0 +1,105 @@
+"""CPU cost of serializing item and OT link responses as JSON versus MessagePack.
+
+Replays the work FastAPI does for a ``response_model`` JSON response
+(validate, dump in JSON mode, ``json.dumps``) against the MessagePack path
+used for ``Accept: application/msgpack``, across ciphertext sizes::
+
+    python -m benchmarks.serialization --sizes 256 4096 65536 --iterations 2000
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable
+
+
+def json_body(schema: Any, obj: Any) -> bytes:
+    # Mirrors fastapi.routing.serialize_response + JSONResponse.render.
+    content = schema.model_validate(obj).model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def msgpack_body(schema: Any, obj: Any) -> bytes:
+    from app.core.encoding import packb
+
+    return packb(schema.model_validate(obj).model_dump())
+
+
+def cpu_per_call(fn: Callable[[], bytes], iterations: int) -> tuple[float, int]:
+    size = len(fn())
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations, size
+
+
+def fixtures(blob_bytes: int) -> dict[str, tuple[Any, Any]]:
+    from app.schemas.item import ItemDetail
+    from app.schemas.ot_link import OTLinkRead
+
+    now = datetime.now(timezone.utc)
+    # Stored ciphertexts are the base64 text clients send inside JSON.
+    blob = base64.b64encode(os.urandom(blob_bytes))
+    item = SimpleNamespace(
+        id=uuid.uuid4(),
+        title_hmac="a" * 64,
+        tags=["work", "email"],
+        version=3,
+        created_at=now,
+        updated_at=now,
+        encrypted_blob=blob,
+        blob_ref=None,
+        iv=base64.b64encode(os.urandom(12)),
+        salt=base64.b64encode(os.urandom(16)),
+    )
+    link = SimpleNamespace(
+        id=uuid.uuid4(),
+        encrypted_payload=blob,
+        salt=item.salt,
+        iv=item.iv,
+        expiry=now + timedelta(days=1),
+        single_use=True,
+        used=True,
+        created_at=now,
+    )
+    return {"item_detail": (ItemDetail, item), "ot_link": (OTLinkRead, link)}
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[256, 4096, 65536])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    results = []
+    for blob_bytes in args.sizes:
+        for name, (schema, obj) in fixtures(blob_bytes).items():
+            json_cpu, json_size = cpu_per_call(lambda: json_body(schema, obj), args.iterations)
+            msgpack_cpu, msgpack_size = cpu_per_call(lambda: msgpack_body(schema, obj), args.iterations)
+            results.append(
+                {
+                    "response": name,
+                    "blob_bytes": blob_bytes,
+                    "json_us": json_cpu * 1e6,
+                    "msgpack_us": msgpack_cpu * 1e6,
+                    "cpu_saved_us": (json_cpu - msgpack_cpu) * 1e6,
+                    "json_body_bytes": json_size,
+                    "msgpack_body_bytes": msgpack_size,
+                }
+            )
+            print(
+                f"{name:>12} {blob_bytes:>7} B: json {json_cpu * 1e6:8.1f} us  "
+                f"msgpack {msgpack_cpu * 1e6:8.1f} us  saved {(json_cpu - msgpack_cpu) * 1e6:8.1f} us/request",
+                file=sys.stderr,
+            )
+    print(json.dumps({"iterations": args.iterations, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,7 @@
 import { ReactNode } from "react";
 import { Link, useNavigate } from "react-router-dom";
 
+import { api } from "../../api/client";
 import { useSession } from "../../state/SessionProvider";
 
 type LayoutProps = {
@@ -55,6 +56,14 @@ export function Layout({ children }: LayoutProps) {
                 <button
                   type="button"
                   onClick={() => {
+                    // Revoke the token server-side; the session ends locally either way.
+                    if (session.token) {
+                      api
+                        .post("/auth/logout", null, {
+                          headers: { Authorization: `Bearer ${session.token}` }
+                        })
+                        .catch(() => undefined);
+                    }
                     clearSession();
                     navigate("/login");
                   }}
@@ -23,7 +23,9 @@ type ItemMeta = {
 };
 
 type ItemDetail = ItemMeta & {
-  encrypted_blob: string;
+  // Null when the ciphertext is in the blob store under blob_ref.
+  encrypted_blob: string | null;
+  blob_ref?: string | null;
   iv: string;
   salt: string;
 };
@@ -85,12 +87,19 @@ export function VaultPage() {
   async function loadItems(): Promise<ItemMeta[]> {
     try {
       setLoading(true);
-      const res = await api.get<ItemMeta[]>("/items", {
-        headers: { Authorization: `Bearer ${session.token}` }
-      });
-      setAllItems(res.data);
-      setItems(res.data);
-      return res.data;
+      const loaded: ItemMeta[] = [];
+      let cursor: string | undefined;
+      do {
+        const res = await api.get<ItemMeta[]>("/items", {
+          headers: { Authorization: `Bearer ${session.token}` },
+          params: cursor ? { cursor } : undefined
+        });
+        loaded.push(...res.data);
+        cursor = res.headers["x-next-cursor"] || undefined;
+      } while (cursor);
+      setAllItems(loaded);
+      setItems(loaded);
+      return loaded;
     } catch (err: any) {
       setError(err.response?.data?.detail ?? "Failed to load items");
     } finally {
@@ -99,6 +108,15 @@ export function VaultPage() {
     return [];
   }
 
+  async function ciphertextOf(item: ItemDetail): Promise<string> {
+    if (item.encrypted_blob != null) return item.encrypted_blob;
+    const res = await api.get<string>(`/blobs/${item.blob_ref}`, {
+      headers: { Authorization: `Bearer ${session.token}` },
+      responseType: "text"
+    });
+    return res.data;
+  }
+
   async function hydrateTitles() {
     const missing = allItems.filter(item => !titles[item.id]);
     if (!missing.length || !session.master || !session.token) return;
@@ -116,7 +134,7 @@ export function VaultPage() {
         const item = res.data;
         try {
           const plaintext = await decryptSecret(
-            item.encrypted_blob,
+            await ciphertextOf(item),
             item.iv,
             item.salt,
             session.master!
@@ -199,7 +217,7 @@ export function VaultPage() {
 
   async function decryptIntoState(item: ItemDetail) {
     if (!session.master) return;
-    const plaintext = await decryptSecret(item.encrypted_blob, item.iv, item.salt, session.master);
+    const plaintext = await decryptSecret(await ciphertextOf(item), item.iv, item.salt, session.master);
     try {
       const parsed = JSON.parse(plaintext) as {
         title?: string;
@@ -396,7 +414,7 @@ export function VaultPage() {
       const decryptedList: { id: string; title: string; fields: SecretField[] }[] = [];
       for (const res of responses) {
         const item = res.data;
-        const plaintext = await decryptSecret(item.encrypted_blob, item.iv, item.salt, session.master);
+        const plaintext = await decryptSecret(await ciphertextOf(item), item.iv, item.salt, session.master);
         try {
           const parsed = JSON.parse(plaintext) as {
             title?: string;